@@ -0,0 +1,151 @@
+# ai/embeddings.py
+"""
+Pluggable sentence-embedding backends for policy retrieval.
+
+    XAI_EMBEDDING_BACKEND=torch      SentenceTransformer("all-MiniLM-L6-v2") (default)
+    XAI_EMBEDDING_BACKEND=onnx       the same model exported to ONNX, onnxruntime on CPU
+    XAI_EMBEDDING_BACKEND=onnx-int8  dynamically int8-quantized ONNX export
+
+The ONNX backends read from XAI_ONNX_MODEL_DIR (default ai/models/minilm),
+created once with:
+
+    python -m ai.embeddings export            # model.onnx + tokenizer
+    python -m ai.embeddings export --int8     # also model.int8.onnx
+
+Every backend exposes encode(texts, batch_size=32, normalize_embeddings=False)
+returning a float32 numpy array, like SentenceTransformer.encode.
+get_embedder() is the process-wide instance that ai/rag.py and
+ai/rag_index.py both use, so the model is loaded once.
+"""
+import argparse
+import os
+from ai.lazy import once
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+BACKEND = os.getenv("XAI_EMBEDDING_BACKEND", "torch")
+ONNX_MODEL_DIR = os.getenv("XAI_ONNX_MODEL_DIR", "ai/models/minilm")
+MAX_LENGTH = 256
+
+
+class TorchEmbedder:
+    def __init__(self):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+
+    def encode(self, texts, batch_size=32, normalize_embeddings=False):
+        return self.model.encode(
+            texts, batch_size=batch_size, normalize_embeddings=normalize_embeddings
+        )
+
+    def share_memory(self):
+        self.model.share_memory()
+
+
+class OnnxEmbedder:
+    """MiniLM on onnxruntime: tokenizer -> transformer -> mean pooling."""
+
+    def __init__(self, model_dir=ONNX_MODEL_DIR, quantized=False):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        filename = "model.int8.onnx" if quantized else "model.onnx"
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, filename), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(MAX_LENGTH)
+        self.tokenizer.enable_padding()
+
+    def encode(self, texts, batch_size=32, normalize_embeddings=False):
+        import numpy as np
+
+        if isinstance(texts, str):
+            texts = [texts]
+
+        out = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(list(texts[start:start + batch_size]))
+            ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+            feeds = {"input_ids": ids, "attention_mask": mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.zeros_like(ids)
+
+            hidden = self.session.run(None, feeds)[0]
+            # Mean pooling over real tokens, as sentence-transformers does for MiniLM
+            weights = mask[..., None].astype(np.float32)
+            pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+            out.append(pooled.astype(np.float32))
+
+        embeddings = np.concatenate(out) if out else np.zeros((0, 384), dtype=np.float32)
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings
+
+
+def load_embedder(backend=BACKEND):
+    if backend == "torch":
+        return TorchEmbedder()
+    if backend == "onnx":
+        return OnnxEmbedder()
+    if backend == "onnx-int8":
+        return OnnxEmbedder(quantized=True)
+    raise ValueError(f"Unknown embedding backend {backend!r} (torch, onnx, onnx-int8)")
+
+
+@once
+def get_embedder():
+    return load_embedder()
+
+
+def export(model_dir=ONNX_MODEL_DIR, int8=False):
+    """Exports MiniLM + tokenizer to ONNX (and optionally int8) under model_dir."""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(model_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    model = AutoModel.from_pretrained(MODEL_NAME).eval()
+    tokenizer.backend_tokenizer.save(os.path.join(model_dir, "tokenizer.json"))
+
+    sample = tokenizer(["policy text"], return_tensors="pt")
+    axes = {0: "batch", 1: "tokens"}
+    onnx_path = os.path.join(model_dir, "model.onnx")
+    torch.onnx.export(
+        model,
+        (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+        onnx_path,
+        input_names=["input_ids", "attention_mask", "token_type_ids"],
+        output_names=["last_hidden_state"],
+        dynamic_axes={
+            "input_ids": axes,
+            "attention_mask": axes,
+            "token_type_ids": axes,
+            "last_hidden_state": axes,
+        },
+        opset_version=14,
+    )
+
+    if int8:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(onnx_path, os.path.join(model_dir, "model.int8.onnx"), weight_type=QuantType.QInt8)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+    export_parser = sub.add_parser("export")
+    export_parser.add_argument("--out", default=ONNX_MODEL_DIR)
+    export_parser.add_argument("--int8", action="store_true")
+    args = parser.parse_args()
+
+    export(args.out, int8=args.int8)
+    print(f"Exported {MODEL_NAME} to {args.out}")
@@ -1,6 +1,6 @@
 # ai/explain.py
-import shap
 import numpy as np
+from ai.metrics import timed
 
 REASON_MAP = {
     "ctosScore": "Strong credit history",
@@ -10,13 +10,26 @@ REASON_MAP = {
     "instalmentToIncomeRatio": "Loan instalment is manageable"
 }
 
+@timed("explain")
 def explain(model, X):
+    import shap
+
+    explainer = shap.TreeExplainer(model)
+    shap_values = explainer.shap_values(X)
+
+    return top_reasons(shap_values[0], X.columns)
+
+@timed("explain")
+def explain_batch(model, X):
+    # Single SHAP call over every row of X, one reasons list per row
+    import shap
+
     explainer = shap.TreeExplainer(model)
     shap_values = explainer.shap_values(X)
 
-    impacts = shap_values[0]
-    features = X.columns
+    return [top_reasons(impacts, X.columns) for impacts in shap_values]
 
+def top_reasons(impacts, features):
     top_idx = np.argsort(abs(impacts))[::-1][:3]
 
     reasons = []
@@ -0,0 +1,175 @@
+# ai/explain_cache.py
+"""
+Cache of SHAP reasons keyed on (model version, feature vector).
+
+TreeExplainer output is a pure function of the model and the row, so a
+resubmitted application or a what-if step that lands on an already seen
+vector reuses the reasons instead of running SHAP again.
+
+    XAI_EXPLAIN_CACHE=0           disable
+    XAI_EXPLAIN_CACHE_MB=64       memory budget, least recently used entries go first
+    XAI_EXPLAIN_CACHE_DIGITS=4    key on features rounded to 4 significant digits
+                                  (default: exact values); near-identical rows then
+                                  share reasons computed for the first of them
+    XAI_EXPLAIN_CACHE_VERIFY=0.01 recompute 1% of hits and count mismatches
+"""
+import hashlib
+import logging
+import os
+import random
+import sys
+import threading
+from collections import OrderedDict
+from ai.explain import explain_batch
+from ai.lazy import once
+from ai.model import MODEL_PATH
+
+CACHE_ENABLED = os.getenv("XAI_EXPLAIN_CACHE", "1") == "1"
+CACHE_MB = float(os.getenv("XAI_EXPLAIN_CACHE_MB", "64"))
+CACHE_DIGITS = int(os.getenv("XAI_EXPLAIN_CACHE_DIGITS", "0")) or None
+VERIFY_RATE = float(os.getenv("XAI_EXPLAIN_CACHE_VERIFY", "0"))
+
+# Cached and fresh impacts closer than this count as equal (float32 SHAP values)
+VERIFY_TOLERANCE = 1e-5
+
+logger = logging.getLogger(__name__)
+
+
+@once
+def model_version() -> str:
+    with open(MODEL_PATH, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def deep_size(value) -> int:
+    """Approximate bytes held by a key or cached reasons list."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_size(k) + deep_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(deep_size(v) for v in value)
+    return size
+
+
+def same_reasons(cached: list, fresh: list) -> bool:
+    return len(cached) == len(fresh) and all(
+        c["feature"] == f["feature"] and abs(c["impact"] - f["impact"]) <= VERIFY_TOLERANCE
+        for c, f in zip(cached, fresh)
+    )
+
+
+class ExplanationCache:
+    """
+    Thread-safe LRU bounded by the approximate memory of its entries
+    rather than by their number.
+    """
+
+    def __init__(self, max_bytes: int, digits: int = None, verify_rate: float = 0.0):
+        self.max_bytes = max_bytes
+        self.digits = digits
+        self.verify_rate = verify_rate
+        self._entries = OrderedDict()  # key -> (reasons, size)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.verified = 0
+        self.mismatches = 0
+
+    def key(self, version: str, row):
+        """None for a row with a NaN: NaN != NaN, so its key would never be found again."""
+        values = tuple(float(v) for v in row)
+        if any(v != v for v in values):
+            return None
+        if self.digits:
+            return (version,) + tuple(float(f"{v:.{self.digits}g}") for v in values)
+        return (version,) + values
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, reasons: list):
+        size = deep_size(key) + deep_size(reasons)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._entries[key] = (reasons, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes and self._entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def record_verification(self, key, cached: list, fresh: list):
+        with self._lock:
+            self.verified += 1
+            if same_reasons(cached, fresh):
+                return
+            self.mismatches += 1
+        logger.warning("Cached explanation differs from a fresh one for %s: %s != %s", key, cached, fresh)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "digits": self.digits,
+                "verified": self.verified,
+                "mismatches": self.mismatches,
+            }
+
+    def explain_batch(self, model, X) -> list:
+        """
+        explain_batch with cached rows skipped: misses and sampled hits go
+        through one SHAP call together.
+        """
+        version = model_version()
+        keys = [self.key(version, row) for row in X.itertuples(index=False, name=None)]
+        results = [self.get(key) if key is not None else None for key in keys]
+
+        verify = [i for i, r in enumerate(results) if r is not None and random.random() < self.verify_rate]
+        compute = [i for i, r in enumerate(results) if r is None] + verify
+        if compute:
+            fresh = explain_batch(model, X.iloc[compute])
+            verifying = set(verify)
+            for i, reasons in zip(compute, fresh):
+                if i in verifying:
+                    self.record_verification(keys[i], results[i], reasons)
+                else:
+                    if keys[i] is not None:
+                        self.put(keys[i], reasons)
+                    results[i] = reasons
+
+        # Entries are shared between threads; callers get their own dicts
+        return [[dict(r) for r in reasons] for reasons in results]
+
+
+@once
+def get_cache() -> ExplanationCache:
+    return ExplanationCache(int(CACHE_MB * 1024 * 1024), CACHE_DIGITS, VERIFY_RATE)
+
+
+def cached_explain_batch(model, X) -> list:
+    if not CACHE_ENABLED:
+        return explain_batch(model, X)
+    return get_cache().explain_batch(model, X)
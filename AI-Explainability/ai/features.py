@@ -1,4 +1,5 @@
-import pandas as pd
+from ai.derived_metrics import batch_calculated_metrics, calculated_metrics
+from ai.metrics import timed
 
 FEATURE_COLUMNS = [
     'totalMonthlyIncome',
@@ -17,12 +18,37 @@ FEATURE_COLUMNS = [
     'instalmentToIncomeRatio'
 ]
 
-def build_feature_vector(application: dict) -> pd.DataFrame:
+@timed("build_feature_vector")
+def build_feature_vector(application: dict) -> "pd.DataFrame":
     """
     Converts nested application JSON into a flat feature vector
     with ALL 14 features the model expects
     """
-    features = {
+    import pandas as pd
+
+    # Return DataFrame with columns in the exact order the model expects
+    return pd.DataFrame([flatten_application(application)])[FEATURE_COLUMNS]
+
+@timed("build_feature_vector")
+def build_feature_matrix(applications: list) -> "pd.DataFrame":
+    """
+    Same as build_feature_vector but one row per application,
+    so a whole batch goes through the model in one call
+    """
+    import pandas as pd
+
+    # Derived metrics for the whole batch are computed column-wise in one pass
+    rows = [
+        flatten_application(a, metrics)
+        for a, metrics in zip(applications, batch_calculated_metrics(applications))
+    ]
+    return pd.DataFrame(rows)[FEATURE_COLUMNS]
+
+def flatten_application(application: dict, metrics: dict = None) -> dict:
+    if metrics is None:
+        # Computed from the raw fields when derived_metrics.inputs_from allows it, else the client's values
+        metrics = calculated_metrics(application)
+    return {
         # Financial Information
         "totalMonthlyIncome": application["financialInformation"]["monthlyIncome"],
         "totalCommitments": application["financialInformation"]["totalCommitments"],
@@ -42,11 +68,8 @@ def build_feature_vector(application: dict) -> pd.DataFrame:
         "loanAmount": application["loanDetails"]["loanAmount"],
 
         # Calculated Metrics
-        "debtServiceRatio": application["calculatedMetrics"]["debtServiceRatio"],
-        "newDebtServiceRatio": application["calculatedMetrics"]["newDebtServiceRatio"],
-        "cashReserveMonths": application["calculatedMetrics"]["cashReserveMonths"],
-        "instalmentToIncomeRatio": application["calculatedMetrics"]["instalmentToIncomeRatio"]
+        "debtServiceRatio": metrics["debtServiceRatio"],
+        "newDebtServiceRatio": metrics["newDebtServiceRatio"],
+        "cashReserveMonths": metrics["cashReserveMonths"],
+        "instalmentToIncomeRatio": metrics["instalmentToIncomeRatio"]
     }
-
-    # Return DataFrame with columns in the exact order the model expects
-    return pd.DataFrame([features])[FEATURE_COLUMNS]
\ No newline at end of file
@@ -0,0 +1,24 @@
+# ai/lazy.py
+import functools
+import threading
+
+
+def once(fn):
+    """
+    Thread-safe lazy loader: fn() runs on the first call only and every
+    later call returns the same object. Used for models, clients and other
+    heavy resources so importing the ai package stays cheap.
+    """
+    lock = threading.Lock()
+    result = []
+
+    @functools.wraps(fn)
+    def wrapper():
+        if not result:
+            with lock:
+                if not result:
+                    result.append(fn())
+        return result[0]
+
+    wrapper.loaded = lambda: bool(result)
+    return wrapper
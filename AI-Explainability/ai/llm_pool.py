@@ -0,0 +1,303 @@
+# ai/llm_pool.py
+"""
+Client for one or more Ollama-compatible servers, used for every narrative.
+
+    XAI_LLM_ENDPOINTS=http://10.0.0.5:11434,http://10.0.0.6:11434
+                          servers to spread calls over (default: OLLAMA_HOST
+                          or http://127.0.0.1:11434)
+    XAI_LLM_TIMEOUT_S=30  deadline for a whole chat() call, hedge included
+    XAI_LLM_HEDGE_MS=0    if > 0, a call still running after this long is
+                          also sent to a second server; the first answer wins
+    XAI_LLM_HEALTH_S=10   health check period
+
+Each server keeps a stack of persistent HTTP/1.1 connections. A call goes
+to the healthy server with the fewest requests in flight. A call that
+fails moves on to the next server; if the failure was the server's (no
+connection, a broken response, a 5xx) it is also marked unhealthy until the
+background health check brings it back. Running out of the caller's
+deadline or a 4xx says nothing about the server's health.
+
+Standard library only, so it can be tried against benchmarks/stub_ollama.py:
+
+    python -m ai.llm_pool http://127.0.0.1:11435 http://127.0.0.1:11436
+"""
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+from ai.lazy import once
+
+DEFAULT_HOST = os.getenv("OLLAMA_HOST", "http://127.0.0.1:11434")
+LLM_ENDPOINTS = [e.strip() for e in os.getenv("XAI_LLM_ENDPOINTS", DEFAULT_HOST).split(",") if e.strip()]
+LLM_MODEL = os.getenv("XAI_LLM_MODEL", "llama3")
+LLM_TIMEOUT_S = float(os.getenv("XAI_LLM_TIMEOUT_S", "30"))
+LLM_HEDGE_MS = float(os.getenv("XAI_LLM_HEDGE_MS", "0"))
+HEALTH_INTERVAL_S = float(os.getenv("XAI_LLM_HEALTH_S", "10"))
+HEALTH_TIMEOUT_S = 2.0
+
+# Idle connections kept per server
+MAX_IDLE = 32
+
+
+class LLMUnavailable(Exception):
+    pass
+
+
+class LLMHTTPError(LLMUnavailable):
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.status = status
+
+
+def server_fault(exc: Exception) -> bool:
+    """Whether a failed call counts against the server's health."""
+    if isinstance(exc, LLMHTTPError):
+        return exc.status >= 500
+    if isinstance(exc, TimeoutError):
+        # Socket timeouts too: a call's timeout is whatever is left of the caller's deadline
+        return False
+    return isinstance(exc, (OSError, http.client.HTTPException))
+
+
+class Endpoint:
+    def __init__(self, url: str):
+        if "://" not in url:
+            url = "http://" + url
+        parts = urlsplit(url)
+        self.url = url
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.https else 11434)
+
+        self.outstanding = 0
+        self.healthy = True
+        self.requests = 0
+        self.failures = 0
+        self.latency_s = None  # moving average of successful calls
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _connect(self, timeout: float):
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=timeout)
+
+    def request(self, method: str, path: str, payload, timeout: float) -> dict:
+        """One JSON request over a pooled connection; a stale one is retried once on a new connection."""
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        for attempt in range(2):
+            reused = conn is not None
+            if conn is None:
+                conn = self._connect(timeout)
+            else:
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (ConnectionError, http.client.RemoteDisconnected, http.client.BadStatusLine):
+                conn.close()
+                conn = None
+                if reused and attempt == 0:
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            break
+
+        if response.will_close:
+            conn.close()
+        else:
+            with self._lock:
+                if len(self._idle) < MAX_IDLE:
+                    self._idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+        if response.status >= 400:
+            raise LLMHTTPError(f"{self.url}{path} returned {response.status}: {data[:200]!r}", response.status)
+        return json.loads(data) if data else {}
+
+    def check(self):
+        try:
+            self.request("GET", "/api/tags", None, HEALTH_TIMEOUT_S)
+        except Exception:
+            self.healthy = False
+        else:
+            self.healthy = True
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "idle_connections": len(self._idle),
+            "latency_ms": round(self.latency_s * 1000, 3) if self.latency_s is not None else None,
+        }
+
+
+class LLMPool:
+    def __init__(self, endpoints: list, model: str = LLM_MODEL, timeout_s: float = LLM_TIMEOUT_S,
+                 hedge_ms: float = LLM_HEDGE_MS):
+        self.endpoints = [Endpoint(url) for url in endpoints]
+        self.model = model
+        self.timeout_s = timeout_s
+        self.hedge_s = hedge_ms / 1000.0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+        self._hedge_executor = ThreadPoolExecutor(max_workers=64, thread_name_prefix="llm-hedge")
+        self._health_thread = None
+
+    def _acquire(self, exclude=()) -> Endpoint:
+        """Least outstanding requests among healthy servers (any server if none is healthy)."""
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude]
+            if not candidates:
+                return None
+            healthy = [e for e in candidates if e.healthy] or candidates
+            endpoint = min(healthy, key=lambda e: (e.outstanding, e.latency_s or 0.0))
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def _release(self, endpoint: Endpoint, elapsed: float = None, fault: bool = False):
+        with self._lock:
+            endpoint.outstanding -= 1
+            if elapsed is None:
+                endpoint.failures += 1
+                if fault:
+                    endpoint.healthy = False
+            elif endpoint.latency_s is None:
+                endpoint.latency_s = elapsed
+            else:
+                endpoint.latency_s = 0.8 * endpoint.latency_s + 0.2 * elapsed
+
+    def _call(self, endpoint: Endpoint, payload: dict, deadline: float) -> dict:
+        start = time.monotonic()
+        try:
+            timeout = deadline - start
+            if timeout <= 0:
+                raise TimeoutError("LLM deadline exceeded")
+            response = endpoint.request("POST", "/api/chat", payload, timeout)
+        except Exception as exc:
+            self._release(endpoint, fault=server_fault(exc))
+            raise
+        self._release(endpoint, time.monotonic() - start)
+        return response
+
+    def chat(self, messages: list, timeout_s: float = None, **options) -> dict:
+        """
+        Same request and response shape as ollama.chat (non-streaming);
+        tries every server once before giving up with LLMUnavailable.
+        """
+        payload = {"model": self.model, "messages": messages, "stream": False, **options}
+        deadline = time.monotonic() + (timeout_s or self.timeout_s)
+        tried = []
+        errors = []
+
+        while time.monotonic() < deadline:
+            endpoint = self._acquire(exclude=tried)
+            if endpoint is None:
+                break
+            tried.append(endpoint)
+            try:
+                if self.hedge_s > 0 and len(self.endpoints) > 1:
+                    return self._hedged(endpoint, payload, deadline, tried)
+                return self._call(endpoint, payload, deadline)
+            except Exception as exc:
+                errors.append(f"{endpoint.url}: {exc}")
+
+        raise LLMUnavailable("; ".join(errors) or "LLM deadline exceeded")
+
+    def _hedged(self, endpoint: Endpoint, payload: dict, deadline: float, tried: list) -> dict:
+        primary = self._hedge_executor.submit(self._call, endpoint, payload, deadline)
+        done, _ = wait([primary], timeout=min(self.hedge_s, max(0.0, deadline - time.monotonic())))
+        if done:
+            return primary.result()
+
+        backup_endpoint = self._acquire(exclude=tried)
+        if backup_endpoint is None:
+            return primary.result(timeout=max(0.0, deadline - time.monotonic()))
+        tried.append(backup_endpoint)
+        with self._lock:
+            self.hedges += 1
+        backup = self._hedge_executor.submit(self._call, backup_endpoint, payload, deadline)
+
+        # First successful answer wins; the slower call finishes in the background
+        pending = {primary, backup}
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError("LLM deadline exceeded")
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def check_health(self):
+        for endpoint in self.endpoints:
+            endpoint.check()
+
+    def start_health_checks(self, interval: float = HEALTH_INTERVAL_S):
+        if self._health_thread is not None:
+            return self._health_thread
+
+        def loop():
+            while True:
+                self.check_health()
+                time.sleep(interval)
+
+        self._health_thread = threading.Thread(target=loop, name="llm-health", daemon=True)
+        self._health_thread.start()
+        return self._health_thread
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "model": self.model,
+                "timeout_s": self.timeout_s,
+                "hedge_ms": self.hedge_s * 1000.0,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "endpoints": [e.stats() for e in self.endpoints],
+            }
+
+
+@once
+def get_pool() -> LLMPool:
+    pool = LLMPool(LLM_ENDPOINTS)
+    pool.start_health_checks()
+    return pool
+
+
+def chat(messages: list, **options) -> dict:
+    return get_pool().chat(messages, **options)
+
+
+if __name__ == "__main__":
+    # Round trip through every server given on the command line (or the configured ones)
+    pool = LLMPool(sys.argv[1:] or LLM_ENDPOINTS)
+    pool.check_health()
+    start = time.perf_counter()
+    response = pool.chat([{"role": "user", "content": "Say hello."}])
+    print(response["message"]["content"])
+    print(f"{(time.perf_counter() - start) * 1000:.1f} ms", json.dumps(pool.stats(), indent=2))
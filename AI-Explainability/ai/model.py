@@ -1,7 +1,7 @@
-import pandas as pd
-from xgboost import XGBClassifier
 import json
 from ai.features import FEATURE_COLUMNS
+from ai.lazy import once
+from ai.metrics import timed
 
 FEATURE_COLUMNS = [
     "totalMonthlyIncome",
@@ -23,13 +23,30 @@ FEATURE_COLUMNS = [
 MODEL_PATH = "ai/xgboost_model.json"
 
 def load_model():
+    from xgboost import XGBClassifier
+
     model = XGBClassifier()
     model.load_model(MODEL_PATH)  # XGBoost's native JSON loader
     return model
 
+@once
+def get_model():
+    return load_model()
+
 # ai/model.py
-def predict(model, X: pd.DataFrame):
+@timed("predict")
+def predict(model, X):
     prob = model.predict_proba(X)[0][1]
     decision = "APPROVED" if prob >= 0.5 else "REJECTED"
 
-    return decision, float(prob)  # ✅ Already converting to float - good!
\ No newline at end of file
+    return decision, float(prob)  # ✅ Already converting to float - good!
+
+@timed("predict")
+def predict_batch(model, X):
+    # One predict_proba call for all rows so XGBoost can use its threads
+    probs = model.predict_proba(X)[:, 1]
+
+    return [
+        ("APPROVED" if prob >= 0.5 else "REJECTED", float(prob))
+        for prob in probs
+    ]
\ No newline at end of file
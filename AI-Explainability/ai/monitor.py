@@ -0,0 +1,382 @@
+# ai/monitor.py
+"""
+Streaming feature / score distribution monitor for regulator reports.
+
+Every scored row updates fixed-size sketches, so memory and the cost of a
+report do not grow with traffic:
+
+    - per FEATURE_COLUMNS feature and for the approval probability: a
+      bucketed histogram for quantiles and counts over the training
+      reference's decile bins for PSI (population stability index)
+    - counts per decision and per decision band
+
+The reference (decile edges and proportions of the training data) is
+compiled from input/output_file.csv to ai/drift_reference.json:
+
+    python -m ai.monitor                # features only, standard library
+    python -m ai.monitor --with-scores  # also the model's probability on the training rows
+
+Every XAI_MONITOR_SNAPSHOT_S seconds each process writes its own counts to
+XAI_MONITOR_SNAPSHOT.d/<pid>.json and the merge of all of them (report and
+state) to XAI_MONITOR_SNAPSHOT. Under serve.py's pre-forked workers that
+keeps one writer per file, and /monitor/drift reports the merged view. On
+start-up a process adopts the files of processes that are gone (renaming
+them first, so each is restored by exactly one worker).
+"""
+import argparse
+import bisect
+import csv
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+from ai.features import FEATURE_COLUMNS
+from ai.lazy import once
+from ai.metrics import Histogram
+
+MONITOR_ENABLED = os.getenv("XAI_MONITOR", "1") == "1"
+TRAINING_DATA = "input/output_file.csv"
+REFERENCE_PATH = "ai/drift_reference.json"
+SNAPSHOT_PATH = os.getenv("XAI_MONITOR_SNAPSHOT", "monitor_snapshot.json")
+SNAPSHOT_INTERVAL_S = float(os.getenv("XAI_MONITOR_SNAPSHOT_S", "60"))
+
+SCORE = "approvalProbability"
+PSI_BINS = 10
+QUANTILE_BUCKETS = 256
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# Same cut-offs as the backEnd DecisionEngine, so both apps report alike
+DECISION_BANDS = (("reject", 0.4), ("review", 0.7), ("approve", math.inf))
+
+# Usual PSI reading: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 significant
+PSI_LEVELS = ((0.1, "stable"), (0.25, "moderate"), (math.inf, "significant"))
+
+
+def training_version(path: str = TRAINING_DATA) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def describe(values: list) -> dict:
+    """Decile edges, the share of values in each bin, and the range."""
+    values = sorted(values)
+    n = len(values)
+    edges = sorted({values[min(int(n * i / PSI_BINS), n - 1)] for i in range(1, PSI_BINS)})
+    counts = [0] * (len(edges) + 1)
+    for v in values:
+        counts[bisect.bisect_right(edges, v)] += 1
+    return {
+        "edges": edges,
+        "proportions": [c / n for c in counts],
+        "min": values[0],
+        "max": values[-1],
+    }
+
+
+def compile_reference(path: str = TRAINING_DATA, with_scores: bool = False) -> dict:
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+
+    columns = {name: [float(row[name]) for row in rows] for name in FEATURE_COLUMNS}
+    if with_scores:
+        import pandas as pd
+        from ai.model import get_model, predict_batch
+
+        X = pd.DataFrame(columns)[FEATURE_COLUMNS]
+        columns[SCORE] = [float(prob) for _, prob in predict_batch(get_model(), X)]
+
+    return {
+        "training_version": training_version(path),
+        "rows": len(rows),
+        "features": {name: describe(values) for name, values in columns.items()},
+    }
+
+
+def write_reference(reference: dict, path: str = REFERENCE_PATH):
+    with open(path, "w") as f:
+        json.dump(reference, f, indent=2)
+        f.write("\n")
+
+
+def load_reference(path: str = REFERENCE_PATH, data: str = TRAINING_DATA) -> dict:
+    """Returns the compiled reference, recompiling it if the training data changed."""
+    reference = None
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            reference = json.load(f)
+
+    if reference is None or reference["training_version"] != training_version(data):
+        with_scores = bool(reference and SCORE in reference["features"])
+        reference = compile_reference(data, with_scores=with_scores)
+        write_reference(reference, path)
+
+    return reference
+
+
+def psi(expected: list, actual_counts: list) -> float:
+    total = sum(actual_counts)
+    if total == 0:
+        return 0.0
+    value = 0.0
+    for e, count in zip(expected, actual_counts):
+        # Empty bins would make the log infinite
+        e = max(e, 1e-4)
+        a = max(count / total, 1e-4)
+        value += (a - e) * math.log(a / e)
+    return value
+
+
+def psi_level(value: float) -> str:
+    return next(level for limit, level in PSI_LEVELS if value < limit)
+
+
+def band(probability: float) -> str:
+    return next(name for name, upper in DECISION_BANDS if probability < upper)
+
+
+def parts_dir(path: str = SNAPSHOT_PATH) -> str:
+    return f"{path}.d"
+
+
+def write_json(data: dict, path: str):
+    # The pid keeps concurrent writers (pre-forked workers) off each other's temp file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def snapshot_parts(path: str = SNAPSHOT_PATH) -> dict:
+    """pid -> path of each process's snapshot file."""
+    directory = parts_dir(path)
+    if not os.path.isdir(directory):
+        return {}
+    parts = {}
+    for name in os.listdir(directory):
+        match = re.fullmatch(r"(\d+)\.json", name)
+        if match:
+            parts[int(match.group(1))] = os.path.join(directory, name)
+    return parts
+
+
+def read_state(path: str):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # Gone or replaced meanwhile
+        return None
+
+
+class Sketch:
+    """
+    Fixed-size summary of one live distribution. Quantile buckets span the
+    training range, so quantiles outside it are clamped to its ends (the
+    PSI bins and the mean still see the shift).
+    """
+
+    def __init__(self, reference=None):
+        self.reference = reference
+        if reference:
+            low, high = reference["min"], reference["max"]
+            self.edges = reference["edges"]
+        else:
+            low, high = 0.0, 1.0
+            self.edges = []
+        if high <= low:
+            high = low + 1.0
+        self.low, self.high = low, high
+        step = (high - low) / QUANTILE_BUCKETS
+        self.histogram = Histogram([low + step * i for i in range(QUANTILE_BUCKETS + 1)])
+        self.bins = [0] * (len(self.edges) + 1)
+
+    def quantile(self, q: float):
+        if not self.histogram.count:
+            return None
+        # Histogram's first bucket (everything <= low) interpolates up from 0.0; clamp to the range
+        return min(max(self.histogram.quantile(q), self.low), self.high)
+
+    def observe(self, value: float):
+        self.histogram.observe(value)
+        self.bins[bisect.bisect_right(self.edges, value)] += 1
+
+    def report(self) -> dict:
+        h = self.histogram
+        result = {
+            "count": h.count,
+            "mean": h.sum / h.count if h.count else None,
+            "quantiles": {str(q): self.quantile(q) for q in QUANTILES},
+        }
+        if self.reference:
+            value = psi(self.reference["proportions"], self.bins)
+            result["psi"] = round(value, 6)
+            result["drift"] = psi_level(value)
+        return result
+
+    def state(self) -> dict:
+        return {"counts": self.histogram.counts, "sum": self.histogram.sum, "bins": self.bins}
+
+    def merge(self, state: dict):
+        if len(state["counts"]) != len(self.histogram.counts) or len(state["bins"]) != len(self.bins):
+            return
+        h = self.histogram
+        h.counts = [a + b for a, b in zip(h.counts, state["counts"])]
+        h.count = sum(h.counts)
+        h.sum += state["sum"]
+        self.bins = [a + b for a, b in zip(self.bins, state["bins"])]
+
+
+class DriftMonitor:
+    def __init__(self, reference: dict = None):
+        self.reference = reference
+        features = (reference or {}).get("features", {})
+        self.reference_version = (reference or {}).get("training_version")
+        self.sketches = {name: Sketch(features.get(name)) for name in FEATURE_COLUMNS + [SCORE]}
+        self.decisions = {}
+        self.bands = {name: 0 for name, _ in DECISION_BANDS}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def observe_batch(self, X, predictions):
+        """X: the feature DataFrame of a batch; predictions: (decision, probability) per row."""
+        columns = {name: X[name].tolist() for name in FEATURE_COLUMNS}
+        with self._lock:
+            for name, values in columns.items():
+                sketch = self.sketches[name]
+                for v in values:
+                    sketch.observe(float(v))
+            for decision, probability in predictions:
+                self.sketches[SCORE].observe(float(probability))
+                self.decisions[decision] = self.decisions.get(decision, 0) + 1
+                self.bands[band(probability)] += 1
+
+    def report(self) -> dict:
+        """This process's counts only; see merged_report() under pre-forked workers."""
+        with self._lock:
+            return {
+                "since": self.started,
+                "reference": self.reference_version,
+                "decisions": dict(self.decisions),
+                "bands": dict(self.bands),
+                "score": self.sketches[SCORE].report(),
+                "features": {name: self.sketches[name].report() for name in FEATURE_COLUMNS},
+            }
+
+    def state(self) -> dict:
+        with self._lock:
+            return {
+                "written": time.time(),
+                "since": self.started,
+                "reference": self.reference_version,
+                "decisions": dict(self.decisions),
+                "bands": dict(self.bands),
+                "sketches": {name: s.state() for name, s in self.sketches.items()},
+            }
+
+    def merge(self, state: dict) -> bool:
+        """Adds the counts of a state taken against the same reference."""
+        if state["reference"] != self.reference_version:
+            return False
+        with self._lock:
+            self.started = min(self.started, state["since"])
+            for decision, count in state["decisions"].items():
+                self.decisions[decision] = self.decisions.get(decision, 0) + count
+            for name, count in state["bands"].items():
+                self.bands[name] = self.bands.get(name, 0) + count
+            for name, sketch_state in state["sketches"].items():
+                if name in self.sketches:
+                    self.sketches[name].merge(sketch_state)
+        return True
+
+    def merged(self, path: str = SNAPSHOT_PATH) -> "DriftMonitor":
+        """This process's live counts plus the latest snapshot of every other process."""
+        total = DriftMonitor(self.reference)
+        total.merge(self.state())
+        for pid, part in snapshot_parts(path).items():
+            if pid != os.getpid():
+                state = read_state(part)
+                if state is not None:
+                    total.merge(state)
+        return total
+
+    def merged_report(self, path: str = SNAPSHOT_PATH) -> dict:
+        return self.merged(path).report()
+
+    def snapshot(self, path: str = SNAPSHOT_PATH):
+        """Writes this process's part, then the merge of all parts to `path`."""
+        os.makedirs(parts_dir(path), exist_ok=True)
+        write_json(self.state(), os.path.join(parts_dir(path), f"{os.getpid()}.json"))
+
+        total = self.merged(path)
+        write_json({"report": total.report(), "state": total.state()}, path)
+
+    def restore(self, path: str = SNAPSHOT_PATH) -> bool:
+        """
+        Resumes counting from the parts of processes that are no longer
+        running. Each part is renamed before it is read, so when several
+        workers start together every part is adopted by exactly one.
+        """
+        adopted = False
+        for pid, part in snapshot_parts(path).items():
+            # Our own pid here is a reused one from an earlier run
+            if pid != os.getpid() and process_alive(pid):
+                continue
+            claimed = f"{part}.{os.getpid()}.adopted"
+            try:
+                os.rename(part, claimed)
+            except FileNotFoundError:
+                continue  # another worker got it
+            state = read_state(claimed)
+            if state is not None and self.merge(state):
+                adopted = True
+            os.remove(claimed)
+
+        if adopted:
+            # Adopted counts live on in this process's part from now on
+            self.snapshot(path)
+        return adopted
+
+    def start_snapshots(self, path: str = SNAPSHOT_PATH, interval: float = SNAPSHOT_INTERVAL_S):
+        def loop():
+            while True:
+                time.sleep(interval)
+                self.snapshot(path)
+
+        thread = threading.Thread(target=loop, name="drift-snapshots", daemon=True)
+        thread.start()
+        return thread
+
+
+@once
+def get_monitor() -> DriftMonitor:
+    return DriftMonitor(load_reference())
+
+
+def observe_batch(X, predictions):
+    if MONITOR_ENABLED:
+        get_monitor().observe_batch(X, predictions)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--with-scores", action="store_true", help="also profile the model's probabilities")
+    parser.add_argument("--data", default=TRAINING_DATA)
+    parser.add_argument("--out", default=REFERENCE_PATH)
+    args = parser.parse_args()
+
+    reference = compile_reference(args.data, with_scores=args.with_scores)
+    write_reference(reference, args.out)
+    print(f"Compiled reference for {len(reference['features'])} distributions ({reference['rows']} rows) to {args.out}")
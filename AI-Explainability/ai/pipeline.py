@@ -1,33 +1,124 @@
 # ai/pipeline.py
-import pandas as pd
-from ai.model import load_model, predict
-from ai.explain import explain
+import time
+from ai.model import get_model, predict_batch
+from ai.explain_cache import cached_explain_batch
 from ai.rag import generate_narrative
-from ai.features import build_feature_vector
+from ai.templates import render_narrative
+from ai.features import build_feature_matrix
+from ai import monitor
 
-model = load_model()
+# How much of the pipeline to run, cheapest first:
+#   decision  - predict only
+#   reasons   - predict + SHAP reasons
+#   narrative - predict + SHAP reasons + customer explanation (template or LLM)
+DETAIL_LEVELS = ("decision", "reasons", "narrative")
 
-def run_pipeline(application: dict):
-    application_id = application["applicationId"]
+# Who writes the narrative:
+#   template - ai.templates, falling back to the LLM if no template covers the reasons
+#   llm      - always ai.rag.generate_narrative
+NARRATORS = ("template", "llm")
 
-    X = build_feature_vector(application)
+def elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 3)
 
-    decision, confidence = predict(model, X)
-    reasons = explain(model, X)
-    narrative = generate_narrative(decision, confidence, reasons)
+def score_batch(applications: list, detail: str = "narrative") -> list:
+    """
+    Vectorized predict (+ SHAP unless detail == "decision") for many
+    applications at once. Used by the micro-batcher in front of /predict.
+    Stage timings are for the whole batch, which every row shares.
+    """
+    timings = {}
+    model = get_model()
 
+    start = time.perf_counter()
+    X = build_feature_matrix(applications)
+    timings["features_ms"] = elapsed_ms(start)
+
+    start = time.perf_counter()
+    predictions = predict_batch(model, X)
+    timings["predict_ms"] = elapsed_ms(start)
+
+    monitor.observe_batch(X, predictions)
+
+    if detail == "decision":
+        reasons = [None] * len(applications)
+    else:
+        start = time.perf_counter()
+        reasons = cached_explain_batch(model, X)
+        timings["explain_ms"] = elapsed_ms(start)
+
+    return [
+        {
+            "applicationId": application["applicationId"],
+            "decision": decision,
+            "confidence": confidence,
+            "reasons": row_reasons,
+            "timings": dict(timings),
+            "batch_size": len(applications)
+        }
+        for application, (decision, confidence), row_reasons
+        in zip(applications, predictions, reasons)
+    ]
+
+def finish_pipeline(scored: dict, detail: str = "narrative", narrator: str = "template") -> dict:
+    narrative = None
+    if detail == "narrative":
+        start = time.perf_counter()
+        if narrator == "template":
+            narrative = template_narrative(scored)
+        if narrative is None:
+            narrator = "llm"
+            scored["prompt"] = {}
+            narrative = generate_narrative(
+                scored["decision"], scored["confidence"], scored["reasons"], usage=scored["prompt"]
+            )
+        scored["timings"]["narrative_ms"] = elapsed_ms(start)
+        scored["narrator"] = narrator
+
+    return format_result(scored, narrative, detail)
+
+def template_narrative(scored: dict):
+    """render_narrative for a scored row, rendered once and kept on it for finish_pipeline."""
+    if "template_narrative" not in scored:
+        scored["template_narrative"] = render_narrative(scored["decision"], scored["confidence"], scored["reasons"])
+    return scored["template_narrative"]
+
+def needs_llm(scored: dict, detail: str, narrator: str) -> bool:
+    return detail == "narrative" and (narrator == "llm" or template_narrative(scored) is None)
+
+def run_pipeline(application: dict, detail: str = "narrative", narrator: str = "template"):
+    if detail not in DETAIL_LEVELS:
+        raise ValueError(f"detail must be one of {DETAIL_LEVELS}, got {detail!r}")
+    if narrator not in NARRATORS:
+        raise ValueError(f"narrator must be one of {NARRATORS}, got {narrator!r}")
+
+    return finish_pipeline(score_batch([application], detail)[0], detail, narrator)
+
+def format_result(scored: dict, narrative, detail: str = "narrative") -> dict:
     # ✅ Convert numpy types to native Python types
-    return {
-        "applicationId": application_id,
-        "decision": str(decision),  # Ensure it's a string
-        "confidence": float(confidence),  # Convert numpy.float32 to float
-        "reasons": [
+    result = {
+        "applicationId": scored["applicationId"],
+        "decision": str(scored["decision"]),  # Ensure it's a string
+        "confidence": float(scored["confidence"]),  # Convert numpy.float32 to float
+    }
+
+    if detail != "decision":
+        result["reasons"] = [
             {
                 "feature": str(r["feature"]),
                 "impact": float(r["impact"]),  # Convert numpy types
                 "explanation": str(r["explanation"])
             }
-            for r in reasons
-        ],
-        "explanation": str(narrative)
-    }
\ No newline at end of file
+            for r in scored["reasons"]
+        ]
+
+    if detail == "narrative":
+        result["explanation"] = str(narrative)
+        result["narrator"] = scored["narrator"]
+        if "prompt" in scored:
+            result["prompt"] = scored["prompt"]
+
+    result["detail"] = detail
+    result["timings"] = scored["timings"]
+    result["batch_size"] = scored["batch_size"]
+    return result
@@ -0,0 +1,197 @@
+# ai/policy_index.py
+"""
+Offline compilation of reason code -> policy passage lookups.
+
+    python -m ai.policy_index              # from AI-Explainability/
+    python -m ai.policy_index --embedding  # rank with all-MiniLM-L6-v2 (ai.embeddings backend)
+
+Every SHAP feature of the XGBoost explainer and every backEnd reason code,
+in both signs, is mapped to the most relevant lines of rag_docs/*.md,
+with document, paragraph section and line anchor. The result is written
+to ai/policy_index.json and shared by ai.rag and the backEnd RAGEngine, so
+serving-time retrieval is a dict lookup instead of a vector query.
+
+The index records a hash of the policy docs; load_index() recompiles it
+when the docs change. Only the standard library is needed unless
+--embedding is used.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+from collections import Counter
+
+DOCS_DIR = "rag_docs"
+INDEX_PATH = "ai/policy_index.json"
+TOP_K = 2
+
+# What each SHAP feature (ai/features.FEATURE_COLUMNS) is about
+FEATURE_TOPICS = {
+    "totalMonthlyIncome": "monthly income level",
+    "totalCommitments": "monthly commitments debt burden",
+    "debtServiceRatio": "dsr",
+    "newDebtServiceRatio": "post-loan dsr",
+    "savingsAmount": "savings commitments months",
+    "cashReserveMonths": "cash reserves months buffer",
+    "ctosScore": "ctos credit score",
+    "creditScoreCategory": "ctos credit score risk category",
+    "totalCreditUtilization": "total credit utilization",
+    "numberOfLatePayments": "late payments",
+    "employmentTenureMonths": "employment tenure months stable",
+    "employmentStabilityScore": "employment stability score income sources",
+    "loanAmount": "loan instalment income debt capacity",
+    "instalmentToIncomeRatio": "monthly loan instalment to income ratio",
+}
+
+# What each backEnd reason code (services/explainability.py, decision_engine.py) is about
+REASON_CODE_TOPICS = {
+    "HIGH_DTI_RATIO": "post-loan dsr",
+    "LOW_CASH_BUFFER": "cash reserves months buffer",
+    "HIGH_TOTAL_DSR": "dsr",
+    "HIGH_CREDIT_USAGE": "total credit utilization",
+    "BORDERLINE_RISK": "borderline cases approval confidence manual review",
+    "HIGH_RISK_PROFILE": "rejection reasons cite specific policy violations",
+}
+
+# Wording the policy docs use for favourable / unfavourable findings. A limit
+# ("must not exceed 60%") is what an acceptable applicant meets, so "exceed"
+# is not an unfavourable word; a "minimum" is what a weak one falls short of.
+SIGN_TOPICS = {
+    "positive": "healthy manageable low strong improves strengthens responsible reliable better zero good stable discipline sustainable",
+    "negative": "high unstable limited stress difficulty rejection rejected scrutiny increases moderate minimum",
+}
+
+STOPWORDS = {
+    "a", "an", "the", "of", "to", "and", "or", "in", "for", "with", "is", "are",
+    "be", "by", "on", "at", "as", "that", "this", "must", "should", "may", "not",
+}
+
+
+def docs_version(folder: str = DOCS_DIR) -> str:
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(folder)):
+        digest.update(name.encode("utf-8"))
+        with open(os.path.join(folder, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def load_chunks(folder: str = DOCS_DIR) -> list:
+    """One chunk per policy line; paragraphs (blank-line separated) are sections."""
+    chunks = []
+    for name in sorted(os.listdir(folder)):
+        if not name.endswith(".md"):
+            continue
+        with open(os.path.join(folder, name), "r") as f:
+            lines = f.read().splitlines()
+
+        section = 1
+        for number, line in enumerate(lines, start=1):
+            text = line.strip()
+            if not text:
+                if chunks and chunks[-1]["document"] == name and chunks[-1]["section"] == f"§{section}":
+                    section += 1
+                continue
+            chunks.append({
+                "document": name,
+                "section": f"§{section}",
+                "anchor": f"{name}#L{number}",
+                "summary": text,
+            })
+    return chunks
+
+
+def queries():
+    """Yields (index key, topic, sign words) for every feature/code and sign."""
+    for name, topic in list(FEATURE_TOPICS.items()) + list(REASON_CODE_TOPICS.items()):
+        for sign, sign_topic in SIGN_TOPICS.items():
+            yield f"{name}:{sign}", topic, sign_topic
+
+
+def tokenize(text: str) -> list:
+    words = re.findall(r"[a-z]+", text.lower())
+    # Crude stemming: "scores" ~ "score", "payments" ~ "payment"
+    return [w[:-1] if len(w) > 3 and w.endswith("s") else w for w in words if w not in STOPWORDS]
+
+
+def lexical_ranker(chunks: list):
+    docs = [Counter(tokenize(c["summary"])) for c in chunks]
+    df = Counter(term for doc in docs for term in doc)
+    idf = {term: math.log(len(docs) / count) + 1.0 for term, count in df.items()}
+
+    def score(terms, doc):
+        return sum(idf[t] for t in terms if t in doc) / math.sqrt(sum(doc.values()))
+
+    def rank(topic: str, sign_topic: str) -> list:
+        # The topic decides relevance; sign words only reorder on-topic lines
+        topic_terms = set(tokenize(topic))
+        sign_terms = set(tokenize(sign_topic))
+        scores = [score(topic_terms, doc) * (1.0 + 0.5 * score(sign_terms, doc)) for doc in docs]
+        ranked = sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True)
+        return [i for i in ranked if scores[i] > 0]
+
+    return rank
+
+
+def embedding_ranker(chunks: list):
+    from ai.embeddings import get_embedder
+
+    model = get_embedder()
+    vectors = model.encode([c["summary"] for c in chunks], normalize_embeddings=True)
+
+    def rank(topic: str, sign_topic: str) -> list:
+        scores = vectors @ model.encode([f"{topic} {sign_topic}"], normalize_embeddings=True)[0]
+        return sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True)
+
+    return rank
+
+
+def compile_index(folder: str = DOCS_DIR, scorer: str = "lexical") -> dict:
+    chunks = load_chunks(folder)
+    rank = embedding_ranker(chunks) if scorer == "embedding" else lexical_ranker(chunks)
+
+    return {
+        "docs_version": docs_version(folder),
+        "scorer": scorer,
+        "entries": {
+            key: [chunks[i] for i in rank(topic, sign_topic)[:TOP_K]]
+            for key, topic, sign_topic in queries()
+        },
+    }
+
+
+def write_index(index: dict, path: str = INDEX_PATH):
+    # Readers (backEnd's RAGEngine reloads on mtime) must never see a half-written file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(index, f, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def load_index(path: str = INDEX_PATH, folder: str = DOCS_DIR) -> dict:
+    """Returns the entries dict, recompiling first if the policy docs changed."""
+    index = None
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            index = json.load(f)
+
+    if index is None or index["docs_version"] != docs_version(folder):
+        index = compile_index(folder, scorer=index["scorer"] if index else "lexical")
+        write_index(index, path)
+
+    return index["entries"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--embedding", action="store_true", help="rank with all-MiniLM-L6-v2")
+    parser.add_argument("--docs", default=DOCS_DIR)
+    parser.add_argument("--out", default=INDEX_PATH)
+    args = parser.parse_args()
+
+    index = compile_index(args.docs, scorer="embedding" if args.embedding else "lexical")
+    write_index(index, args.out)
+    print(f"Compiled {len(index['entries'])} lookups ({index['scorer']}) to {args.out}")
@@ -0,0 +1,208 @@
+# ai/priority_pool.py
+"""
+Priority worker pools with per-class admission control, shared by both apps'
+schedulers (ai/scheduler.py, backEnd/services/scheduler.py), which only
+configure their pools, classes and routes.
+
+A request is admitted into a priority class and counted as in flight until
+it finishes, wherever it waits meanwhile (a MicroBatcher queue, a pool's
+heap) or runs. Once a class has max_queue[class] requests in flight, further
+ones are shed with Overloaded (429 + Retry-After) instead of queueing
+without bound.
+"""
+import asyncio
+import contextlib
+import heapq
+import itertools
+import math
+import threading
+import time
+from concurrent.futures import Executor, Future
+from ai import metrics
+from ai.metrics import METRICS_ENABLED
+
+# Highest priority first
+PRIORITY_CLASSES = ("interactive", "standard", "bulk")
+RANK = {name: rank for rank, name in enumerate(PRIORITY_CLASSES)}
+
+
+class Overloaded(Exception):
+    """Raised instead of queueing when a class is full; served as 429 + Retry-After."""
+
+    def __init__(self, pool: str, priority: str, retry_after: int):
+        super().__init__(f"{pool} pool is full for {priority} requests")
+        self.pool = pool
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+class PriorityPool:
+    """
+    Fixed set of worker threads fed from one priority queue: queued
+    interactive work always starts before standard, standard before bulk,
+    FIFO within a class. Each class may have at most max_queue[class]
+    requests in flight; beyond that admission sheds load with Overloaded,
+    so a burst of bulk traffic is refused rather than delaying everything
+    behind it.
+    """
+
+    def __init__(self, name: str, workers: int, max_queue: dict):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self._heap = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._depth = {c: 0 for c in PRIORITY_CLASSES}
+        self._in_flight = {c: 0 for c in PRIORITY_CLASSES}
+        self._rejected = {c: 0 for c in PRIORITY_CLASSES}
+        self._completed = {c: 0 for c in PRIORITY_CLASSES}
+        # Moving average of run time, for Retry-After
+        self._service_s = 0.05
+
+        for i in range(workers):
+            threading.Thread(target=self._work, name=f"{name}-worker-{i}", daemon=True).start()
+
+    @contextlib.contextmanager
+    def admitted(self, priority: str):
+        """
+        with pool.admitted("interactive"): await batcher.submit(...)
+        Counts the request in flight for the duration of the block.
+        """
+        self._admit(priority)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    def submit(self, priority: str, fn, *args, **kwargs) -> Future:
+        """Admits fn(...) as one request and queues it; it is in flight until it returns."""
+        self._admit(priority)
+        try:
+            future = self.enqueue(priority, fn, *args, **kwargs)
+        except BaseException:
+            self._release(priority)
+            raise
+        future.add_done_callback(lambda _: self._release(priority))
+        return future
+
+    def enqueue(self, priority: str, fn, *args, **kwargs) -> Future:
+        """Queues work for requests that were already admitted (e.g. a micro-batch); never sheds."""
+        future = Future()
+        with self._cond:
+            heapq.heappush(self._heap, (
+                RANK[priority], next(self._sequence), time.perf_counter(), priority, future, fn, args, kwargs
+            ))
+            self._depth[priority] += 1
+            self._cond.notify()
+        return future
+
+    def _admit(self, priority: str):
+        with self._cond:
+            if self._in_flight[priority] >= self.max_queue[priority]:
+                self._rejected[priority] += 1
+                raise Overloaded(self.name, priority, self._retry_after(priority))
+            self._in_flight[priority] += 1
+
+    def _release(self, priority: str):
+        with self._cond:
+            self._in_flight[priority] -= 1
+
+    def _retry_after(self, priority: str) -> int:
+        # Seconds for the workers to drain what would run before a new request of this class
+        ahead = sum(self._in_flight[c] for c in PRIORITY_CLASSES[:RANK[priority] + 1])
+        return max(1, math.ceil(ahead * self._service_s / self.workers))
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                _, _, queued, priority, future, fn, args, kwargs = heapq.heappop(self._heap)
+                self._depth[priority] -= 1
+
+            start = time.perf_counter()
+            if METRICS_ENABLED:
+                metrics.observe(f"queue_wait_{self.name}_{priority}", start - queued)
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as exc:
+                future.set_exception(exc)
+
+            with self._cond:
+                self._service_s = 0.9 * self._service_s + 0.1 * (time.perf_counter() - start)
+                self._completed[priority] += 1
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "mean_service_ms": round(self._service_s * 1000, 3),
+                "classes": {
+                    c: {
+                        "in_flight": self._in_flight[c],
+                        "queued": self._depth[c],
+                        "max_queue": self.max_queue[c],
+                        "completed": self._completed[c],
+                        "rejected": self._rejected[c],
+                    }
+                    for c in PRIORITY_CLASSES
+                },
+            }
+
+
+class Pools:
+    """
+    An app's named pools, created on first use: worker threads started at
+    import would not survive serve.py forking its workers.
+    """
+
+    def __init__(self, workers: dict, max_queue: dict):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> PriorityPool:
+        pool = self._pools.get(name)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(name)
+                if pool is None:
+                    pool = self._pools[name] = PriorityPool(name, self.workers[name], self.max_queue)
+        return pool
+
+    async def run(self, pool: str, priority: str, fn, *args, **kwargs):
+        """await pools.run("cpu", "bulk", fn, ...): fn(...) admitted and run on the pool's workers."""
+        return await asyncio.wrap_future(self.get(pool).submit(priority, fn, *args, **kwargs))
+
+    def stats(self) -> dict:
+        return {name: self.get(name).stats() for name in self.workers}
+
+    def register_gauges(self):
+        for pool in self.workers:
+            for priority in PRIORITY_CLASSES:
+                for key, metric, help_text in (
+                    ("in_flight", "xai_scheduler_in_flight", "Admitted requests not yet finished"),
+                    ("queued", "xai_scheduler_queued", "Tasks waiting for a scheduler worker"),
+                    ("rejected", "xai_scheduler_rejected", "Requests shed with 429 because the class was full"),
+                ):
+                    metrics.register_gauge(
+                        metric, lambda p=pool, c=priority, k=key: self.get(p).stats()["classes"][c][k],
+                        help_text, pool=pool, priority=priority
+                    )
+
+
+class PriorityExecutor(Executor):
+    """One priority class of a pool as an Executor for loop.run_in_executor, e.g. a MicroBatcher's."""
+
+    def __init__(self, pools: Pools, pool: str, priority: str):
+        self.pools = pools
+        self.pool = pool
+        self.priority = priority
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        # The requests in the batch were admitted one by one on arrival
+        return self.pools.get(self.pool).enqueue(self.priority, fn, *args, **kwargs)
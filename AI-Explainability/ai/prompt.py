@@ -0,0 +1,157 @@
+# ai/prompt.py
+"""
+Token-budgeted prompt assembly for the LLM narrative.
+
+Retrieved policy passages are split into sentences, near-duplicates are
+dropped, and the sentences most relevant to the decision's reasons are
+packed into XAI_PROMPT_TOKEN_BUDGET tokens. The system prompt and the
+instructions never change and come first, so the LLM server can reuse
+their cached prefix across requests; everything per-request goes last.
+
+Tokens are counted with the tokenizer.json at XAI_PROMPT_TOKENIZER (e.g.
+llama3's, read with the `tokenizers` library) or, if unset or it cannot be
+loaded, a word-piece estimate that needs nothing installed.
+"""
+import logging
+import math
+import os
+import re
+from ai.lazy import once
+from ai.policy_index import FEATURE_TOPICS, SIGN_TOPICS, tokenize
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("XAI_PROMPT_TOKEN_BUDGET", "256"))
+TOKENIZER_PATH = os.getenv("XAI_PROMPT_TOKENIZER", "")
+
+# Sentences sharing this much of their vocabulary (Jaccard) count as duplicates
+DUPLICATE_OVERLAP = 0.8
+
+SYSTEM_PROMPT = (
+    "You are a banking compliance assistant. "
+    "Explain loan decisions clearly and accurately, using only the policies provided."
+)
+
+INSTRUCTIONS = (
+    "Explain the loan decision below to the customer in simple language. "
+    "Mention the main reasons and the policies behind them."
+)
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n+")
+_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+@once
+def get_tokenizer():
+    """The configured tokenizer, or None for the estimate (also if it cannot be loaded)."""
+    if not TOKENIZER_PATH:
+        return None
+    try:
+        from tokenizers import Tokenizer
+
+        return Tokenizer.from_file(TOKENIZER_PATH)
+    except Exception as exc:
+        # Budgets stay approximate rather than every narrative failing
+        logger.warning("Cannot load tokenizer %s (%s); estimating token counts", TOKENIZER_PATH, exc)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    tokenizer = get_tokenizer()
+    if tokenizer is not None:
+        return len(tokenizer.encode(text, add_special_tokens=False).ids)
+    # BPE vocabularies (llama3: 128k) keep most words whole; ~7 chars a piece
+    return sum((len(piece) + 6) // 7 for piece in _PIECES.findall(text))
+
+
+def split_sentences(text: str) -> list:
+    sentences = (s.strip(" \t-*#") for s in _SENTENCE_BREAK.split(text))
+    return [s for s in sentences if s]
+
+
+def reason_queries(reasons) -> list:
+    """(topic terms, sign terms) per reason, as in ai.policy_index.lexical_ranker."""
+    queries = []
+    for r in reasons:
+        topic = f"{r.get('explanation', '')} {FEATURE_TOPICS.get(r.get('feature'), '')}"
+        sign = SIGN_TOPICS["positive" if r.get("impact", 0) > 0 else "negative"] if "impact" in r else ""
+        queries.append((set(tokenize(topic)), set(tokenize(sign))))
+    return queries
+
+
+def relevance(terms: set, queries: list) -> float:
+    # Best match over the reasons; the topic decides, sign words only reorder
+    norm = math.sqrt(len(terms))
+    return max(
+        (len(terms & topic) / norm * (1.0 + 0.5 * len(terms & sign) / norm) for topic, sign in queries),
+        default=0.0,
+    )
+
+
+def select_context(passages, queries, budget: int = PROMPT_TOKEN_BUDGET):
+    """
+    Returns (sentences, dropped): the deduplicated sentences of `passages`
+    (ranked best first) that fit in `budget` tokens, most relevant to the
+    reason `queries` picked first but kept in retrieval order, and how
+    many were left out.
+    """
+    candidates = []
+    seen = []
+    for rank, passage in enumerate(passages):
+        for position, sentence in enumerate(split_sentences(passage)):
+            terms = set(tokenize(sentence))
+            if not terms or any(len(terms & s) / len(terms | s) >= DUPLICATE_OVERLAP for s in seen):
+                continue
+            seen.append(terms)
+            candidates.append((-relevance(terms, queries), rank, position, sentence))
+
+    # Off-topic sentences are only used when nothing matches the reasons
+    ranked = sorted([c for c in candidates if c[0] < 0] or candidates)
+
+    chosen = []
+    used = 0
+    for candidate in ranked:
+        cost = count_tokens(candidate[3]) + 2  # "- " bullet and newline
+        if used + cost <= budget:
+            chosen.append(candidate)
+            used += cost
+
+    chosen.sort(key=lambda c: (c[1], c[2]))
+    return [c[3] for c in chosen], len(candidates) - len(chosen)
+
+
+def build_messages(decision, confidence, reasons, passages, budget: int = PROMPT_TOKEN_BUDGET):
+    """Returns (chat messages, usage) for the narrative of one decision."""
+    context, dropped = select_context(passages, reason_queries(reasons), budget)
+
+    policy_lines = "\n".join(f"- {s}" for s in context)
+    reason_lines = "\n".join(f"- {r['explanation']}" for r in reasons)
+    user = (
+        f"{INSTRUCTIONS}\n\n"
+        f"Policies:\n{policy_lines}\n\n"
+        f"Decision: {decision}\n"
+        f"Confidence: {float(confidence):.0%}\n"
+        f"Reasons:\n{reason_lines}"
+    )
+
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user},
+    ]
+    usage = {
+        "prompt_tokens": count_tokens(SYSTEM_PROMPT) + count_tokens(user),
+        "stable_prefix_tokens": count_tokens(SYSTEM_PROMPT) + count_tokens(INSTRUCTIONS),
+        "context_tokens": count_tokens(policy_lines),
+        "token_budget": budget,
+        "sentences_used": len(context),
+        "sentences_dropped": dropped,
+    }
+    return messages, usage
+
+
+def record_llm_usage(usage: dict, response):
+    """Adds what the LLM server reports; prompt_eval_count < prompt_tokens means a prefix cache hit."""
+    for key in ("prompt_eval_count", "eval_count"):
+        value = response.get(key) if hasattr(response, "get") else None
+        if value is not None:
+            usage[key] = value
@@ -1,40 +1,67 @@
-import chromadb
-from sentence_transformers import SentenceTransformer
-import ollama
+from ai import llm_pool
+from ai.embeddings import get_embedder
+from ai.lazy import once
+from ai.metrics import timed, stage_timer
+from ai.policy_index import load_index
+from ai.prompt import build_messages, record_llm_usage
 
-client = chromadb.Client()
-collection = client.get_or_create_collection("banking_policies")
+@once
+def get_collection():
+    import chromadb
 
-embedder = SentenceTransformer("all-MiniLM-L6-v2")
+    client = chromadb.Client()
+    return client.get_or_create_collection("banking_policies")
 
+@once
+def get_policy_index():
+    return load_index()
+
+@timed("retrieve_context")
 def retrieve_context(query_text):
-    results = collection.query(query_texts=[query_text], n_results=2)
-    return " ".join(results["documents"][0])
+    # Embed with the configured backend rather than chromadb's default function
+    query_embedding = get_embedder().encode([query_text])
+    results = get_collection().query(query_embeddings=query_embedding.tolist(), n_results=2)
+    return results["documents"][0]
+
+@timed("retrieve_policies")
+def retrieve_policies(reasons):
+    """
+    Policy passages for the SHAP reasons from the compiled policy index,
+    best first. Returns None if a reason has no entry, so the caller can
+    fall back to semantic search.
+    """
+    index = get_policy_index()
+    passages = {}
+    for r in reasons:
+        key = f"{r['feature']}:{'positive' if r['impact'] > 0 else 'negative'}"
+        if key not in index:
+            return None
+        for chunk in index[key]:
+            passages.setdefault(chunk["anchor"], chunk["summary"])
+    return list(passages.values())
 
-def generate_narrative(decision, confidence, reasons):
+def generate_narrative(decision, confidence, reasons, usage=None):
+    """
+    RAG + llama3 explanation. If `usage` is a dict it is filled with the
+    prompt token counts (see ai.prompt.build_messages).
+    """
     query_text = f"""
     Decision: {decision}
     Confidence: {confidence}
     Reasons: {', '.join([r['explanation'] for r in reasons])}
     """
 
-    context = retrieve_context(query_text)
+    passages = retrieve_policies(reasons)
+    if passages is None:
+        passages = retrieve_context(query_text)
 
-    prompt = f"""
-    You are a banking assistant.
+    messages, prompt_usage = build_messages(decision, confidence, reasons, passages)
 
-    Policies:
-    {context}
-
-    Explain the loan decision clearly to a customer.
-    """
+    with stage_timer("ollama_chat"):
+        response = llm_pool.chat(messages)
 
-    response = ollama.chat(
-        model="llama3",
-        messages=[
-            {"role": "system", "content": "Explain decisions clearly and accurately."},
-            {"role": "user", "content": prompt}
-        ]
-    )
+    record_llm_usage(prompt_usage, response)
+    if usage is not None:
+        usage.update(prompt_usage)
 
     return response["message"]["content"]
@@ -1,17 +1,21 @@
-import chromadb
-from sentence_transformers import SentenceTransformer
-from openai import OpenAI
 from fastapi import FastAPI
 import os
-import ollama
-import pandas as pd
-
-client = chromadb.Client()
-collection = client.get_or_create_collection(name="banking_policies")
-
+from ai import llm_pool
+# The same instance as ai/rag.py's, so the model is only loaded once
+from ai.embeddings import get_embedder as get_model
+from ai.lazy import once
+from ai.metrics import stage_timer, timed
+from ai.prompt import build_messages, record_llm_usage
+
+# from openai import OpenAI
 # AI_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
+@once
+def get_collection():
+    import chromadb
+
+    client = chromadb.Client()
+    return client.get_or_create_collection(name="banking_policies")
 
 def load_docs(folder):
     docs = []
@@ -20,16 +24,20 @@ def load_docs(folder):
             docs.append(f.read())
     return docs
 
-docs = load_docs("rag_docs")
-embeddings = model.encode(docs)
+@once
+def build_index():
+    docs = load_docs("rag_docs")
+    embeddings = get_model().encode(docs)
 
-collection.add(
-    documents=docs,
-    embeddings=embeddings.tolist(),
-    ids=[f"doc_{i}" for i in range(len(docs))]
-)
+    collection = get_collection()
+    collection.add(
+        documents=docs,
+        embeddings=embeddings.tolist(),
+        ids=[f"doc_{i}" for i in range(len(docs))]
+    )
+    return collection
 
-def generate_narrative(decision, confidence, reasons):
+def generate_narrative(decision, confidence, reasons, usage=None):
     query_text = f"""
     Decision: {decision}
     Confidence: {confidence}
@@ -37,44 +45,36 @@ def generate_narrative(decision, confidence, reasons):
     {', '.join([r['explanation'] for r in reasons])}
     """
 
-    results = collection.query(query_texts=[query_text], n_results=2)
-    context = " ".join(results["documents"][0])
+    with stage_timer("retrieve_context"):
+        collection = build_index()
+        results = collection.query(query_embeddings=get_model().encode([query_text]).tolist(), n_results=2)
 
-    prompt = f"""
-    Using the following banking policies:
-    {context}
+    # Whole documents are cut down to their most relevant sentences
+    messages, prompt_usage = build_messages(decision, confidence, reasons, results["documents"][0])
+    explanation = call_llm(messages, prompt_usage)
 
-    Explain this loan decision clearly to a customer in simple language.
-    """
+    if usage is not None:
+        usage.update(prompt_usage)
+    return explanation
 
-    return call_llm(prompt)
-
-def call_llm(prompt):
-    response = ollama.chat(
-        model="llama3",
-        messages=[
-            {
-                "role": "system",
-                "content": "You are a banking compliance assistant. Explain decisions clearly and accurately."
-            },
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ]
-    )
+@timed("ollama_chat")
+def call_llm(messages, usage=None):
+    response = llm_pool.chat(messages)
+    if usage is not None:
+        record_llm_usage(usage, response)
     return response["message"]["content"]
 
 app = FastAPI()
 
 @app.post("/predict")
 def predict(application: dict):
+    import pandas as pd
 
     # Convert input to model format
     X = pd.DataFrame([application]).drop(columns=["applicationId"])
 
     # Model prediction
-    prob = model.predict_proba(X)[0][1]
+    prob = get_model().predict_proba(X)[0][1]
     decision = "APPROVED" if prob >= 0.5 else "REJECTED"
 
     # SHAP reasons
@@ -103,7 +103,10 @@ if __name__ == "__main__":
         {"explanation": "Manageable debt level"}
     ]
 
-    explanation = generate_narrative(decision, confidence, reasons)
+    usage = {}
+    explanation = generate_narrative(decision, confidence, reasons, usage)
     print("\n=== MODEL EXPLANATION ===\n")
     print(explanation)
+    print("\n=== PROMPT TOKENS ===\n")
+    print(usage)
 
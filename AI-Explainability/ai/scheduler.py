@@ -0,0 +1,46 @@
+# ai/scheduler.py
+"""
+Admission control for the API: priority classes per route, separate
+bounded worker pools for model work ("cpu") and LLM calls ("llm"), and
+load shedding (429 + Retry-After) once a class is full. The pools
+themselves are ai/priority_pool.py.
+
+    XAI_CPU_WORKERS / XAI_LLM_WORKERS             threads per pool
+    XAI_MAX_QUEUE_{INTERACTIVE,STANDARD,BULK}     requests in flight per class
+"""
+import os
+from ai.priority_pool import PRIORITY_CLASSES, Overloaded, PriorityExecutor, PriorityPool, Pools  # noqa: F401
+
+WORKERS = {
+    "cpu": int(os.getenv("XAI_CPU_WORKERS", str(os.cpu_count() or 4))),  # predict + SHAP batches
+    "llm": int(os.getenv("XAI_LLM_WORKERS", "32")),  # narratives waiting on the LLM server
+}
+MAX_QUEUE = {
+    "interactive": int(os.getenv("XAI_MAX_QUEUE_INTERACTIVE", "256")),
+    "standard": int(os.getenv("XAI_MAX_QUEUE_STANDARD", "128")),
+    "bulk": int(os.getenv("XAI_MAX_QUEUE_BULK", "32")),
+}
+ROUTE_PRIORITY = {
+    "predict": "interactive",  # decision and SHAP reasons
+    "predict_llm": "standard",  # LLM-written narratives
+}
+
+pools = Pools(WORKERS, MAX_QUEUE)
+pools.register_gauges()
+
+
+def get_pool(name: str) -> PriorityPool:
+    return pools.get(name)
+
+
+def executor(pool: str, priority: str) -> PriorityExecutor:
+    return PriorityExecutor(pools, pool, priority)
+
+
+async def run(pool: str, priority: str, fn, *args, **kwargs):
+    """await run("cpu", "bulk", fn, ...): fn(...) admitted and run on the pool's workers."""
+    return await pools.run(pool, priority, fn, *args, **kwargs)
+
+
+def stats() -> dict:
+    return pools.stats()
@@ -0,0 +1,100 @@
+# ai/templates.py
+"""
+Deterministic narrative templates: a zero-LLM alternative to
+ai.rag.generate_narrative for the common case where the explanation is
+just the top SHAP reasons plus the policy lines behind them.
+"""
+from ai.rag import get_policy_index
+
+# Signed SHAP impact > 0 pushes towards APPROVED. Only the phrasing lives
+# here: the policy cited for a reason is the first passage ai.policy_index
+# compiled for its feature and sign, so it follows rag_docs.
+FEATURE_TEMPLATES = {
+    "ctosScore": {"positive": "Strong credit history", "negative": "Weak credit history"},
+    "newDebtServiceRatio": {
+        "positive": "Post-loan debt remains manageable",
+        "negative": "High debt burden after loan",
+    },
+    "debtServiceRatio": {
+        "positive": "Existing debt commitments are manageable",
+        "negative": "Existing debt commitments are high",
+    },
+    "employmentTenureMonths": {
+        "positive": "Long and stable employment history",
+        "negative": "Short employment history",
+    },
+    "employmentStabilityScore": {"positive": "Reliable income source", "negative": "Less stable income source"},
+    "instalmentToIncomeRatio": {
+        "positive": "Loan instalment is affordable",
+        "negative": "Loan instalment is too high relative to income",
+    },
+    "cashReserveMonths": {"positive": "Healthy cash reserves", "negative": "Limited cash reserves"},
+    "savingsAmount": {"positive": "Healthy savings", "negative": "Low savings"},
+    "totalCreditUtilization": {
+        "positive": "Responsible use of existing credit",
+        "negative": "High use of existing credit",
+    },
+    "numberOfLatePayments": {"positive": "Good repayment record", "negative": "Record of late payments"},
+    "totalMonthlyIncome": {
+        "positive": "Sufficient income level",
+        "negative": "Income is low for the requested loan",
+    },
+}
+
+
+def sign_of(reason) -> str:
+    return "positive" if reason["impact"] > 0 else "negative"
+
+
+def policy_citation(feature, sign):
+    """The policy passage behind a feature's sign, or None if the index has none."""
+    passages = get_policy_index().get(f"{feature}:{sign}")
+    return passages[0]["summary"] if passages else None
+
+
+OPENINGS = {
+    "APPROVED": "Your loan application has been approved (approval confidence {confidence:.0%}).",
+    "REJECTED": "We are unable to approve your loan application at this time (approval confidence {confidence:.0%}).",
+}
+
+CLOSINGS = {
+    "APPROVED": "",
+    "REJECTED": "Improving the factors above would increase your chances of approval in a future application.",
+}
+
+
+def covers(decision, reasons) -> bool:
+    return decision in OPENINGS and bool(reasons) and all(
+        r["feature"] in FEATURE_TEMPLATES and policy_citation(r["feature"], sign_of(r)) for r in reasons
+    )
+
+
+def render_narrative(decision, confidence, reasons):
+    """
+    Returns the customer explanation, or None when a reason (or the
+    decision) has no template and the caller should fall back to the LLM.
+    """
+    if not covers(decision, reasons):
+        return None
+
+    strengths = []
+    concerns = []
+    policies = []
+    for r in reasons:
+        sign = sign_of(r)
+        phrase = FEATURE_TEMPLATES[r["feature"]][sign]
+        policy = policy_citation(r["feature"], sign)
+        (strengths if sign == "positive" else concerns).append(phrase.lower())
+        if policy not in policies:
+            policies.append(policy)
+
+    parts = [OPENINGS[decision].format(confidence=confidence)]
+    if strengths:
+        parts.append(f"Factors in your favour: {'; '.join(strengths)}.")
+    if concerns:
+        parts.append(f"Factors against: {'; '.join(concerns)}.")
+    parts.append("Relevant policy: " + " ".join(policies))
+    if CLOSINGS[decision]:
+        parts.append(CLOSINGS[decision])
+
+    return " ".join(parts)
@@ -0,0 +1,51 @@
+# ai/warmup.py
+import threading
+
+def warm_up(background: bool = False, rag: bool = True):
+    """
+    Loads everything the ai package otherwise loads lazily on first use:
+    the XGBoost model, shap, and (if rag) the policy index, embedder and
+    LLM client pool. With background=True it runs in a daemon thread and
+    returns the thread, so the server can accept traffic meanwhile.
+    """
+    if background:
+        thread = threading.Thread(target=_warm_up, args=(rag,), name="ai-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    _warm_up(rag)
+
+def preload():
+    """
+    The part of warm_up that is safe to run before forking (serve.py's
+    parent): read-only artifacts the workers then share copy-on-write, i.e.
+    the XGBoost model, shap, the policy index and the embedder weights.
+    The chromadb collection (a sqlite connection) and the LLM client pool
+    (sockets and a health-check thread) are per process, so each worker
+    creates its own on first use, or at start-up with AI_WARMUP=1.
+    """
+    from ai.model import get_model
+    from ai.rag import get_embedder, get_policy_index
+
+    get_model()
+    import shap  # noqa: F401
+
+    get_policy_index()
+    get_embedder()
+
+def _warm_up(rag: bool):
+    from ai.model import get_model
+
+    get_model()
+    import shap  # noqa: F401
+
+    if rag:
+        from ai import rag as rag_module
+        from ai.rag_index import build_index
+        from ai.llm_pool import get_pool
+
+        build_index()
+        rag_module.get_policy_index()
+        rag_module.get_collection()
+        rag_module.get_embedder()
+        get_pool()
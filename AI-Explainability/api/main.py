@@ -1,14 +1,88 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-from typing import Dict
-from ai.pipeline import run_pipeline
+import math
+import os
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel, Field
+from typing import Dict, Literal, Optional
+from functools import partial
+from ai.batching import MicroBatcher
+from ai.pipeline import score_batch, finish_pipeline, needs_llm
+from ai.warmup import warm_up
+from ai import explain_cache, llm_pool, metrics, monitor, scheduler
+from ai.llm_pool import LLMUnavailable
+from ai.scheduler import ROUTE_PRIORITY, Overloaded
 
 app = FastAPI()
 
+# One batcher per detail level so decision-only rows never pay for SHAP
+# Both run on the "cpu" scheduler pool, so LLM calls never hold up model work
+batchers = {
+    "decision": MicroBatcher(
+        partial(score_batch, detail="decision"), executor=scheduler.executor("cpu", ROUTE_PRIORITY["predict"])
+    ),
+    "reasons": MicroBatcher(
+        partial(score_batch, detail="reasons"), executor=scheduler.executor("cpu", ROUTE_PRIORITY["predict"])
+    ),
+}
+
+for _detail, _batcher in batchers.items():
+    metrics.register_gauge(
+        "xai_batch_queue_depth", lambda b=_batcher: b.stats()["queue_depth"],
+        "Requests waiting for a micro-batch", detail=_detail
+    )
+    metrics.register_gauge(
+        "xai_batch_mean_size", lambda b=_batcher: b.stats()["mean_batch_size"],
+        "Mean rows per micro-batch", detail=_detail
+    )
+
+metrics.register_gauge(
+    "xai_explain_cache_hit_rate", lambda: explain_cache.get_cache().stats()["hit_rate"],
+    "Share of SHAP explanations served from the explanation cache"
+)
+metrics.register_gauge(
+    "xai_explain_cache_bytes", lambda: explain_cache.get_cache().stats()["bytes"],
+    "Approximate memory held by the explanation cache"
+)
+metrics.register_gauge(
+    "xai_explain_cache_mismatches", lambda: explain_cache.get_cache().stats()["mismatches"],
+    "Sampled cache hits that differed from a fresh SHAP run"
+)
+
+@app.exception_handler(Overloaded)
+def overloaded(request: Request, exc: Overloaded):
+    return JSONResponse(
+        status_code=429, content={"detail": str(exc)}, headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.exception_handler(LLMUnavailable)
+def llm_unavailable(request: Request, exc: LLMUnavailable):
+    # Unhealthy servers are retried by the next health check
+    return JSONResponse(
+        status_code=503, content={"detail": f"LLM unavailable: {exc}"},
+        headers={"Retry-After": str(math.ceil(llm_pool.HEALTH_INTERVAL_S))}
+    )
+
+@app.on_event("startup")
+def start_warm_up():
+    # AI_WARMUP=1 loads the model, shap and RAG index in the background
+    # instead of on the first /predict
+    if os.getenv("AI_WARMUP", "0") == "1":
+        warm_up(background=True)
+
+@app.on_event("startup")
+def start_drift_monitor():
+    if monitor.MONITOR_ENABLED:
+        drift = monitor.get_monitor()
+        drift.restore()
+        drift.start_snapshots()
+
 class FinancialInfo(BaseModel):
-    monthlyIncome: float
+    # Incomes and tenure divide the derived metrics: zero would be a 500 or inf/nan features
+    monthlyIncome: float = Field(gt=0)
     totalCommitments: float
     savingsAmount: float
+    # Gross income for the ratios; monthlyIncome when not given
+    monthlyGrossIncome: Optional[float] = Field(None, gt=0)
 
 class CreditInfo(BaseModel):
     ctosScore: int
@@ -22,6 +96,10 @@ class EmploymentInfo(BaseModel):
 
 class LoanDetails(BaseModel):
     loanAmount: float
+    # With requestedTenure and annualInterestRate (or no calculatedMetrics) the metrics are
+    # derived server-side (ai/derived_metrics.py)
+    requestedTenure: Optional[int] = Field(None, gt=0)
+    annualInterestRate: Optional[float] = None
 
 class CalculatedMetrics(BaseModel):
     debtServiceRatio: float
@@ -35,9 +113,51 @@ class Application(BaseModel):
     creditInformation: CreditInfo
     employmentInformation: EmploymentInfo
     loanDetails: LoanDetails
-    calculatedMetrics: CalculatedMetrics
+    calculatedMetrics: Optional[CalculatedMetrics] = None
 
 @app.post("/predict")
-def predict(application: Application):
+async def predict(
+    application: Application,
+    detail: Literal["decision", "reasons", "narrative"] = "narrative",
+    narrator: Literal["template", "llm"] = "template"
+):
+    if application.calculatedMetrics is None and application.loanDetails.requestedTenure is None:
+        raise HTTPException(status_code=422, detail="calculatedMetrics or loanDetails.requestedTenure is required")
+
     # Convert Pydantic model to dict
-    return run_pipeline(application.dict())
\ No newline at end of file
+    # Predict + SHAP are coalesced with concurrent requests, the narrative is per request.
+    # Shed before doing any work if too many predictions are already waiting or running;
+    # the batcher queue is bounded by the same count
+    batcher = batchers["decision"] if detail == "decision" else batchers["reasons"]
+    with scheduler.get_pool("cpu").admitted(ROUTE_PRIORITY["predict"]):
+        scored = await batcher.submit(application.dict())
+
+    # Templates render in microseconds; only an LLM call is worth a thread hop
+    if not needs_llm(scored, detail, narrator):
+        return finish_pipeline(scored, detail, narrator)
+    return await scheduler.run("llm", ROUTE_PRIORITY["predict_llm"], finish_pipeline, scored, detail, narrator)
+
+@app.get("/predict/batching")
+def batching_stats():
+    return {detail: batcher.stats() for detail, batcher in batchers.items()}
+
+@app.get("/predict/scheduler")
+def scheduler_stats():
+    return scheduler.stats()
+
+@app.get("/predict/llm")
+def llm_pool_stats():
+    return llm_pool.get_pool().stats()
+
+@app.get("/predict/cache")
+def explain_cache_stats():
+    return explain_cache.get_cache().stats()
+
+@app.get("/monitor/drift")
+def drift_report():
+    # Built from fixed-size sketches: cost does not depend on traffic so far
+    return monitor.get_monitor().merged_report()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
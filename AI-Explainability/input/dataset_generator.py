@@ -1,12 +1,46 @@
 import json
+import os
 import random
+import sys
 from datetime import datetime, timedelta
 import numpy as np
 
+# The instalment formula is the serving path's (ai/derived_metrics.py), so the
+# recorded calculatedMetrics are what the API derives. The generator also runs
+# as a script and is imported from input/, hence the app directory on the path.
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.append(APP_DIR)
+from ai.derived_metrics import monthly_instalment, monthly_instalment_batch
+
+RISK_PROFILES = ["low_risk", "medium_risk", "high_risk", "very_high_risk"]
+LOAN_TENURES = [12, 24, 36, 48, 60, 72, 84]
+
+# dataset_filter.py output columns (creditScoreCategory 0-3, approvalDecision 1/0)
+FILTER_COLUMNS = [
+    "applicationId",
+    "totalMonthlyIncome",
+    "totalCommitments",
+    "debtServiceRatio",
+    "newDebtServiceRatio",
+    "savingsAmount",
+    "cashReserveMonths",
+    "ctosScore",
+    "creditScoreCategory",
+    "totalCreditUtilization",
+    "numberOfLatePayments",
+    "employmentTenureMonths",
+    "employmentStabilityScore",
+    "loanAmount",
+    "instalmentToIncomeRatio",
+    "approvalDecision"
+]
+
 class LoanDataGenerator:
     def __init__(self, seed=42):
         random.seed(seed)
         np.random.seed(seed)
+        self.rng = np.random.default_rng(seed)
 
         # Reference data
         self.names = [
@@ -28,8 +62,11 @@ class LoanDataGenerator:
 
     def generate_risk_profile(self):
         """Generate a risk profile that determines approval likelihood"""
-        profile = random.choice(["low_risk", "medium_risk", "high_risk", "very_high_risk"])
+        profile = random.choice(RISK_PROFILES)
+        return self.risk_profile(profile)
 
+    def risk_profile(self, profile):
+        """Income, CTOS, DSR and tenure ranges of a named risk profile"""
         if profile == "low_risk":
             return {
                 "profile": profile,
@@ -164,15 +201,13 @@ class LoanDataGenerator:
 
         # Loan details
         loan_amount = random.uniform(5000, 100000)
-        tenure = random.choice([12, 24, 36, 48, 60, 72, 84])
+        tenure = random.choice(LOAN_TENURES)
 
         # Calculate monthly instalment (simplified)
         interest_rate = random.uniform(3.5, 8.5) / 100
-        monthly_rate = interest_rate / 12
-        n_payments = tenure
-        monthly_instalment = loan_amount * (monthly_rate * (1 + monthly_rate)**n_payments) / ((1 + monthly_rate)**n_payments - 1)
+        instalment = monthly_instalment(loan_amount, interest_rate, tenure)
 
-        new_dsr = (total_commitments + monthly_instalment) / gross_income
+        new_dsr = (total_commitments + instalment) / gross_income
 
         # Credit info
         ctos_score = int(random.uniform(*risk_profile["ctos_range"]))
@@ -216,6 +251,7 @@ class LoanDataGenerator:
                 "currency": "MYR",
                 "requestedTenure": tenure,
                 "tenureUnit": "months",
+                "annualInterestRate": round(interest_rate, 4),
                 "purpose": random.choice(self.loan_purposes),
                 "loanToIncomeRatio": round(loan_amount / (gross_income * 12), 2)
             },
@@ -288,11 +324,11 @@ class LoanDataGenerator:
             },
 
             "calculatedMetrics": {
-                "monthlyLoanInstalment": round(monthly_instalment, 2),
-                "instalmentToIncomeRatio": round(monthly_instalment / gross_income, 3),
-                "totalCommitmentsAfterLoan": round(total_commitments + monthly_instalment, 2),
+                "monthlyLoanInstalment": round(instalment, 2),
+                "instalmentToIncomeRatio": round(instalment / gross_income, 3),
+                "totalCommitmentsAfterLoan": round(total_commitments + instalment, 2),
                 "newDebtServiceRatio": round(new_dsr, 3),
-                "cashReserveMonths": round(savings / (total_commitments + monthly_instalment), 1) if (total_commitments + monthly_instalment) > 0 else 999
+                "cashReserveMonths": round(savings / (total_commitments + instalment), 1) if (total_commitments + instalment) > 0 else 999
             }
         }
 
@@ -315,6 +351,143 @@ class LoanDataGenerator:
             dataset.append(self.generate_application(i))
         return dataset
 
+    def calculate_approval_columns(self, columns, approval_prob):
+        """calculate_approval over whole columns; returns (approved, confidence, score)"""
+        ctos = columns["ctosScore"]
+        new_dsr = columns["newDebtServiceRatio"]
+        tenure = columns["employmentTenureMonths"]
+        history = columns["loanRepaymentHistory"]
+
+        score = np.select([ctos >= 720, ctos >= 650, ctos >= 550], [30, 20, 10], 0)
+        score += np.select([new_dsr <= 0.4, new_dsr <= 0.6], [25, 15], 0)
+        score += np.select([tenure >= 24, tenure >= 12], [15, 8], 0)
+        # loanRepaymentHistory is "no_history" for non-customers
+        score += np.select([history == "excellent", history == "good"], [15, 10], 0)
+        score += np.where(columns["savingsAmount"] >= columns["loanAmount"] * 0.3, 10, 0)
+        score -= np.where(columns["previousBankruptcy"], 50, 0)
+        score -= np.where(columns["activeJudgements"], 30, 0)
+        score -= np.where(columns["numberOfLatePayments"] > 3, 20, 0)
+
+        confidence = np.clip(approval_prob + (score - 50) / 100, 0.05, 0.95)
+        approved = self.rng.random(len(score)) < confidence
+        return approved, confidence, score
+
+    def generate_columns(self, n_samples=1000, start_id=1, output="pandas"):
+        """
+        Column-wise generate_dataset: draws every field for all rows at once
+        with self.rng and returns the dataset_filter.py columns (FILTER_COLUMNS)
+        as a pandas DataFrame (output="pandas"), a pyarrow Table
+        (output="arrow") or a dict of NumPy arrays (output="numpy").
+
+        Same distributions as generate_application, but a different random
+        stream, so rows do not match the record-wise generator one for one.
+        """
+        rng = self.rng
+        n = n_samples
+
+        # Risk profile parameters as per-row columns
+        profiles = [self.risk_profile(p) for p in RISK_PROFILES]
+        profile_idx = rng.integers(0, len(profiles), n)
+
+        def column(key, i=None):
+            values = np.array([p[key] if i is None else p[key][i] for p in profiles])
+            return values[profile_idx]
+
+        # Employment
+        employment_months = rng.integers(column("employment_months", 0), column("employment_months", 1) + 1)
+
+        # Financial
+        gross_income = rng.uniform(column("income_range", 0), column("income_range", 1))
+        net_income = gross_income * rng.uniform(0.75, 0.85, n)
+        other_income = np.where(rng.random(n) > 0.6, rng.uniform(0, gross_income * 0.3), 0)
+
+        # Existing commitments
+        housing_loan = np.where(rng.random(n) > 0.4, rng.uniform(800, 2500, n), 0)
+        car_loan = np.where(rng.random(n) > 0.5, rng.uniform(500, 1500, n), 0)
+        credit_card = np.where(rng.random(n) > 0.3, rng.uniform(200, 800, n), 0)
+        other_commitments = rng.uniform(0, 500, n)
+
+        total_commitments = housing_loan + car_loan + credit_card + other_commitments
+        dsr = total_commitments / gross_income
+
+        # Loan details
+        loan_amount = rng.uniform(5000, 100000, n)
+        tenure = rng.choice(LOAN_TENURES, n)
+        interest_rate = rng.uniform(3.5, 8.5, n) / 100
+        instalment = monthly_instalment_batch(loan_amount, interest_rate, tenure)
+        commitments_after_loan = total_commitments + instalment
+        new_dsr = commitments_after_loan / gross_income
+
+        # Credit info
+        ctos_score = rng.uniform(column("ctos_range", 0), column("ctos_range", 1)).astype(np.int64)
+
+        # Banking relationship
+        is_existing = rng.random(n) > 0.3
+        history = np.where(
+            is_existing,
+            np.select([ctos_score >= 700, ctos_score >= 600], ["excellent", "good"], "fair"),
+            "no_history"
+        )
+        late_payments = np.select(
+            [history == "good", history == "fair"],
+            [rng.integers(0, 3, n), rng.integers(1, 6, n)],
+            0
+        )
+
+        # Assets
+        savings = rng.uniform(1000, loan_amount * 0.8)
+
+        # Scored on the rounded values, as calculate_approval sees them in the record
+        new_dsr = np.round(new_dsr, 3)
+        columns = {
+            "ctosScore": ctos_score,
+            "newDebtServiceRatio": new_dsr,
+            "employmentTenureMonths": employment_months,
+            "loanRepaymentHistory": history,
+            "savingsAmount": np.round(savings, 2),
+            "loanAmount": np.round(loan_amount, 2),
+            "previousBankruptcy": rng.random(n) < 0.02,
+            "activeJudgements": rng.random(n) < 0.03,
+            "numberOfLatePayments": late_payments,
+        }
+        approved, _, _ = self.calculate_approval_columns(columns, column("approval_prob"))
+
+        ids = np.arange(start_id, start_id + n).astype(str)
+        data = {
+            "applicationId": np.char.add("LA-2026-", np.char.zfill(ids, 6)),
+            "totalMonthlyIncome": np.round(net_income + other_income, 2),
+            "totalCommitments": np.round(total_commitments, 2),
+            "debtServiceRatio": np.round(dsr, 3),
+            "newDebtServiceRatio": new_dsr,
+            "savingsAmount": columns["savingsAmount"],
+            "cashReserveMonths": np.where(
+                commitments_after_loan > 0, np.round(savings / commitments_after_loan, 1), 999
+            ),
+            "ctosScore": ctos_score,
+            "creditScoreCategory": np.select(
+                [ctos_score >= 750, ctos_score >= 650, ctos_score >= 550], [3, 2, 1], 0
+            ),
+            "totalCreditUtilization": np.round(rng.uniform(0.1, 0.7, n), 2),
+            "numberOfLatePayments": late_payments,
+            "employmentTenureMonths": employment_months,
+            "employmentStabilityScore": np.round(np.minimum(1.0, employment_months / 60), 2),
+            "loanAmount": columns["loanAmount"],
+            "instalmentToIncomeRatio": np.round(instalment / gross_income, 3),
+            "approvalDecision": approved.astype(np.int64),
+        }
+
+        if output == "numpy":
+            return data
+        if output == "arrow":
+            import pyarrow as pa
+
+            return pa.table(data)
+        if output == "pandas":
+            import pandas as pd
+
+            return pd.DataFrame(data, columns=FILTER_COLUMNS)
+        raise ValueError(f"output must be 'pandas', 'arrow' or 'numpy', got {output!r}")
+
     def save_dataset(self, dataset, filename="loan_applications.json"):
         """Save dataset to JSON file"""
         with open(filename, 'w') as f:
@@ -0,0 +1,12 @@
+import os
+import sys
+
+# Run from anywhere: the app's packages (ai, api) import from the app directory,
+# as under `uvicorn api.main:app`
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+# Data paths (ai/policy_index.json, rag_docs/) are relative to the app directory,
+# which is the working directory of the server (serve.py chdirs there)
+os.chdir(APP_DIR)
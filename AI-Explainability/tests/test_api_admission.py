@@ -0,0 +1,59 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from ai import scheduler  # noqa: E402
+from api.main import app  # noqa: E402
+
+APPLICATION = {
+    "applicationId": "LA-2026-000001",
+    "financialInformation": {"monthlyIncome": 11480.23, "totalCommitments": 1659.84, "savingsAmount": 34661.84},
+    "creditInformation": {"ctosScore": 776, "creditScoreCategory": 3, "creditUtilization": 0.58, "latePayments": 0},
+    "employmentInformation": {"tenureMonths": 58, "stabilityScore": 0.97},
+    "loanDetails": {"loanAmount": 71660.53},
+    "calculatedMetrics": {
+        "debtServiceRatio": 0.121,
+        "newDebtServiceRatio": 0.347,
+        "cashReserveMonths": 7.3,
+        "instalmentToIncomeRatio": 0.226,
+    },
+}
+
+
+def test_full_interactive_class_returns_429_with_retry_after(monkeypatch):
+    monkeypatch.setitem(scheduler.MAX_QUEUE, "interactive", 0)
+
+    response = TestClient(app).post("/predict?detail=decision", json=APPLICATION)
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert "interactive" in response.json()["detail"]
+    assert scheduler.stats()["cpu"]["classes"]["interactive"]["rejected"] >= 1
+
+
+def test_missing_metrics_and_tenure_is_422_not_shed(monkeypatch):
+    monkeypatch.setitem(scheduler.MAX_QUEUE, "interactive", 0)
+    application = {**APPLICATION, "calculatedMetrics": None}
+
+    response = TestClient(app).post("/predict?detail=decision", json=application)
+
+    assert response.status_code == 422
+
+
+def test_unavailable_llm_returns_503_with_retry_after(monkeypatch):
+    from ai import pipeline
+    from ai.llm_pool import LLMUnavailable
+
+    def unavailable(*args, **kwargs):
+        raise LLMUnavailable("http://127.0.0.1:11434: connection refused")
+
+    monkeypatch.setattr(pipeline, "generate_narrative", unavailable)
+
+    response = TestClient(app).post("/predict?narrator=llm", json=APPLICATION)
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert "connection refused" in response.json()["detail"]
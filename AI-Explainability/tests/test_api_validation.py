@@ -0,0 +1,22 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from api.main import app  # noqa: E402
+from test_api_admission import APPLICATION  # noqa: E402
+
+
+@pytest.mark.parametrize("section, field", [
+    ("loanDetails", "requestedTenure"),
+    ("financialInformation", "monthlyIncome"),
+    ("financialInformation", "monthlyGrossIncome"),
+])
+def test_zero_divisors_are_422(section, field):
+    application = {**APPLICATION, section: {**APPLICATION[section], field: 0}}
+
+    response = TestClient(app).post("/predict?detail=decision", json=application)
+
+    assert response.status_code == 422
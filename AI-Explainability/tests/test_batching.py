@@ -0,0 +1,99 @@
+import asyncio
+import threading
+
+from ai.batching import MicroBatcher
+
+
+def test_concurrent_submits_share_one_batch():
+    calls = []
+
+    def double(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(double, max_batch_size=8, max_wait_ms=50)
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+    assert asyncio.run(main()) == [0, 2, 4, 6, 8]
+    assert calls == [[0, 1, 2, 3, 4]]
+    assert batcher.stats()["batch_size_histogram"] == {5: 1}
+
+
+def test_batches_are_capped_at_max_batch_size():
+    batcher = MicroBatcher(lambda items: items, max_batch_size=4, max_wait_ms=50)
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+
+    assert asyncio.run(main()) == list(range(10))
+    assert batcher.stats()["batch_size_histogram"] == {2: 1, 4: 2}
+
+
+def test_batch_error_reaches_every_caller():
+    def fail(items):
+        raise RuntimeError("model down")
+
+    batcher = MicroBatcher(fail, max_wait_ms=10)
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_batcher_survives_a_new_event_loop():
+    batcher = MicroBatcher(lambda items: items, max_wait_ms=1)
+    assert asyncio.run(batcher.submit(1)) == 1
+    assert asyncio.run(batcher.submit(2)) == 2
+
+
+def test_items_queued_on_a_running_loop_are_served_after_a_switch():
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow(items):
+        started.set()
+        release.wait(5)
+        return items
+
+    batcher = MicroBatcher(slow, max_batch_size=1, max_wait_ms=1)
+    old = asyncio.new_event_loop()
+    thread = threading.Thread(target=old.run_forever)
+    thread.start()
+    try:
+        first = asyncio.run_coroutine_threadsafe(batcher.submit(1), old)
+        second = asyncio.run_coroutine_threadsafe(batcher.submit(2), old)
+        assert started.wait(5)  # 1 is in batch_fn, 2 still queued
+        old_worker = batcher._worker
+
+        async def main():
+            task = asyncio.ensure_future(batcher.submit(3))
+            await asyncio.sleep(0)  # the switch happens in submit
+            release.set()
+            return await task
+
+        assert asyncio.run(main()) == 3
+        assert first.result(5) == 1
+        assert second.result(5) == 2
+        # The old worker exits once its queue is served
+        asyncio.run_coroutine_threadsafe(asyncio.wait_for(asyncio.shield(old_worker), 5), old).result(5)
+    finally:
+        old.call_soon_threadsafe(old.stop)
+        thread.join(5)
+        old.close()
+
+
+def test_items_queued_on_a_closed_loop_fail():
+    batcher = MicroBatcher(lambda items: items, max_wait_ms=1)
+    old = asyncio.new_event_loop()
+    future = old.create_future()
+    batcher._loop = old
+    batcher._queue = asyncio.Queue()
+    batcher._queue.put_nowait((1, future))
+    old.close()
+
+    assert asyncio.run(batcher.submit(2)) == 2
+    assert isinstance(future.exception(), RuntimeError)
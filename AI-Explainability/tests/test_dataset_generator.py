@@ -0,0 +1,110 @@
+import ast
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from input.dataset_generator import FILTER_COLUMNS, LoanDataGenerator
+
+# dataset_filter.py: record fields behind each FILTER_COLUMNS column
+RECORD_FIELDS = {
+    "applicationId": ("applicationId",),
+    "totalMonthlyIncome": ("financialInformation", "totalMonthlyIncome"),
+    "totalCommitments": ("financialInformation", "monthlyCommitments", "totalCommitments"),
+    "debtServiceRatio": ("financialInformation", "debtServiceRatio"),
+    "newDebtServiceRatio": ("calculatedMetrics", "newDebtServiceRatio"),
+    "savingsAmount": ("financialInformation", "savingsAmount"),
+    "cashReserveMonths": ("calculatedMetrics", "cashReserveMonths"),
+    "ctosScore": ("creditInformation", "ctosScore"),
+    "creditScoreCategory": ("creditInformation", "creditScoreCategory"),
+    "totalCreditUtilization": ("creditInformation", "totalCreditUtilization"),
+    "numberOfLatePayments": ("existingBankingRelationship", "numberOfLatePayments"),
+    "employmentTenureMonths": ("employmentInformation", "employmentTenureMonths"),
+    "employmentStabilityScore": ("employmentInformation", "employmentStabilityScore"),
+    "loanAmount": ("loanDetails", "loanAmount"),
+    "instalmentToIncomeRatio": ("calculatedMetrics", "instalmentToIncomeRatio"),
+    "approvalDecision": ("targetVariable", "approvalDecision"),
+}
+CATEGORIES = {"excellent": 3, "good": 2, "fair": 1, "poor": 0}
+DECISIONS = {"approved": 1, "rejected": 0}
+
+INT_COLUMNS = {"ctosScore", "creditScoreCategory", "numberOfLatePayments", "employmentTenureMonths", "approvalDecision"}
+
+
+def filtered(record: dict) -> dict:
+    row = {}
+    for column, path in RECORD_FIELDS.items():
+        value = record
+        for key in path:
+            value = value[key]
+        row[column] = value
+    row["creditScoreCategory"] = CATEGORIES[row["creditScoreCategory"]]
+    row["approvalDecision"] = DECISIONS[row["approvalDecision"]]
+    return row
+
+
+def dataset_filter_columns() -> list:
+    # dataset_filter.py is a script (it converts on import), so its column list is read from the source
+    with open(os.path.join("input", "dataset_filter.py")) as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and node.targets[0].id == "new_columns":
+            return ast.literal_eval(node.value)
+
+
+def test_filter_columns_in_dataset_filter_order():
+    assert FILTER_COLUMNS == dataset_filter_columns()
+    assert list(RECORD_FIELDS) == FILTER_COLUMNS
+
+
+def test_pandas_output_schema():
+    df = LoanDataGenerator(seed=1).generate_columns(200, start_id=7)
+
+    assert list(df.columns) == FILTER_COLUMNS
+    assert len(df) == 200
+    assert df["applicationId"].iloc[0] == "LA-2026-000007"
+    for column in FILTER_COLUMNS[1:]:
+        kind = "i" if column in INT_COLUMNS else "f"
+        assert df[column].dtype.kind == kind, column
+    assert set(df["approvalDecision"]) <= {0, 1}
+    assert set(df["creditScoreCategory"]) <= {0, 1, 2, 3}
+
+
+def test_arrow_output_schema():
+    pa = pytest.importorskip("pyarrow")
+    table = LoanDataGenerator(seed=1).generate_columns(200, output="arrow")
+
+    assert table.column_names == FILTER_COLUMNS
+    assert table.num_rows == 200
+    assert pa.types.is_string(table.schema.field("applicationId").type)
+    for column in FILTER_COLUMNS[1:]:
+        expected = pa.int64() if column in INT_COLUMNS else pa.float64()
+        assert table.schema.field(column).type == expected, column
+
+
+def test_numpy_output_schema():
+    data = LoanDataGenerator(seed=1).generate_columns(200, output="numpy")
+
+    assert list(data) == FILTER_COLUMNS
+    assert data["applicationId"].dtype.kind == "U"
+    for column in FILTER_COLUMNS[1:]:
+        assert data[column].shape == (200,), column
+        assert data[column].dtype.kind == ("i" if column in INT_COLUMNS else "f"), column
+
+    with pytest.raises(ValueError):
+        LoanDataGenerator(seed=1).generate_columns(10, output="csv")
+
+
+def test_same_distributions_as_the_record_generator():
+    n = 3000
+    records = pd.DataFrame([filtered(r) for r in LoanDataGenerator(seed=5).generate_dataset(n)])
+    columns = LoanDataGenerator(seed=5).generate_columns(n)
+
+    for column in FILTER_COLUMNS[1:]:
+        a, b = records[column].astype(float), columns[column].astype(float)
+        # Different random streams: means agree within 5 standard errors, spreads within 20%
+        stderr = np.sqrt(a.var() / n + b.var() / n)
+        assert abs(a.mean() - b.mean()) <= 5 * stderr + 1e-9, column
+        assert b.std() == pytest.approx(a.std(), rel=0.2, abs=1e-9), column
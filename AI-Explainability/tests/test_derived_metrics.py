@@ -0,0 +1,141 @@
+import json
+import os
+
+import pytest
+
+from ai import derived_metrics
+from ai.derived_metrics import calculated_metrics, compute, inputs_from, metrics, update
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+INPUTS = {
+    "loanAmount": 50000.0,
+    "annualInterestRate": 0.05,
+    "tenure": 36,
+    "grossIncome": 13000.0,
+    "commitments": 1664.0,
+    "savings": 34600.0,
+}
+
+
+def application(**loan):
+    return {
+        "applicationId": "LA-TEST",
+        "financialInformation": {
+            "monthlyIncome": 10000.0,
+            "monthlyGrossIncome": 13000.0,
+            "totalCommitments": 1664.0,
+            "savingsAmount": 34600.0,
+        },
+        "loanDetails": {"loanAmount": 50000.0, **loan},
+    }
+
+
+def generator_record_to_application(record):
+    financial = record["financialInformation"]
+    return {
+        "applicationId": record["applicationId"],
+        "financialInformation": {
+            "monthlyIncome": financial["totalMonthlyIncome"],
+            "monthlyGrossIncome": financial["monthlyGrossIncome"],
+            "totalCommitments": financial["monthlyCommitments"]["totalCommitments"],
+            "savingsAmount": financial["savingsAmount"],
+        },
+        "loanDetails": {
+            "loanAmount": record["loanDetails"]["loanAmount"],
+            "requestedTenure": record["loanDetails"]["requestedTenure"],
+            "annualInterestRate": record["loanDetails"]["annualInterestRate"],
+        },
+    }
+
+
+def test_amortization_and_ratios():
+    assert metrics(compute(INPUTS)) == {
+        "instalment": 1498.54,
+        "debtServiceRatio": 0.128,
+        "instalmentToIncomeRatio": 0.115,
+        "newDebtServiceRatio": 0.243,
+        "cashReserveMonths": 10.9,
+    }
+
+
+def test_zero_rate_and_nothing_to_service():
+    state = compute({**INPUTS, "annualInterestRate": 0.0, "commitments": 0.0, "loanAmount": 0.0})
+    assert state["instalment"] == 0.0
+    assert state["cashReserveMonths"] == derived_metrics.NO_COMMITMENTS_RESERVE
+    assert compute({**INPUTS, "annualInterestRate": 0.0})["instalment"] == pytest.approx(50000 / 36)
+
+
+@pytest.mark.parametrize("name, value", [
+    ("loanAmount", 20000.0), ("annualInterestRate", 0.08), ("tenure", 60),
+    ("grossIncome", 9000.0), ("commitments", 0.0), ("savings", 1000.0),
+])
+def test_incremental_update_matches_full_compute(name, value):
+    assert update(compute(INPUTS), {name: value}) == compute({**INPUTS, name: value})
+
+
+def test_update_recomputes_only_downstream_metrics():
+    state = compute(INPUTS)
+    # A poisoned instalment survives an edit that does not touch its inputs
+    updated = update({**state, "instalment": -1.0}, {"savings": 1000.0})
+    assert updated["instalment"] == -1.0
+    assert updated["cashReserveMonths"] == 1000.0 / (1664.0 - 1.0)
+
+
+def test_existing_format_keeps_client_metrics():
+    with open(os.path.join(APP_DIR, "input", "example_loan.json")) as f:
+        record = json.load(f)
+    app = generator_record_to_application({
+        **record, "loanDetails": {**record["loanDetails"], "annualInterestRate": None}
+    })
+    app["calculatedMetrics"] = {
+        "debtServiceRatio": 0.121, "newDebtServiceRatio": 0.347,
+        "cashReserveMonths": 7.3, "instalmentToIncomeRatio": 0.226,
+    }
+
+    assert inputs_from(app) is None
+    assert calculated_metrics(app)["newDebtServiceRatio"] == 0.347
+    assert calculated_metrics(app)["cashReserveMonths"] == 7.3
+
+
+def test_rate_or_missing_metrics_trigger_derivation():
+    assert inputs_from(application(requestedTenure=36, annualInterestRate=0.05))["annualInterestRate"] == 0.05
+    # Nothing to fall back on: the default rate is the only option
+    assert inputs_from(application(requestedTenure=36))["annualInterestRate"] == derived_metrics.DEFAULT_ANNUAL_RATE
+    assert inputs_from(application()) is None
+    with pytest.raises(ValueError):
+        calculated_metrics(application())
+
+
+def test_derived_metrics_match_the_generator():
+    pytest.importorskip("numpy")
+    from input.dataset_generator import LoanDataGenerator
+
+    generator = LoanDataGenerator(seed=7)
+    for i in range(1, 201):
+        record = generator.generate_application(i)
+        derived = calculated_metrics(generator_record_to_application(record))
+        expected = record["calculatedMetrics"]
+
+        # Inputs are recorded to the cent and the rate to 4 decimals (the generator's
+        # metrics use the unrounded rate, at most 0.02% off): one unit in the last
+        # rounded place plus that
+        assert derived["debtServiceRatio"] == pytest.approx(record["financialInformation"]["debtServiceRatio"], abs=1.5e-3)
+        for name in ("instalmentToIncomeRatio", "newDebtServiceRatio"):
+            assert derived[name] == pytest.approx(expected[name], abs=1.5e-3)
+        assert derived["cashReserveMonths"] == pytest.approx(expected["cashReserveMonths"], rel=5e-4, abs=0.11)
+        assert derived["instalment"] == pytest.approx(expected["monthlyLoanInstalment"], rel=3e-4, abs=0.02)
+
+
+def test_vectorized_batch_matches_scalar():
+    pytest.importorskip("numpy")
+    applications = [
+        application(requestedTenure=tenure, annualInterestRate=rate)
+        for tenure in (12, 36, 84) for rate in (-0.02, 0.0, 0.035, 0.085)
+    ]
+    batch = derived_metrics.batch_calculated_metrics(applications)
+    for derived, a in zip(batch, applications):
+        scalar = calculated_metrics(a)
+        for name, digits in derived_metrics.ROUNDING.items():
+            # np.round and round() may split a tie differently
+            assert derived[name] == pytest.approx(scalar[name], abs=10 ** -digits)
@@ -0,0 +1,16 @@
+import pytest
+
+from ai import embeddings
+
+
+def test_rag_modules_share_one_embedder():
+    from ai import rag
+
+    assert rag.get_embedder is embeddings.get_embedder
+    rag_index = pytest.importorskip("ai.rag_index")  # needs fastapi
+    assert rag_index.get_model is embeddings.get_embedder
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        embeddings.load_embedder("tpu")
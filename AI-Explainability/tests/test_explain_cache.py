@@ -0,0 +1,80 @@
+import pytest
+
+pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from ai import explain_cache
+from ai.explain_cache import ExplanationCache, deep_size
+
+
+@pytest.fixture
+def shap_calls(monkeypatch):
+    """Replaces SHAP with one reason per row whose impact is the row's first value."""
+    calls = []
+
+    def fake_explain_batch(model, X):
+        calls.append(len(X))
+        return [[{"feature": "ctosScore", "impact": float(row[0])}] for row in X.itertuples(index=False)]
+
+    monkeypatch.setattr(explain_cache, "explain_batch", fake_explain_batch)
+    monkeypatch.setattr(explain_cache, "model_version", lambda: "v1")
+    return calls
+
+
+def frame(*rows) -> "pd.DataFrame":
+    return pd.DataFrame(list(rows), columns=["ctosScore", "loanAmount"])
+
+
+def test_hits_skip_shap_and_return_copies(shap_calls):
+    cache = ExplanationCache(max_bytes=1 << 20)
+    first = cache.explain_batch(None, frame([700.0, 5e4], [650.0, 1e4]))
+    first[0][0]["impact"] = "edited by the caller"
+
+    second = cache.explain_batch(None, frame([700.0, 5e4], [600.0, 1e4]))
+    assert shap_calls == [2, 1]
+    assert second[0] == [{"feature": "ctosScore", "impact": 700.0}]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 3
+
+
+def test_evicts_least_recently_used_by_bytes(shap_calls):
+    cache = ExplanationCache(max_bytes=0)
+    entry = deep_size(cache.key("v1", (1.0, 2.0))) + deep_size([{"feature": "ctosScore", "impact": 1.0}])
+    cache.max_bytes = 2 * entry
+
+    cache.explain_batch(None, frame([1.0, 2.0], [3.0, 2.0]))
+    cache.explain_batch(None, frame([1.0, 2.0]))  # now the most recently used
+    cache.explain_batch(None, frame([5.0, 2.0]))
+
+    assert cache.stats()["evictions"] == 1 and cache.bytes <= cache.max_bytes
+    assert cache.get(cache.key("v1", (1.0, 2.0))) is not None
+    assert cache.get(cache.key("v1", (3.0, 2.0))) is None
+
+
+def test_digits_quantize_the_key(shap_calls):
+    cache = ExplanationCache(max_bytes=1 << 20, digits=3)
+    assert cache.key("v1", (712.04, 0.12345)) == ("v1", 712.0, 0.123)
+
+    cache.explain_batch(None, frame([712.04, 5e4]))
+    # Rounds to the same key, so served the reasons computed for the first row
+    assert cache.explain_batch(None, frame([711.96, 5e4]))[0][0]["impact"] == 712.04
+    assert shap_calls == [1]
+
+
+def test_rows_with_nan_are_not_cached(shap_calls):
+    cache = ExplanationCache(max_bytes=1 << 20)
+    for _ in range(2):
+        cache.explain_batch(None, frame([float("nan"), 5e4]))
+
+    assert shap_calls == [1, 1]
+    assert cache.stats()["entries"] == 0
+
+
+def test_verify_mode_counts_a_mismatch(shap_calls):
+    cache = ExplanationCache(max_bytes=1 << 20, verify_rate=1.0)
+    cache.explain_batch(None, frame([700.0, 5e4]))
+    # A stale entry, e.g. reasons from before a model change under the same version
+    cache.put(cache.key("v1", (700.0, 5e4)), [{"feature": "ctosScore", "impact": 1.0}])
+
+    assert cache.explain_batch(None, frame([700.0, 5e4]))[0][0]["impact"] == 1.0
+    stats = cache.stats()
+    assert (stats["verified"], stats["mismatches"]) == (1, 1)
@@ -0,0 +1,65 @@
+import os
+import socket
+import sys
+
+import pytest
+
+from ai.llm_pool import LLMPool, LLMUnavailable
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                "benchmarks"))
+import stub_ollama  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "Explain the decision."}]
+
+
+def closed_port() -> str:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}"
+
+
+def stub(**options) -> str:
+    server, url = stub_ollama.start(**options)
+    return url
+
+
+def healthy(pool) -> dict:
+    return {e["url"]: e["healthy"] for e in pool.stats()["endpoints"]}
+
+
+def test_refused_connection_fails_over_and_marks_the_server():
+    down, up = closed_port(), stub(delay_ms=0)
+    pool = LLMPool([down, up])
+    pool.endpoints[1].outstanding = 1  # so the closed port is tried first
+
+    assert pool.chat(MESSAGES)["message"]["role"] == "assistant"
+    assert healthy(pool) == {down: False, up: True}
+
+
+def test_server_error_marks_the_server():
+    url = stub(delay_ms=0, status=503)
+    pool = LLMPool([url])
+
+    with pytest.raises(LLMUnavailable):
+        pool.chat(MESSAGES)
+    assert healthy(pool) == {url: False}
+
+
+def test_client_error_leaves_the_server_healthy():
+    url = stub(delay_ms=0, status=404)
+    pool = LLMPool([url])
+
+    with pytest.raises(LLMUnavailable, match="404"):
+        pool.chat(MESSAGES)
+    assert healthy(pool) == {url: True}
+    assert pool.stats()["endpoints"][0]["failures"] == 1
+
+
+def test_caller_deadline_leaves_the_server_healthy():
+    url = stub(delay_ms=300)
+    pool = LLMPool([url])
+
+    with pytest.raises(LLMUnavailable):
+        pool.chat(MESSAGES, timeout_s=0.05)
+    assert healthy(pool) == {url: True}
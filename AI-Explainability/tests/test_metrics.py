@@ -0,0 +1,32 @@
+from ai import metrics
+
+
+def test_histogram_quantiles_within_one_bucket():
+    histogram = metrics.Histogram()
+    for ms in range(1, 101):
+        histogram.observe(ms / 1000)
+
+    assert histogram.count == 100
+    assert abs(histogram.sum - 5.05) < 1e-9
+    # Buckets are ~12% apart
+    assert abs(histogram.quantile(0.5) - 0.050) / 0.050 < 0.12
+    assert abs(histogram.quantile(0.99) - 0.099) / 0.099 < 0.12
+
+
+def test_empty_histogram():
+    assert metrics.Histogram().quantile(0.5) == 0.0
+
+
+def test_timed_and_gauges_render_as_prometheus():
+    @metrics.timed("test_stage")
+    def stage():
+        return "done"
+
+    assert stage() == "done"
+    metrics.register_gauge("xai_test_gauge", lambda: 7, "A test gauge", pool="cpu")
+    text = metrics.render_prometheus()
+
+    if metrics.METRICS_ENABLED:
+        assert 'xai_stage_latency_seconds_count{stage="test_stage"} 1' in text
+    assert "# TYPE xai_test_gauge gauge" in text
+    assert 'xai_test_gauge{pool="cpu"} 7' in text
@@ -0,0 +1,93 @@
+from ai import monitor
+
+REFERENCE = {
+    "training_version": "v1",
+    "features": {
+        name: {"edges": [20.0, 30.0], "proportions": [0.3, 0.4, 0.3], "min": 10.0, "max": 40.0}
+        for name in monitor.FEATURE_COLUMNS + [monitor.SCORE]
+    },
+}
+
+
+def observe(drift, values, decision="approve"):
+    for v in values:
+        for sketch in drift.sketches.values():
+            sketch.observe(v)
+        drift.decisions[decision] = drift.decisions.get(decision, 0) + 1
+
+
+def test_quantiles_stay_within_the_reference_range():
+    sketch = monitor.Sketch(REFERENCE["features"][monitor.SCORE])
+    assert sketch.report()["quantiles"]["0.5"] is None
+
+    for _ in range(10):
+        sketch.observe(5.0)  # below the reference minimum
+    quantiles = sketch.report()["quantiles"]
+    assert all(q == 10.0 for q in quantiles.values())
+
+    for _ in range(90):
+        sketch.observe(500.0)
+    assert sketch.report()["quantiles"]["0.95"] == 40.0
+
+
+def test_snapshots_are_per_process_and_merged(tmp_path, monkeypatch):
+    path = str(tmp_path / "snapshot.json")
+    pid = {"value": 101}
+    monkeypatch.setattr(monitor.os, "getpid", lambda: pid["value"])
+    monkeypatch.setattr(monitor, "process_alive", lambda p: p in (101, 102))
+
+    first = monitor.DriftMonitor(REFERENCE)
+    observe(first, [15.0, 25.0])
+    first.snapshot(path)
+
+    pid["value"] = 102
+    second = monitor.DriftMonitor(REFERENCE)
+    observe(second, [35.0], decision="reject")
+    second.snapshot(path)
+
+    assert sorted(monitor.snapshot_parts(path)) == [101, 102]
+    report = second.merged_report(path)
+    assert report["decisions"] == {"approve": 2, "reject": 1}
+    assert report["score"]["count"] == 3
+    assert monitor.read_state(path)["report"]["score"]["count"] == 3
+
+
+def test_restore_adopts_only_finished_processes_once(tmp_path, monkeypatch):
+    path = str(tmp_path / "snapshot.json")
+    pid = {"value": 101}
+    alive = {101, 102}
+    monkeypatch.setattr(monitor.os, "getpid", lambda: pid["value"])
+    monkeypatch.setattr(monitor, "process_alive", lambda p: p in alive)
+
+    for worker, values in ((101, [15.0, 25.0]), (102, [35.0])):
+        pid["value"] = worker
+        drift = monitor.DriftMonitor(REFERENCE)
+        observe(drift, values)
+        drift.snapshot(path)
+
+    # 101 crashed and is replaced by 103; 102 is still running
+    alive = {102, 103}
+    pid["value"] = 103
+    replacement = monitor.DriftMonitor(REFERENCE)
+    assert replacement.restore(path)
+    assert replacement.report()["score"]["count"] == 2
+    assert sorted(monitor.snapshot_parts(path)) == [102, 103]
+
+    pid["value"] = 104
+    assert not monitor.DriftMonitor(REFERENCE).restore(path)
+    pid["value"] = 103
+    assert replacement.merged_report(path)["score"]["count"] == 3
+
+
+def test_restore_ignores_another_reference(tmp_path, monkeypatch):
+    path = str(tmp_path / "snapshot.json")
+    monkeypatch.setattr(monitor.os, "getpid", lambda: 101)
+    drift = monitor.DriftMonitor(REFERENCE)
+    observe(drift, [15.0])
+    drift.snapshot(path)
+
+    monkeypatch.setattr(monitor.os, "getpid", lambda: 102)
+    monkeypatch.setattr(monitor, "process_alive", lambda p: False)
+    retrained = monitor.DriftMonitor({**REFERENCE, "training_version": "v2"})
+    assert not retrained.restore(path)
+    assert retrained.report()["score"]["count"] == 0
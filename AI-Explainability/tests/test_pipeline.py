@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from ai import pipeline  # noqa: E402
+
+
+def scored_row() -> dict:
+    return {
+        "applicationId": "LA-1",
+        "decision": "APPROVED",
+        "confidence": 0.9,
+        "reasons": [{"feature": "ctosScore", "impact": 0.4, "explanation": "Strong credit history"}],
+        "timings": {},
+        "batch_size": 1,
+    }
+
+
+def test_template_is_rendered_once_per_request(monkeypatch):
+    calls = []
+    render = pipeline.render_narrative
+    monkeypatch.setattr(pipeline, "render_narrative", lambda *args: calls.append(args) or render(*args))
+
+    scored = scored_row()
+    assert not pipeline.needs_llm(scored, "narrative", "template")
+    result = pipeline.finish_pipeline(scored, "narrative", "template")
+
+    assert result["narrator"] == "template"
+    assert result["explanation"].startswith("Your loan application has been approved")
+    assert len(calls) == 1
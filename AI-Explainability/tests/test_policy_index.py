@@ -0,0 +1,18 @@
+import json
+import os
+
+from ai import policy_index
+
+
+def test_write_index_replaces_the_file_atomically(tmp_path):
+    path = tmp_path / "policy_index.json"
+    path.write_text("{}")
+    before = os.stat(path).st_ino
+
+    index = {"docs_version": "v1", "scorer": "lexical", "entries": {}}
+    policy_index.write_index(index, str(path))
+
+    assert json.loads(path.read_text()) == index
+    # A new file renamed over the old one, not the old one truncated and rewritten
+    assert os.stat(path).st_ino != before
+    assert os.listdir(tmp_path) == ["policy_index.json"]
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+
+import pytest
+
+from ai.priority_pool import Overloaded, PriorityExecutor, PriorityPool, Pools
+
+LIMITS = {"interactive": 4, "standard": 4, "bulk": 4}
+
+
+def blocked_pool(limits=LIMITS):
+    """A one-worker pool whose worker is held until the returned event is set."""
+    pool = PriorityPool("test", 1, limits)
+    started, release = threading.Event(), threading.Event()
+
+    def hold():
+        started.set()
+        release.wait(5)
+
+    pool.enqueue("bulk", hold)
+    assert started.wait(5)
+    return pool, release
+
+
+def test_queued_work_runs_by_class_then_fifo():
+    pool, release = blocked_pool()
+    order = []
+    futures = [
+        pool.submit(priority, order.append, name)
+        for priority, name in (
+            ("bulk", "bulk-1"), ("standard", "standard-1"), ("interactive", "interactive-1"),
+            ("bulk", "bulk-2"), ("interactive", "interactive-2"), ("standard", "standard-2"),
+        )
+    ]
+    release.set()
+    for future in futures:
+        future.result(5)
+
+    assert order == ["interactive-1", "interactive-2", "standard-1", "standard-2", "bulk-1", "bulk-2"]
+
+
+def test_full_class_is_shed_with_retry_after():
+    pool, release = blocked_pool({"interactive": 2, "standard": 1, "bulk": 1})
+    pool.submit("standard", lambda: None)
+    with pytest.raises(Overloaded) as raised:
+        pool.submit("standard", lambda: None)
+
+    assert raised.value.priority == "standard"
+    assert raised.value.retry_after >= 1
+    # Other classes are counted separately
+    pool.submit("interactive", lambda: None)
+    assert pool.stats()["classes"]["standard"]["rejected"] == 1
+    release.set()
+
+
+def test_admitted_requests_count_until_they_finish():
+    pool = PriorityPool("test", 1, {"interactive": 2, "standard": 1, "bulk": 1})
+
+    with pool.admitted("interactive"), pool.admitted("interactive"):
+        assert pool.stats()["classes"]["interactive"]["in_flight"] == 2
+        with pytest.raises(Overloaded):
+            with pool.admitted("interactive"):
+                pass
+    assert pool.stats()["classes"]["interactive"]["in_flight"] == 0
+
+    with pool.admitted("interactive"):
+        pass
+
+
+def test_failed_and_finished_tasks_release_their_slot():
+    pool = PriorityPool("test", 1, {"interactive": 1, "standard": 1, "bulk": 1})
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        pool.submit("interactive", fail).result(5)
+    assert pool.submit("interactive", lambda: 42).result(5) == 42
+    assert pool.stats()["classes"]["interactive"]["in_flight"] == 0
+
+
+def test_executor_batches_are_never_shed():
+    # A micro-batch carries requests that were each admitted already
+    pools = Pools({"cpu": 1}, {"interactive": 1, "standard": 1, "bulk": 1})
+    executor = PriorityExecutor(pools, "cpu", "interactive")
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        with pools.get("cpu").admitted("interactive"):
+            return await asyncio.gather(*(loop.run_in_executor(executor, sum, [i, i]) for i in range(3)))
+
+    assert asyncio.run(main()) == [0, 2, 4]
+
+
+def test_pools_run_admits_on_the_named_pool():
+    pools = Pools({"cpu": 2, "io": 1}, LIMITS)
+    assert asyncio.run(pools.run("io", "bulk", pow, 2, 10)) == 1024
+    assert pools.stats()["io"]["classes"]["bulk"]["completed"] == 1
+    assert set(pools.stats()) == {"cpu", "io"}
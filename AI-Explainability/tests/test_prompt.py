@@ -0,0 +1,74 @@
+import pytest
+
+from ai import prompt
+from ai.lazy import once
+from ai.prompt import INSTRUCTIONS, SYSTEM_PROMPT, build_messages, count_tokens, reason_queries, select_context
+
+REASONS = [{"feature": "ctosScore", "explanation": "CTOS credit score is low", "impact": -0.4}]
+
+
+@pytest.fixture
+def estimate(monkeypatch):
+    """count_tokens without a tokenizer, whatever XAI_PROMPT_TOKENIZER says."""
+    monkeypatch.setattr(prompt, "TOKENIZER_PATH", "")
+    monkeypatch.setattr(prompt, "get_tokenizer", once(prompt.get_tokenizer.__wrapped__))
+
+
+def test_fallback_estimates_word_pieces(estimate):
+    # Words up to 7 characters are one piece, punctuation is its own piece
+    assert count_tokens("Hello, world.") == 4
+    assert count_tokens("creditworthiness") == 3
+    assert count_tokens("") == 0
+
+
+def test_unloadable_tokenizer_falls_back_to_the_estimate(monkeypatch, tmp_path):
+    monkeypatch.setattr(prompt, "TOKENIZER_PATH", str(tmp_path / "missing.json"))
+    monkeypatch.setattr(prompt, "get_tokenizer", once(prompt.get_tokenizer.__wrapped__))
+
+    assert count_tokens("Hello, world.") == 4
+    assert prompt.get_tokenizer() is None
+
+
+def test_passage_over_budget_is_dropped(estimate):
+    short = "CTOS scores below 600 are declined."
+    long = "CTOS credit score " + " ".join(["requirements"] * 60) + "."
+    budget = count_tokens(short) + 2
+
+    sentences, dropped = select_context([long, short], reason_queries(REASONS), budget)
+
+    assert sentences == [short]
+    assert dropped == 1
+
+
+def test_near_duplicate_sentences_are_kept_once(estimate):
+    first = "Applicants with a CTOS score below 600 are declined."
+    again = "Applicants with a CTOS score below 600 are always declined."  # 5 of 6 terms shared
+    other = "A low CTOS credit score needs a guarantor."
+
+    sentences, dropped = select_context([first, f"{again} {other}"], reason_queries(REASONS), 1000)
+
+    assert sentences == [first, other]
+    assert dropped == 0
+
+
+def test_context_keeps_retrieval_order(estimate):
+    passages = ["Branch hours are nine to five.", "A low CTOS credit score is declined."]
+
+    sentences, _ = select_context(passages, reason_queries(REASONS), 1000)
+
+    # Off-topic sentences are left out while some sentence matches the reasons
+    assert sentences == ["A low CTOS credit score is declined."]
+
+
+def test_system_prefix_is_byte_stable(estimate):
+    first, _ = build_messages("REJECTED", 0.2, REASONS, ["CTOS scores below 600 are declined."])
+    second, usage = build_messages(
+        "APPROVED", 0.9,
+        [{"feature": "loanAmount", "explanation": "Loan amount is small", "impact": 0.3}],
+        ["Loans under RM 10,000 need no collateral."],
+    )
+
+    assert first[0] == second[0] == {"role": "system", "content": SYSTEM_PROMPT}
+    assert first[1]["content"].startswith(INSTRUCTIONS + "\n\n")
+    assert second[1]["content"].startswith(INSTRUCTIONS + "\n\n")
+    assert usage["stable_prefix_tokens"] == count_tokens(SYSTEM_PROMPT) + count_tokens(INSTRUCTIONS)
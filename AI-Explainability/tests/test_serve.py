@@ -0,0 +1,79 @@
+import os
+import sys
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+import serve  # noqa: E402
+
+
+def test_restart_delay_doubles_then_gives_up():
+    delays = [serve.restart_delay([0.0] * n) for n in range(1, serve.CRASH_BUDGET + 2)]
+
+    assert delays[:3] == [serve.RESTART_DELAY_S, 2 * serve.RESTART_DELAY_S, 4 * serve.RESTART_DELAY_S]
+    assert max(d for d in delays if d is not None) == serve.MAX_RESTART_DELAY_S
+    assert delays[serve.CRASH_BUDGET - 1] is not None
+    assert delays[serve.CRASH_BUDGET] is None
+
+
+def test_load_app_preloads_from_the_app_directory(tmp_path, monkeypatch):
+    app_dir = tmp_path / "demo"
+    app_dir.mkdir()
+    (app_dir / "demo_preload.py").write_text(
+        "import os\ncalls = []\ndef warm():\n    calls.append(os.getcwd())\n"
+    )
+    (app_dir / "demo_main.py").write_text("import demo_preload\napp = ('app', len(demo_preload.calls))\n")
+    monkeypatch.setattr(serve, "ROOT", str(tmp_path))
+    monkeypatch.setitem(serve.APPS, "demo", {"dir": "demo", "app": "demo_main:app", "preload": ["demo_preload:warm"]})
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    for name in ("demo_preload", "demo_main"):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+    # The preload ran, in the app's directory, before the app was imported
+    assert serve.load_app("demo") == ("app", 1)
+    assert sys.modules["demo_preload"].calls == [str(app_dir)]
+    assert os.getcwd() == str(app_dir)
+
+
+def test_preloads_leave_connections_to_the_workers():
+    # Anything opening a connection or starting a thread must not run before the fork
+    assert serve.APPS["ai"]["preload"] == ["ai.warmup:preload"]
+    assert serve.APPS["backend"]["preload"] == []
+
+    from ai import warmup
+
+    source = warmup.preload.__code__.co_names
+    assert "get_pool" not in source and "get_collection" not in source and "build_index" not in source
+
+
+class Embedder:
+    shared = False
+
+    def share_memory(self):
+        self.shared = True
+
+
+def fake_embeddings(loaded: bool, embedder) -> types.ModuleType:
+    module = types.ModuleType("ai.embeddings")
+    module.get_embedder = lambda: embedder
+    module.get_embedder.loaded = lambda: loaded
+    return module
+
+
+@pytest.mark.parametrize("app, loaded, shared", [("ai", True, True), ("ai", False, False), ("backend", True, False)])
+def test_share_artifacts_only_moves_a_loaded_embedder(monkeypatch, app, loaded, shared):
+    embedder = Embedder()
+    monkeypatch.setitem(sys.modules, "ai.embeddings", fake_embeddings(loaded, embedder))
+
+    serve.share_artifacts(app)
+    assert embedder.shared is shared
+
+
+def test_memory_report_formats():
+    assert serve.format_memory({}) == "memory stats unavailable"
+    assert serve.format_memory({"Rss": 4096, "Pss": 2048, "Shared_Clean": 1024, "Shared_Dirty": 1024}) == (
+        "rss=4MB pss=2MB shared=2MB"
+    )
@@ -0,0 +1,31 @@
+from ai.templates import FEATURE_TEMPLATES, policy_citation, render_narrative
+
+
+def test_each_feature_cites_its_own_policy():
+    # A passage may serve both signs of one feature, but not stand in for another feature
+    owners = {}
+    for feature in FEATURE_TEMPLATES:
+        for sign in ("positive", "negative"):
+            policy = policy_citation(feature, sign)
+            assert policy is not None, (feature, sign)
+            assert owners.setdefault(policy, feature) == feature, policy
+
+
+def test_citations_follow_the_policy_index(monkeypatch):
+    from ai import templates
+
+    index = {"ctosScore:negative": [{"summary": "CTOS scores below 600 are declined.", "anchor": "x.md#L1"}]}
+    monkeypatch.setattr(templates, "get_policy_index", lambda: index)
+    narrative = render_narrative("REJECTED", 0.2, [{"feature": "ctosScore", "impact": -0.4}])
+    assert "Relevant policy: CTOS scores below 600 are declined." in narrative
+
+    # No passage for the reason: the caller falls back to the LLM
+    assert render_narrative("APPROVED", 0.9, [{"feature": "ctosScore", "impact": 0.4}]) is None
+
+
+def test_low_stability_cites_the_stability_policy():
+    narrative = render_narrative("REJECTED", 0.3, [{"feature": "employmentStabilityScore", "impact": -0.2}])
+
+    assert "less stable income source" in narrative
+    assert "Employment stability scores above 0.6" in narrative
+    assert "tenure" not in narrative
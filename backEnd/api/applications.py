@@ -0,0 +1,189 @@
+import threading
+import time
+from fastapi import APIRouter, HTTPException, Response
+from typing import Dict
+from schemas.loan_application_raw import LoanApplicationRaw
+from services.feature_extractor import FeatureExtractor
+from services.decision_engine import STATUS, engine
+from services.explainability import ExplainabilityEngine
+from services.rag_engine import RAGEngine
+from services.audit_logger import AuditLogger
+from services.what_if_engine import WhatIfEngine
+from services.application_store import ApplicationStore
+from services import scheduler
+from services.scheduler import Overloaded, scheduled
+from config import ROUTE_PRIORITY
+
+router = APIRouter()
+what_if_engine = WhatIfEngine()
+store = ApplicationStore()
+
+# Applications queued for rescoring by list_applications, so repeated listings queue each once
+rescoring = set()
+rescoring_lock = threading.Lock()
+
+RISK_LEVELS = {"APPROVE": "LOW", "REVIEW": "MEDIUM", "REJECT": "HIGH"}
+
+
+def build_decision_view(application: LoanApplicationRaw, decision_result: dict, explanation: dict,
+                        policy_refs: list, timestamp: str) -> dict:
+    """Shape a decision the way frontEnd/src/services/api.js transformApiResponse reads it."""
+    contributions = sorted(
+        explanation["feature_contributions"].items(), key=lambda item: abs(item[1]), reverse=True
+    )
+
+    return {
+        "applicationId": application.applicationId,
+        "decision": decision_result["decision"],
+        "status": STATUS[decision_result["decision"]],
+        "decisionId": decision_result["decision_id"],
+        "confidence": decision_result["probability"],
+        "riskLevel": RISK_LEVELS.get(decision_result["decision"], "MEDIUM"),
+        "reasonCodes": explanation["reason_codes"],
+        "topReasons": [
+            {
+                "feature": feature,
+                "impact": abs(impact),
+                "direction": "positive" if impact >= 0 else "negative",
+            }
+            for feature, impact in contributions[:5]
+        ],
+        "narrative": explanation["summary"],
+        "ragContext": {
+            "policies": [
+                {"source": f"{ref['document']} {ref['section']}", "text": ref["summary"]}
+                for ref in policy_refs
+            ]
+        },
+        "loanDetails": application.loanDetails.dict(),
+        "inputs": FeatureExtractor.extract(application).dict(),
+        "audit": {
+            "model": decision_result["model_version"],
+            "decisionId": decision_result["decision_id"],
+            "timestamp": timestamp,
+        },
+    }
+
+
+def score_application(application: LoanApplicationRaw) -> dict:
+    features = FeatureExtractor.extract(application)
+
+    decision_result = engine.decide(features.dict())
+    explanation = ExplainabilityEngine.explain(features.dict(), decision_result["decision_id"])
+    policy_refs = RAGEngine.retrieve(explanation["reason_codes"])
+
+    AuditLogger.log_decision(
+        input_data=application.dict(),
+        decision_output=decision_result,
+        explanation=explanation,
+        policy_refs=policy_refs,
+        model_version=engine.model_version
+    )
+
+    result = build_decision_view(
+        application, decision_result, explanation, policy_refs,
+        timestamp=time.strftime("%Y-%m-%d %H:%M:%S")
+    )
+    store.save_result(application.applicationId, engine.model_version, result)
+    return result
+
+
+def rescore_application(application_id: str):
+    payload = store.get_application(application_id)
+    if payload is not None:
+        score_application(LoanApplicationRaw(**payload))
+
+
+def queue_rescore(application_id: str):
+    """Rescores an application in the background at bulk priority; dropped if that class is full."""
+    with rescoring_lock:
+        if application_id in rescoring:
+            return
+        rescoring.add(application_id)
+
+    def done(_):
+        with rescoring_lock:
+            rescoring.discard(application_id)
+
+    try:
+        future = scheduler.get_pool("cpu").submit(
+            ROUTE_PRIORITY["applications_rescore"], rescore_application, application_id
+        )
+    except Overloaded:
+        # Still pending; a later listing queues it again
+        done(None)
+        return
+    future.add_done_callback(done)
+
+
+@router.post("")
+@scheduled("applications")
+def submit_application(application: LoanApplicationRaw):
+    store.save_application(application.applicationId, application.dict())
+    return score_application(application)
+
+
+@router.get("")
+@scheduled("applications_list")
+def list_applications(response: Response, after: int = 0, limit: int = 50):
+    # Keyset pagination: pass the X-Next-Cursor header back as ?after=
+    items, next_cursor = store.list_applications(engine.model_version, after=after, limit=min(limit, 500))
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+
+    summaries = []
+    for application_id, result in items:
+        if result is None:
+            # Not scored under the current model version yet (e.g. after a swap): listing
+            # must stay cheap, so it is rescored in the background and shown as pending
+            queue_rescore(application_id)
+            summaries.append({
+                "id": application_id,
+                "decision": {"status": "pending", "confidence": None, "riskLevel": None},
+            })
+            continue
+
+        summaries.append({
+            "id": application_id,
+            "decision": {
+                "status": STATUS[result["decision"]],
+                "confidence": result["confidence"],
+                "riskLevel": result["riskLevel"],
+            },
+        })
+
+    return summaries
+
+
+@router.get("/{application_id}/decision")
+@scheduled("applications")
+def get_application_decision(application_id: str):
+    cached = store.get_result(application_id, engine.model_version)
+    if cached is not None:
+        return cached
+
+    payload = store.get_application(application_id)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Application not found")
+
+    return score_application(LoanApplicationRaw(**payload))
+
+
+@router.post("/{application_id}/whatif")
+@scheduled("what_if")
+def run_what_if(application_id: str, modifications: Dict):
+    payload = store.get_application(application_id)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Application not found")
+
+    application = LoanApplicationRaw(**payload)
+    result = what_if_engine.simulate(application, modifications)
+    AuditLogger.log_decision(
+        input_data=application.dict(),
+        decision_output={"decision_id": result["decision_id"], "new_decision": result["new_decision"]},
+        explanation=None,
+        policy_refs=None,
+        model_version=what_if_engine.decision_engine.model_version
+    )
+
+    return result
@@ -1,15 +1,28 @@
 from fastapi import APIRouter, HTTPException
-import json
+from services.audit_chain import prove
+from services.audit_codec import iter_records
+from services.audit_logger import LOG_FILE
+from services.audit_stats import AuditStats
+from services.scheduler import scheduled
 
 router = APIRouter()
-LOG_FILE = "logs/audit.log"
+
+@router.get("/stats")
+@scheduled("audit", pool="io")
+def audit_stats():
+    return AuditStats.report()
 
 @router.get("/audit/{decision_id}")
-def get_audit(decision_id: str):
+@scheduled("audit", pool="io")
+def get_audit(decision_id: str, proof: bool = False):
     try:
-        with open(LOG_FILE, "r") as f:
-            for line in f:
-                record = json.loads(line)
+        if proof:
+            record, inclusion = prove(LOG_FILE, decision_id)
+            if record is not None:
+                # None until the record's batch has been checkpointed
+                return {**record, "inclusion_proof": inclusion}
+        else:
+            for record in iter_records(LOG_FILE):
                 if record["decision"]["decision_id"] == decision_id:
                     return record
     except FileNotFoundError:
@@ -2,27 +2,72 @@ from fastapi import APIRouter
 from schemas.loan_application_raw import LoanApplicationRaw
 from schemas.decision import DecisionResponse
 from services.feature_extractor import FeatureExtractor
-from services.decision_engine import DecisionEngine
+from services.decision_engine import engine
 from services.audit_logger import AuditLogger
 from services.explainability import ExplainabilityEngine
 from services.rag_engine import RAGEngine
+from services.batcher import MicroBatcher
+from services.decision_cache import DecisionCache
+from services import metrics, scheduler
+from config import POLICY_VERSION, ROUTE_PRIORITY
 
 router = APIRouter()
-engine = DecisionEngine()
+batcher = MicroBatcher(engine.decide_batch, executor=scheduler.executor("cpu", ROUTE_PRIORITY["decision"]))
+decision_cache = DecisionCache()
 
-@router.post("/decision", response_model=DecisionResponse)
-def make_decision(application: LoanApplicationRaw):
+metrics.register_gauge(
+    "xai_batch_queue_depth", lambda: batcher.stats()["queue_depth"],
+    "Requests waiting for a micro-batch", route="decision"
+)
+metrics.register_gauge(
+    "xai_batch_mean_size", lambda: batcher.stats()["mean_batch_size"],
+    "Mean rows per micro-batch", route="decision"
+)
+metrics.register_gauge(
+    "xai_decision_cache_hit_rate", lambda: decision_cache.stats()["hit_rate"],
+    "Share of /decision requests answered from the idempotency cache"
+)
+
+async def compute_decision(application: LoanApplicationRaw):
     features = FeatureExtractor.extract(application)
-    
-    decision_result = engine.decide(features.dict())
+
+    decision_result = await batcher.submit(features.dict())
     explanation = ExplainabilityEngine.explain(features.dict(), decision_result["decision_id"])
     policy_refs = RAGEngine.retrieve(explanation["reason_codes"])
 
-    AuditLogger.log_decision(
-        input_data=application.dict(),
+    return decision_result, explanation, policy_refs
+
+@router.post("/decision", response_model=DecisionResponse)
+async def make_decision(application: LoanApplicationRaw):
+    input_data = application.dict()
+    input_hash = AuditLogger.hash_input(input_data)
+
+    # Shed before doing any work if too many decisions are already waiting or
+    # running; the batcher queue is bounded by the same count.
+    # Resubmissions/retries of the same application get the original decision_id
+    with scheduler.get_pool("cpu").admitted(ROUTE_PRIORITY["decision"]):
+        (decision_result, explanation, policy_refs), cache_hit = await decision_cache.get_or_compute(
+            (input_hash, engine.model_version, POLICY_VERSION),
+            lambda: compute_decision(application)
+        )
+
+    await scheduler.run(
+        "io", ROUTE_PRIORITY["decision"], AuditLogger.log_decision,
+        input_data=input_data,
         decision_output=decision_result,
         explanation=explanation,
-        policy_refs=policy_refs
+        policy_refs=policy_refs,
+        input_hash=input_hash,
+        cache_hit=cache_hit,
+        model_version=decision_result["model_version"]
     )
 
     return decision_result
+
+@router.get("/batching")
+def batching_stats():
+    return batcher.stats()
+
+@router.get("/cache")
+def cache_stats():
+    return decision_cache.stats()
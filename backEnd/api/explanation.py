@@ -3,10 +3,12 @@ from services.explainability import ExplainabilityEngine
 from services.rag_engine import RAGEngine
 from services.audit_logger import AuditLogger
 from schemas.loan_application_raw import LoanApplicationRaw
+from services.scheduler import scheduled
 
 router = APIRouter()
 
 @router.post("/explanation")
+@scheduled("explanation")
 def get_explanation(application: LoanApplicationRaw, decision_id: str):
     features = application.dict()
     explanation = ExplainabilityEngine.explain(features, decision_id)
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from services import metrics, scheduler
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@router.get("/scheduler")
+def scheduler_stats():
+    return scheduler.stats()
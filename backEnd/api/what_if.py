@@ -4,6 +4,7 @@ from typing import Dict
 from services.what_if_engine import WhatIfEngine
 from schemas.loan_application_raw import LoanApplicationRaw
 from services.audit_logger import AuditLogger
+from services.scheduler import scheduled
 
 router = APIRouter()
 engine = WhatIfEngine()
@@ -13,13 +14,15 @@ class WhatIfRequest(BaseModel):
     modifications: Dict
 
 @router.post("/what-if")
+@scheduled("what_if")
 def simulate_what_if(req: WhatIfRequest):
     result = engine.simulate(req.application, req.modifications)
     AuditLogger.log_decision(
         input_data=req.application.dict(),
         decision_output={"decision_id": result["decision_id"], "new_decision": result["new_decision"]},
         explanation=None,
-        policy_refs=None
+        policy_refs=None,
+        model_version=engine.decision_engine.model_version
     )
 
     return result
@@ -1,5 +1,66 @@
+import os
+
 APP_NAME = "Explainable AI Loan Decision Engine"
 
 MODEL_VERSION = "rf_mock_v1"
 EXPLANATION_VERSION = "explainer_v1"
 POLICY_VERSION = "policy_v1"
+
+AI_APP_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "AI-Explainability"))
+
+# Reason code -> policy passage index compiled by AI-Explainability/ai/policy_index.py
+POLICY_INDEX_PATH = os.path.join(AI_APP_DIR, "ai", "policy_index.json")
+
+# Application store backing /api/applications
+APPLICATION_DB = "data/applications.db"
+APPLICATION_CACHE_SIZE = 1024
+
+# Idempotent /decision results keyed on (input hash, model version, policy version)
+DECISION_CACHE_SIZE = 10000
+
+# Micro-batching in front of DecisionEngine.decide
+BATCH_MAX_SIZE = 64
+BATCH_MAX_WAIT_MS = 5.0
+
+# Audit log line format: "compact" (services/audit_codec.py) or "json" (one plain record per line)
+AUDIT_ENCODING = os.getenv("XAI_AUDIT_ENCODING", "compact")
+
+# Hash-chained audit log: Merkle root checkpoints over batches of chained records (services/audit_chain.py)
+AUDIT_CHECKPOINT_FILE = os.getenv("XAI_AUDIT_CHECKPOINTS", "logs/audit.checkpoints")
+AUDIT_CHECKPOINT_BATCH = int(os.getenv("XAI_AUDIT_CHECKPOINT_BATCH", "1024"))
+AUDIT_CHECKPOINT_INTERVAL_S = float(os.getenv("XAI_AUDIT_CHECKPOINT_S", "30"))
+
+# /audit/stats counters, shared by all workers, and the buckets kept (services/audit_stats.py)
+AUDIT_STATS_FILE = os.getenv("XAI_AUDIT_STATS_FILE", "logs/audit.stats.json")
+AUDIT_STATS_HOURS = int(os.getenv("XAI_AUDIT_STATS_HOURS", "168"))
+AUDIT_STATS_DAYS = int(os.getenv("XAI_AUDIT_STATS_DAYS", "400"))
+
+# Admission control (services/scheduler.py): worker threads per pool, requests in
+# flight (waiting or running) allowed per priority class before shedding with 429,
+# and the class of each route
+SCHEDULER_WORKERS = {
+    "cpu": int(os.getenv("XAI_CPU_WORKERS", str(os.cpu_count() or 4))),  # model, explanation, what-if
+    "io": int(os.getenv("XAI_IO_WORKERS", "16")),  # audit log and application store
+}
+SCHEDULER_MAX_QUEUE = {
+    "interactive": int(os.getenv("XAI_MAX_QUEUE_INTERACTIVE", "256")),
+    "standard": int(os.getenv("XAI_MAX_QUEUE_STANDARD", "128")),
+    "bulk": int(os.getenv("XAI_MAX_QUEUE_BULK", "32")),
+}
+ROUTE_PRIORITY = {
+    "decision": "interactive",
+    "applications": "interactive",
+    "applications_list": "standard",
+    "explanation": "standard",
+    "audit": "standard",
+    "what_if": "bulk",
+    # Applications listed before they were scored under the current model version
+    "applications_rescore": "bulk",
+}
+
+# Applications per chunk (one process-pool task, part file and audit write) in services/bulk_score.py
+BULK_CHUNK_SIZE = int(os.getenv("XAI_BULK_CHUNK_SIZE", "5000"))
+
+# Derived-metric states of recently simulated applications kept by WhatIfEngine, so
+# repeated what-ifs on one application only recompute what their edits touch
+WHAT_IF_STATE_CACHE_SIZE = 1024
@@ -1,8 +1,18 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
 from api.decision import router as decision_router
 from api.explanation import router as explanation_router
 from api.what_if import router as what_if_router
 from api.audit import router as audit_router
+from api.metrics import router as metrics_router
+from api.applications import router as applications_router
+from services.audit_chain import AuditCheckpointer
+from services.audit_logger import LOG_FILE
+from services.audit_stats import AuditStats
+from services.derived_metrics import MissingMetrics
+from services.scheduler import Overloaded
 
 app = FastAPI(
     title="Explainable AI Decision Engine",
@@ -14,4 +24,38 @@ app.include_router(decision_router, prefix="/decision", tags=["Decision"])
 app.include_router(explanation_router, prefix="/explanation", tags=["Explanation"])
 app.include_router(what_if_router, prefix="/what-if", tags=["What-If"])
 app.include_router(audit_router, prefix="/audit", tags=["Audit"])
+app.include_router(metrics_router, tags=["Metrics"])
+app.include_router(applications_router, prefix="/api/applications", tags=["Applications"])
 
+
+@app.exception_handler(Overloaded)
+def overloaded(request: Request, exc: Overloaded):
+    return JSONResponse(
+        status_code=429, content={"detail": str(exc)}, headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
+@app.exception_handler(MissingMetrics)
+def missing_metrics(request: Request, exc: MissingMetrics):
+    # Neither client calculatedMetrics nor the raw fields to derive them
+    return JSONResponse(status_code=422, content={"detail": str(exc)})
+
+
+@app.exception_handler(ValidationError)
+def invalid_application(request: Request, exc: ValidationError):
+    # Request bodies are validated by FastAPI; this catches data that becomes invalid
+    # later, e.g. a what-if modification setting requestedTenure to 0
+    return JSONResponse(status_code=422, content={"detail": jsonable_encoder(exc.errors())})
+
+
+@app.on_event("startup")
+def start_audit_checkpointer():
+    # Merkle roots over batches of audit records, computed off the request path
+    AuditCheckpointer(LOG_FILE).start()
+
+
+@app.on_event("startup")
+def load_audit_stats():
+    # Counts the log written so far for /audit/stats in the background; the first worker
+    # to get the lock does it, the others find the shared counters up to date
+    AuditStats.load_history()
@@ -8,3 +8,6 @@ class BlackBoxModel:
         )
 
         return max(min(score, 0.95), 0.05)
+
+    def predict_proba_batch(self, features_list: list) -> list:
+        return [self.predict_proba(features) for features in features_list]
@@ -1,11 +1,13 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any
 
 
 class LoanDetails(BaseModel):
     loanAmount: float
-    requestedTenure: int
+    # Tenure and gross income divide the derived metrics (services/derived_metrics.py)
+    requestedTenure: int = Field(gt=0)
     loanToIncomeRatio: float
+    annualInterestRate: Optional[float] = None
 
 
 class EmploymentInformation(BaseModel):
@@ -18,6 +20,10 @@ class FinancialInformation(BaseModel):
     totalMonthlyIncome: float
     debtServiceRatio: float
     savingsAmount: float
+    # With a gross income and annualInterestRate (or no calculatedMetrics), the metrics are
+    # derived server-side (services/derived_metrics.py)
+    monthlyGrossIncome: Optional[float] = Field(None, gt=0)
+    monthlyCommitments: Optional[Dict[str, float]] = None
 
 
 class CreditInformation(BaseModel):
@@ -42,7 +48,7 @@ class LoanApplicationRaw(BaseModel):
     financialInformation: FinancialInformation
     creditInformation: CreditInformation
     riskIndicators: RiskIndicators
-    calculatedMetrics: CalculatedMetrics
+    calculatedMetrics: Optional[CalculatedMetrics] = None
 
     # Anything extra (including targetVariable) is ignored but preserved for audit
     extra_payload: Optional[Dict[str, Any]] = None
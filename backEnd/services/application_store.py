@@ -0,0 +1,160 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from config import APPLICATION_DB, APPLICATION_CACHE_SIZE
+
+_connect_lock = threading.Lock()
+
+
+class ApplicationStore:
+    """
+    SQLite-backed store of submitted applications and their decision
+    results. Results are cached per (application id, model version) both
+    in the database and in a small in-process LRU; when a new model
+    version shows up the older cached results are dropped.
+    """
+
+    def __init__(self, path: str = APPLICATION_DB, cache_size: int = APPLICATION_CACHE_SIZE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._model_version = None
+        self._connection = None
+        self._pid = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """
+        This process's connection, opened on first use. The routers create
+        their store at import, which serve.py does once before forking the
+        workers, and a sqlite connection must not be used across a fork.
+        """
+        if self._pid != os.getpid():
+            with _connect_lock:
+                if self._pid != os.getpid():
+                    self._connection = self._connect()
+                    self._pid = os.getpid()
+        return self._connection
+
+    def _connect(self) -> sqlite3.Connection:
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS applications (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    application_id TEXT UNIQUE NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )"""
+            )
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS results (
+                    application_id TEXT NOT NULL,
+                    model_version TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    PRIMARY KEY (application_id, model_version)
+                )"""
+            )
+        return conn
+
+    def save_application(self, application_id: str, payload: dict):
+        with self._lock, self._conn:
+            self._conn.execute(
+                """INSERT INTO applications (application_id, payload, created_at) VALUES (?, ?, ?)
+                   ON CONFLICT(application_id) DO UPDATE SET payload = excluded.payload""",
+                (application_id, json.dumps(payload), time.strftime("%Y-%m-%d %H:%M:%S")),
+            )
+            # A resubmitted application must not be served its old result
+            self._conn.execute("DELETE FROM results WHERE application_id = ?", (application_id,))
+            for key in [k for k in self._cache if k[0] == application_id]:
+                del self._cache[key]
+
+    def get_application(self, application_id: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM applications WHERE application_id = ?", (application_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list_applications(self, model_version: str, after: int = 0, limit: int = 50):
+        """
+        Keyset pagination on insertion order: returns (items, next_cursor)
+        where items are (application_id, cached result or None).
+        """
+        self._check_model_version(model_version)
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT a.seq, a.application_id, r.result
+                   FROM applications a
+                   LEFT JOIN results r
+                     ON r.application_id = a.application_id AND r.model_version = ?
+                   WHERE a.seq > ?
+                   ORDER BY a.seq
+                   LIMIT ?""",
+                (model_version, after, limit),
+            ).fetchall()
+
+        items = [(app_id, json.loads(result) if result else None) for _, app_id, result in rows]
+        next_cursor = rows[-1][0] if len(rows) == limit else None
+        return items, next_cursor
+
+    def get_result(self, application_id: str, model_version: str):
+        self._check_model_version(model_version)
+        key = (application_id, model_version)
+
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+            row = self._conn.execute(
+                "SELECT result FROM results WHERE application_id = ? AND model_version = ?", key
+            ).fetchone()
+            if row is None:
+                return None
+
+            result = json.loads(row[0])
+            self._remember(key, result)
+            return result
+
+    def save_result(self, application_id: str, model_version: str, result: dict):
+        self._check_model_version(model_version)
+        key = (application_id, model_version)
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO results (application_id, model_version, result, created_at)
+                   VALUES (?, ?, ?, ?)""",
+                (application_id, model_version, json.dumps(result), time.strftime("%Y-%m-%d %H:%M:%S")),
+            )
+            self._remember(key, result)
+
+    def invalidate(self, keep_model_version: str = None):
+        """Drops cached results, except those of keep_model_version if given."""
+        with self._lock, self._conn:
+            if keep_model_version is None:
+                self._conn.execute("DELETE FROM results")
+            else:
+                self._conn.execute("DELETE FROM results WHERE model_version != ?", (keep_model_version,))
+            self._cache.clear()
+
+    def _check_model_version(self, model_version: str):
+        # First request under a new model version = model swap
+        if model_version != self._model_version:
+            self.invalidate(keep_model_version=model_version)
+            self._model_version = model_version
+
+    def _remember(self, key, result):
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
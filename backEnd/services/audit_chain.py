@@ -0,0 +1,470 @@
+import argparse
+import bisect
+import fcntl
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from config import AUDIT_CHECKPOINT_FILE, AUDIT_CHECKPOINT_BATCH, AUDIT_CHECKPOINT_INTERVAL_S
+from services.audit_codec import CompactDecoder, chunk_lines, split_chunks
+
+GENESIS = "0" * 64
+
+# How far back from the end of the log to look for the last chained record first
+TAIL_WINDOW = 64 * 1024
+
+
+def canonical(record: dict) -> bytes:
+    """The bytes a record's chain hash covers: everything but the hash itself."""
+    body = {k: v for k, v in record.items() if k != "chain"}
+    return json.dumps(body, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def chain_hash(prev: str, record: dict) -> str:
+    return hashlib.sha256(prev.encode("ascii") + canonical(record)).hexdigest()
+
+
+def _is_hash(value) -> bool:
+    return isinstance(value, str) and len(value) == 64
+
+
+def line_chain(line):
+    """
+    The chain hash stored on a log line without decoding the record: the
+    last element of a compact record ("chain" is always the last key), or
+    the "chain" field of a JSON record. None for definitions and records
+    written before chaining.
+    """
+    item = json.loads(line)
+    if isinstance(item, list):
+        return item[-1] if _is_hash(item[-1]) else None
+    if item.keys() == {"id", "v"}:
+        return None
+    return item.get("chain")
+
+
+def is_record_line(line) -> bool:
+    item = json.loads(line)
+    return isinstance(item, list) or item.keys() != {"id", "v"}
+
+
+def last_chain(path: str) -> str:
+    """Chain hash of the last chained record in the log, GENESIS if there is none."""
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return GENESIS
+
+    window = TAIL_WINDOW
+    with open(path, "rb") as f:
+        while True:
+            start = max(0, size - window)
+            f.seek(start)
+            lines = f.read(size - start).splitlines()
+            if start > 0:
+                lines = lines[1:]  # probably cut in the middle
+            for line in reversed(lines):
+                if line.strip() and is_record_line(line):
+                    return line_chain(line) or GENESIS
+            if start == 0:
+                return GENESIS
+            window *= 4
+
+
+# Merkle trees over chain hashes (RFC 6962 style: leaf / node prefixes, odd node promoted)
+
+def _leaf(chain: str) -> bytes:
+    return hashlib.sha256(b"\x00" + bytes.fromhex(chain)).digest()
+
+
+def _node(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def merkle_levels(chains: list) -> list:
+    level = [_leaf(c) for c in chains]
+    levels = [level]
+    while len(level) > 1:
+        parents = [_node(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+        level = parents
+    return levels
+
+
+def merkle_root(chains: list) -> str:
+    return merkle_levels(chains)[-1][0].hex()
+
+
+def inclusion_proof(chains: list, index: int) -> list:
+    """[["L" | "R", sibling hash], ...] from leaf to root; O(log n) long."""
+    proof = []
+    for level in merkle_levels(chains)[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(["L" if sibling < index else "R", level[sibling].hex()])
+        index //= 2
+    return proof
+
+
+def verify_proof(chain: str, proof: list, root: str) -> bool:
+    node = _leaf(chain)
+    for side, sibling in proof:
+        sibling = bytes.fromhex(sibling)
+        node = _node(sibling, node) if side == "L" else _node(node, sibling)
+    return node.hex() == root
+
+
+# Checkpoints: one JSON line per batch of chained records, and an index of
+# the checkpointed records ({checkpoints}.index) so a proof reads one batch
+
+def read_checkpoints(path: str = AUDIT_CHECKPOINT_FILE) -> list:
+    try:
+        with open(path, "r") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+# Per process: index path -> {"read": bytes read, "table", "ids", "indexed"}
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def load_index(checkpoints_path: str = AUDIT_CHECKPOINT_FILE) -> dict:
+    """
+    The index of checkpointed records: "ids" maps a decision id to its
+    chain position (None if unchained) and line offset in the log, "table"
+    holds the compact definitions used up to "indexed", the log offset
+    indexed so far. Reads only what was appended since the last call.
+    """
+    path = f"{checkpoints_path}.index"
+    with _indexes_lock:
+        index = _indexes.setdefault(path, {"read": 0, "table": {}, "ids": {}, "indexed": 0})
+        try:
+            with open(path, "rb") as f:
+                f.seek(index["read"])
+                data = f.read()
+        except FileNotFoundError:
+            _indexes[path] = {"read": 0, "table": {}, "ids": {}, "indexed": 0}
+            return _indexes[path]
+        # A line still being appended is read next time
+        data = data[:data.rfind(b"\n") + 1]
+        index["read"] += len(data)
+        for line in data.splitlines():
+            item = json.loads(line)
+            if "decision_id" in item:
+                index["ids"].setdefault(item["decision_id"], (item["position"], item["offset"]))
+            elif "indexed" in item:
+                index["indexed"] = item["indexed"]
+            else:
+                index["table"][item["id"]] = item["v"]
+        return index
+
+
+def checkpoint(log_path: str, path: str = AUDIT_CHECKPOINT_FILE,
+               batch: int = AUDIT_CHECKPOINT_BATCH, flush: bool = False) -> list:
+    """
+    Appends a checkpoint (Merkle root of the chain hashes) for every full
+    batch of records logged since the last one, and for the remainder too
+    if flush, and indexes the records they cover. Safe to run from several
+    processes at once.
+    """
+    written = []
+    with open(path, "a+") as out:
+        fcntl.flock(out.fileno(), fcntl.LOCK_EX)
+        out.seek(0)
+        lines = [line for line in out.read().splitlines() if line.strip()]
+        last = json.loads(lines[-1]) if lines else None
+        position = last["index"] + last["count"] if last else 0
+        offset = last["end_offset"] if last else 0
+
+        index = load_index(path)
+        decoder = CompactDecoder()
+        decoder.table = dict(index["table"])
+        # Checkpoints written before the index: index the log they cover first
+        start = offset if index["indexed"] == offset else 0
+        line_position = position if start else 0
+        entries = []
+        line_offset = start
+
+        pending = []
+        try:
+            with open(log_path, "rb") as log:
+                fcntl.flock(log.fileno(), fcntl.LOCK_SH)
+                log.seek(start)
+                for line in log:
+                    record = decoder.feed(line)
+                    chain = record.get("chain") if record is not None else None
+                    if record is not None:
+                        entries.append((line_offset, record["decision"]["decision_id"], line_position if chain else None))
+                    line_offset += len(line)
+                    if chain is None:
+                        continue
+                    line_position += 1
+                    if line_offset <= offset:
+                        continue
+                    pending.append(chain)
+                    if len(pending) == batch:
+                        written.append(_checkpoint_entry(position, pending, line_offset))
+                        position += len(pending)
+                        pending = []
+        except FileNotFoundError:
+            return written
+
+        if flush and pending:
+            written.append(_checkpoint_entry(position, pending, line_offset))
+
+        for entry in written:
+            out.write(json.dumps(entry) + "\n")
+        out.flush()
+
+        indexed = written[-1]["end_offset"] if written else offset
+        if indexed != index["indexed"]:
+            index_lines = [
+                json.dumps({"id": key, "v": value}) + "\n"
+                for key, value in decoder.table.items() if key not in index["table"]
+            ]
+            index_lines.extend(
+                json.dumps({"decision_id": decision_id, "position": chain_position, "offset": at}) + "\n"
+                for at, decision_id, chain_position in entries if at < indexed
+            )
+            index_lines.append(json.dumps({"indexed": indexed}) + "\n")
+            with open(f"{path}.index", "a") as f:
+                f.write("".join(index_lines))
+    return written
+
+
+def _checkpoint_entry(position: int, chains: list, end_offset: int) -> dict:
+    return {
+        "index": position,
+        "count": len(chains),
+        "root": merkle_root(chains),
+        "last_chain": chains[-1],
+        "end_offset": end_offset,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+class AuditCheckpointer:
+    """Background thread that checkpoints full batches off the request path."""
+
+    def __init__(self, log_path: str, interval: float = AUDIT_CHECKPOINT_INTERVAL_S):
+        self.log_path = log_path
+        self.interval = interval
+
+    def start(self):
+        thread = threading.Thread(target=self._run, name="audit-checkpointer", daemon=True)
+        thread.start()
+        return thread
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            checkpoint(self.log_path)
+
+
+# Proofs for a single decision
+
+def prove(log_path: str, decision_id: str, checkpoints_path: str = AUDIT_CHECKPOINT_FILE):
+    """
+    (record, proof) for a decision; proof is None if the record is not
+    chained or its batch has not been checkpointed yet. A checkpointed
+    record is found through the index and its proof built from its batch
+    alone; otherwise only the log after the last checkpoint is searched.
+    """
+    index = load_index(checkpoints_path)
+    checkpoints = read_checkpoints(checkpoints_path)
+    decoder = CompactDecoder()
+    decoder.table = dict(index["table"])
+
+    with open(log_path, "rb") as f:
+        if decision_id not in index["ids"]:
+            f.seek(checkpoints[-1]["end_offset"] if checkpoints else 0)
+            for line in f:
+                record = decoder.feed(line)
+                if record is not None and record["decision"]["decision_id"] == decision_id:
+                    return record, None
+            return None, None
+
+        position, offset = index["ids"][decision_id]
+        f.seek(offset)
+        record = decoder.feed(f.readline())
+        if position is None:
+            return record, None
+
+        i = bisect.bisect_right([c["index"] for c in checkpoints], position) - 1
+        batch = checkpoints[i]
+        start = checkpoints[i - 1]["end_offset"] if i else 0
+        f.seek(start)
+        data = f.read(batch["end_offset"] - start)
+
+    chains = [chain for chain in map(line_chain, filter(bytes.strip, data.splitlines())) if chain is not None]
+    target = position - batch["index"]
+    return record, {
+        "leaf": record["chain"],
+        "index": target,
+        "batch": {k: batch[k] for k in ("index", "count", "root", "created")},
+        "path": inclusion_proof(chains, target),
+    }
+
+
+# Parallel verification of a whole log
+#
+# Phase 1 splits the log into newline-aligned chunks and collects, per chunk,
+# the compact definitions and the number of chained records, which gives
+# every chunk its starting position. Phase 2 decodes each chunk and checks
+# its internal links and the checkpoints of batches lying inside it; the
+# parent checks the links between chunks and batches that span chunks.
+
+def _scan_chunk(path: str, start: int, end: int):
+    table = {}
+    chained = 0
+    for line in chunk_lines(path, start, end):
+        item = json.loads(line)
+        if isinstance(item, dict) and item.keys() == {"id", "v"}:
+            table[item["id"]] = item["v"]
+        elif line_chain(line) is not None:
+            chained += 1
+    return table, chained
+
+
+def _verify_chunk(path: str, start: int, end: int, table: dict, position: int, checkpoints: list):
+    decoder = CompactDecoder()
+    decoder.table = table
+    starts = [c["index"] for c in checkpoints]
+
+    errors = []
+    head = None  # (position, canonical bytes, chain) of the first chained record
+    prev = None
+    unchained_first = 0  # unchained records before the first chained one
+    leaves = {}  # checkpoint index -> chain hashes of its records in this chunk
+
+    for line in chunk_lines(path, start, end):
+        record = decoder.feed(line)
+        if record is None:
+            continue
+        chain = record.get("chain")
+        if chain is None:
+            if prev is None:
+                unchained_first += 1
+            else:
+                errors.append(f"unchained record {record['decision']['decision_id']} after position {position - 1}")
+            continue
+
+        if prev is None:
+            head = (position, canonical(record), chain)
+        elif chain_hash(prev, record) != chain:
+            errors.append(f"chain broken at position {position} ({record['decision']['decision_id']})")
+        prev = chain
+
+        i = bisect.bisect_right(starts, position) - 1
+        if i >= 0 and position < starts[i] + checkpoints[i]["count"]:
+            leaves.setdefault(i, []).append(chain)
+        position += 1
+
+    # Batches wholly inside this chunk are checked here, the rest by the parent
+    partial = {}
+    for i, chains in leaves.items():
+        if len(chains) == checkpoints[i]["count"]:
+            if merkle_root(chains) != checkpoints[i]["root"]:
+                errors.append(f"checkpoint {checkpoints[i]['index']} root mismatch")
+        else:
+            partial[i] = chains
+
+    return {"errors": errors, "head": head, "tail": prev, "unchained_first": unchained_first, "partial": partial}
+
+
+def verify(log_path: str, checkpoints_path: str = AUDIT_CHECKPOINT_FILE, workers: int = None) -> dict:
+    workers = workers or multiprocessing.cpu_count()
+    chunks = split_chunks(log_path, workers * 4)
+    checkpoints = read_checkpoints(checkpoints_path)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        scans = list(pool.map(_scan_chunk, *zip(*[(log_path, s, e) for s, e in chunks])))
+
+        table = {}
+        positions = []
+        position = 0
+        for chunk_table, chained in scans:
+            table.update(chunk_table)
+            positions.append(position)
+            position += chained
+        total = position
+
+        futures = [
+            pool.submit(_verify_chunk, log_path, s, e, table, p, checkpoints)
+            for (s, e), p in zip(chunks, positions)
+        ]
+        results = [f.result() for f in futures]
+
+    errors = []
+    prev = None
+    partial = {}
+    for result in results:
+        errors.extend(result["errors"])
+        if prev is not None and result["unchained_first"]:
+            errors.append(f"{result['unchained_first']} unchained record(s) after chained records")
+        if result["head"] is not None:
+            position, body, chain = result["head"]
+            if hashlib.sha256((prev or GENESIS).encode("ascii") + body).hexdigest() != chain:
+                errors.append(f"chain broken at position {position}")
+            prev = result["tail"]
+        for i, chains in result["partial"].items():
+            partial.setdefault(i, []).extend(chains)
+
+    for i, chains in partial.items():
+        if len(chains) != checkpoints[i]["count"] or merkle_root(chains) != checkpoints[i]["root"]:
+            errors.append(f"checkpoint {checkpoints[i]['index']} root mismatch")
+
+    covered = checkpoints[-1]["index"] + checkpoints[-1]["count"] if checkpoints else 0
+    if covered > total:
+        errors.append(f"checkpoints cover {covered} records but the log has {total}: records were deleted")
+
+    return {
+        "records": total,
+        "checkpointed": min(covered, total),
+        "last_chain": prev or GENESIS,
+        "ok": not errors,
+        "errors": errors,
+    }
+
+
+# python -m services.audit_chain verify logs/audit.log --workers 8
+# python -m services.audit_chain checkpoint logs/audit.log --flush
+# python -m services.audit_chain prove logs/audit.log <decision_id>
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checkpoints", default=AUDIT_CHECKPOINT_FILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+    verify_parser = sub.add_parser("verify", help="check the hash chain and checkpoint roots")
+    verify_parser.add_argument("log")
+    verify_parser.add_argument("--workers", type=int)
+    checkpoint_parser = sub.add_parser("checkpoint", help="write checkpoints for full batches")
+    checkpoint_parser.add_argument("log")
+    checkpoint_parser.add_argument("--flush", action="store_true", help="also checkpoint the last partial batch")
+    prove_parser = sub.add_parser("prove", help="inclusion proof for one decision")
+    prove_parser.add_argument("log")
+    prove_parser.add_argument("decision_id")
+    args = parser.parse_args()
+
+    if args.command == "verify":
+        result = verify(args.log, args.checkpoints, args.workers)
+        for error in result["errors"][:50]:
+            print(error)
+        print(f"{result['records']} chained records, {result['checkpointed']} checkpointed: "
+              f"{'OK' if result['ok'] else 'FAILED'}")
+        raise SystemExit(0 if result["ok"] else 1)
+
+    if args.command == "checkpoint":
+        written = checkpoint(args.log, args.checkpoints, flush=args.flush)
+        print(f"Wrote {len(written)} checkpoint(s)")
+    else:
+        record, proof = prove(args.log, args.decision_id, args.checkpoints)
+        if record is None:
+            raise SystemExit("Decision ID not found")
+        print(json.dumps({"leaf": record.get("chain"), "proof": proof}, indent=2))
@@ -0,0 +1,184 @@
+import argparse
+import copy
+import hashlib
+import itertools
+import json
+import os
+import threading
+
+LIST, DICT, REF = 0, 1, 2
+
+INTERNED_KEYS = {
+    "policy_references", "reason_codes", "summary", "model_version",
+    "decision", "new_decision", "document", "section", "anchor",
+}
+
+# A reference ([2,"<12 hex>"]) costs 19 bytes; shorter values stay inline
+MIN_INTERNED_LENGTH = 20
+
+_SEPARATORS = (",", ":")
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, separators=_SEPARATORS)
+
+
+def _value_id(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+class CompactEncoder:
+    """
+    Compact audit encoding: one JSON array per record line, in which
+        dicts  become [1, <key shape id>, value, ...]
+        lists  become [0, item, ...]
+        strings and lists under INTERNED_KEYS (policy references, reason
+        codes, model version, ...) become [2, <value id>] when that is shorter.
+    Every key shape and interned value is written once, as an
+    {"id": ..., "v": ...} definition line, before the first line using it.
+    Ids are content hashes, so several processes appending to one file
+    need no coordination (at worst a definition is repeated).
+    """
+
+    def __init__(self):
+        self.defined = set()
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Forget definitions, e.g. when the log file was rotated."""
+        with self._lock:
+            self.defined = set()
+
+    def encode(self, record: dict) -> str:
+        """Definition lines (if any) and the record line, newline-terminated."""
+        definitions = []
+        with self._lock:
+            row = self._encode(record, definitions, interned=False)
+        lines = [_dumps(d) for d in definitions]
+        lines.append(_dumps(row))
+        return "\n".join(lines) + "\n"
+
+    def _define(self, value, text, definitions) -> str:
+        value_id = _value_id(text)
+        if value_id not in self.defined:
+            self.defined.add(value_id)
+            definitions.append({"id": value_id, "v": value})
+        return value_id
+
+    def _encode(self, value, definitions, interned):
+        # Whole dicts are never interned: they tend to carry per-record ids.
+        # Tuples are written as lists, as json.dumps does, and read back as lists
+        if interned and isinstance(value, (str, list, tuple)):
+            text = _dumps(value)
+            if len(text) >= MIN_INTERNED_LENGTH:
+                return [REF, self._define(value, text, definitions)]
+
+        if isinstance(value, dict):
+            keys = list(value)
+            shape = self._define(keys, _dumps(keys), definitions)
+            return [DICT, shape] + [
+                self._encode(v, definitions, k in INTERNED_KEYS) for k, v in value.items()
+            ]
+        if isinstance(value, (list, tuple)):
+            return [LIST] + [self._encode(v, definitions, False) for v in value]
+        return value
+
+
+class CompactDecoder:
+    """
+    Reads compact lines, definition lines and plain JSON records back into
+    the original records, so old and mixed logs stay readable.
+    """
+
+    def __init__(self):
+        self.table = {}
+
+    def feed(self, line: str):
+        """Returns the record on the line, or None for definition and blank lines."""
+        if not line.strip():
+            return None
+        item = json.loads(line)
+        if isinstance(item, list):
+            return self._decode(item)
+        if item.keys() == {"id", "v"}:
+            self.table[item["id"]] = item["v"]
+            return None
+        # Plain JSON record from before the compact encoding
+        return item
+
+    def _decode(self, value):
+        if not isinstance(value, list):
+            return value
+        tag = value[0]
+        if tag == DICT:
+            keys = self.table[value[1]]
+            return {k: self._decode(v) for k, v in zip(keys, value[2:])}
+        if tag == LIST:
+            return [self._decode(v) for v in value[1:]]
+        # Interned values are shared by many records; callers get their own copy
+        return copy.deepcopy(self.table[value[1]])
+
+
+def iter_records(path: str):
+    decoder = CompactDecoder()
+    with open(path, "r") as f:
+        for line in f:
+            record = decoder.feed(line)
+            if record is not None:
+                yield record
+
+
+def split_chunks(path: str, parts: int) -> list:
+    """(start, end) byte ranges of about size / parts, each starting at a line."""
+    size = os.path.getsize(path)
+    offsets = [0]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            f.seek(size * i // parts)
+            f.readline()
+            offsets.append(max(f.tell(), offsets[-1]))
+    offsets.append(size)
+    return [(start, end) for start, end in zip(offsets, offsets[1:]) if end > start]
+
+
+def chunk_lines(path: str, start: int, end: int):
+    """Non-blank lines (bytes) of one split_chunks range."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            if line.strip():
+                yield line
+
+
+def convert(source: str, target: str, to: str = "compact") -> int:
+    """Rewrites `source` in the `to` encoding and checks the result decodes to the same records."""
+    encoder = CompactEncoder()
+    count = 0
+    with open(target, "w") as out:
+        for record in iter_records(source):
+            out.write(encoder.encode(record) if to == "compact" else json.dumps(record) + "\n")
+            count += 1
+
+    for original, converted in itertools.zip_longest(iter_records(source), iter_records(target)):
+        if original != converted:
+            raise ValueError(f"Round trip mismatch at {original or converted}")
+    return count
+
+
+# python -m services.audit_codec convert logs/audit.log logs/audit.compact.log
+# python -m services.audit_codec convert logs/audit.compact.log logs/audit.json.log --to json
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+    convert_parser = sub.add_parser("convert", help="re-encode an audit log losslessly")
+    convert_parser.add_argument("source")
+    convert_parser.add_argument("target")
+    convert_parser.add_argument("--to", choices=["compact", "json"], default="compact")
+    args = parser.parse_args()
+
+    count = convert(args.source, args.target, args.to)
+    before, after = os.path.getsize(args.source), os.path.getsize(args.target)
+    print(f"Converted {count} records: {before} -> {after} bytes ({after / max(before, 1):.0%})")
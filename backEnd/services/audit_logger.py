@@ -1,26 +1,85 @@
+import fcntl
 import hashlib
 import json
+import os
+import threading
 import time
-from config import MODEL_VERSION
+from config import MODEL_VERSION, AUDIT_ENCODING
+from services.audit_chain import chain_hash, last_chain
+from services.audit_codec import CompactEncoder
+from services.audit_stats import AuditStats
+from services.metrics import timed
 
 LOG_FILE = "logs/audit.log"
 
 class AuditLogger:
+    # Compact encoding state for the log file currently being appended to
+    _encoder = CompactEncoder()
+    _log_file_id = None
+    _write_lock = threading.Lock()
+    # Chain hash of the last record written and the log size after it
+    _prev_chain = None
+    _log_size = None
+
     @staticmethod
     def hash_input(input_data: dict) -> str:
         data_bytes = json.dumps(input_data, sort_keys=True).encode("utf-8")
         return hashlib.sha256(data_bytes).hexdigest()
 
     @staticmethod
-    def log_decision(input_data: dict, decision_output: dict, explanation: dict = None, policy_refs: list = None):
+    @timed("audit_log_decision")
+    def log_decision(input_data: dict, decision_output: dict, explanation: dict = None, policy_refs: list = None,
+                     input_hash: str = None, cache_hit: bool = False, model_version: str = None):
         record = {
             "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "input_hash": AuditLogger.hash_input(input_data),
+            "input_hash": input_hash or AuditLogger.hash_input(input_data),
             "decision": decision_output,
             "explanation": explanation,
             "policy_references": policy_refs or [],
-            "model_version": MODEL_VERSION
+            # The version of the engine that decided; config's when no model was involved
+            "model_version": model_version or MODEL_VERSION,
+            "cache_hit": cache_hit
         }
 
-        with open(LOG_FILE, "a") as f:
-            f.write(json.dumps(record) + "\n")
+        AuditLogger.write_record(record)
+
+    @staticmethod
+    def write_record(record: dict):
+        AuditLogger.write_records([record])
+
+    @staticmethod
+    def write_records(records: list):
+        """
+        Appends the records, each with a "chain" hash over the previous
+        record's chain and itself, so edits and deletions break the chain
+        (python -m services.audit_chain verify). The file lock keeps the
+        chain linear when several workers append to the same log; a batch
+        goes out in one write. The /audit/stats counters are updated under
+        the same lock, with where the batch ends in the log.
+        """
+        with AuditLogger._write_lock, open(LOG_FILE, "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            stat = os.fstat(f.fileno())
+            file_id = (stat.st_dev, stat.st_ino)
+            # Another process appended, or the log is new or rotated: the cached state is stale
+            if (file_id, stat.st_size) != (AuditLogger._log_file_id, AuditLogger._log_size):
+                AuditLogger._prev_chain = last_chain(LOG_FILE)
+            if stat.st_size == 0 or file_id != AuditLogger._log_file_id:
+                AuditLogger._encoder.reset()
+
+            lines = []
+            prev = AuditLogger._prev_chain
+            for record in records:
+                record["chain"] = prev = chain_hash(prev, record)
+                if AUDIT_ENCODING == "compact":
+                    lines.append(AuditLogger._encoder.encode(record))
+                else:
+                    lines.append(json.dumps(record) + "\n")
+            data = "".join(lines)
+            f.write(data)
+            f.flush()
+
+            AuditLogger._prev_chain = prev
+            AuditLogger._log_file_id = file_id
+            AuditLogger._log_size = stat.st_size + len(data.encode("utf-8"))
+            AuditStats.record(records, f"{stat.st_dev}:{stat.st_ino}", AuditLogger._log_size)
@@ -0,0 +1,376 @@
+import argparse
+import fcntl
+import glob
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from config import AUDIT_STATS_FILE, AUDIT_STATS_HOURS, AUDIT_STATS_DAYS
+from services.audit_codec import CompactDecoder, chunk_lines, split_chunks
+
+# (name, timestamp prefix, buckets kept); timestamps are "%Y-%m-%d %H:%M:%S"
+GRANULARITIES = (("hourly", 13, AUDIT_STATS_HOURS), ("daily", 10, AUDIT_STATS_DAYS))
+
+# New segments at least this large are counted by the parallel rebuild()
+PARALLEL_REBUILD_BYTES = 8 * 1024 * 1024
+
+
+def new_counts() -> dict:
+    return {"records": 0, "decisions": {}, "what_if": {}, "reason_codes": {}, "model_versions": {}, "cache_hits": 0}
+
+
+def _bump(counter: dict, key, n: int = 1):
+    counter[key] = counter.get(key, 0) + n
+
+
+def add_record(counts: dict, record: dict):
+    """
+    Counts one audit record. Only /decision and application scoring records
+    carry an outcome ("decision"); what-if records carry "new_decision" and
+    /explanation records neither, so they add to "records" alone.
+    """
+    decision = record.get("decision") or {}
+    counts["records"] += 1
+    if record.get("cache_hit"):
+        counts["cache_hits"] += 1
+
+    if "decision" in decision:
+        _bump(counts["decisions"], decision["decision"])
+        _bump(counts["model_versions"], decision.get("model_version") or record.get("model_version"))
+        codes = set(decision.get("reason_codes") or [])
+        codes.update((record.get("explanation") or {}).get("reason_codes") or [])
+        for code in codes:
+            _bump(counts["reason_codes"], code)
+    elif "new_decision" in decision:
+        _bump(counts["what_if"], decision["new_decision"])
+
+
+def merge_counts(target: dict, source: dict):
+    target["records"] += source["records"]
+    target["cache_hits"] += source["cache_hits"]
+    for key in ("decisions", "what_if", "reason_codes", "model_versions"):
+        for name, n in source[key].items():
+            _bump(target[key], name, n)
+
+
+def with_rates(counts: dict) -> dict:
+    total = sum(counts["decisions"].values())
+    return {
+        **counts,
+        "decision_rates": {k: round(v / total, 4) for k, v in counts["decisions"].items()} if total else {},
+    }
+
+
+def report_of(state: dict) -> dict:
+    report = {"totals": with_rates(state["totals"])}
+    for name, _, _ in GRANULARITIES:
+        buckets = state[name]
+        report[name] = [{"bucket": key, **with_rates(buckets[key])} for key in sorted(buckets)]
+    return report
+
+
+class AuditStats:
+    """
+    Regulator aggregates (decision mix, reason codes, model versions) over
+    the audit log, overall and per hour / per day. Bucket retention is
+    fixed (AUDIT_STATS_HOURS, AUDIT_STATS_DAYS), so report() costs the same
+    however long the log grows.
+
+    The counters are kept on the write path: AuditLogger.write_records calls
+    record() under the log's file lock, which appends one line of deltas per
+    batch to this process's counter file ({path}.d/{pid}.jsonl) together
+    with where the batch ends in the log. report() adds the lines appended
+    to the counter files since its last call to its in-memory counters and
+    never writes or locks anything.
+
+    The history written before the counter files is counted into the base
+    file ({path}) by refresh() at start-up, once for all workers (in
+    parallel by rebuild() for a long log). Deltas ending at or before the
+    base's offset for their log segment are already in it, so are skipped.
+    """
+    path = AUDIT_STATS_FILE
+
+    _lock = threading.Lock()
+    _state = None
+    _base_id = None
+    _counted = {}
+    _read = {}
+    _delta_fd = None
+    _delta_pid = None
+
+    @staticmethod
+    def deltas_dir() -> str:
+        return f"{AuditStats.path}.d"
+
+    @staticmethod
+    def record(records: list, segment: str, end: int):
+        """Counts a batch just appended to the log segment ("dev:ino"), ending at byte end."""
+        state = new_state()
+        for record in records:
+            add_to_state(state, record)
+        line = json.dumps({"segment": segment, "end": end, "state": state}) + "\n"
+
+        if AuditStats._delta_pid != os.getpid():
+            # One file per process, opened after any fork; O_APPEND writes of a line don't interleave
+            os.makedirs(AuditStats.deltas_dir(), exist_ok=True)
+            AuditStats._delta_fd = os.open(
+                os.path.join(AuditStats.deltas_dir(), f"{os.getpid()}.jsonl"),
+                os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644,
+            )
+            AuditStats._delta_pid = os.getpid()
+        os.write(AuditStats._delta_fd, line.encode("utf-8"))
+
+    @staticmethod
+    def report() -> dict:
+        with AuditStats._lock:
+            AuditStats._catch_up()
+            return report_of(AuditStats._state)
+
+    @staticmethod
+    def _catch_up():
+        try:
+            stat = os.stat(AuditStats.path)
+            base_id = (stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            base_id = None
+        if AuditStats._state is None or base_id != AuditStats._base_id:
+            # A new base (refresh() replaced it): start over from it and every counter file
+            base = AuditStats.load()
+            AuditStats._state = base["state"]
+            AuditStats._counted = {key: segment["offset"] for key, segment in base["segments"].items()}
+            AuditStats._base_id = base_id
+            AuditStats._read = {}
+
+        try:
+            names = os.listdir(AuditStats.deltas_dir())
+        except FileNotFoundError:
+            names = []
+        for name in names:
+            path = os.path.join(AuditStats.deltas_dir(), name)
+            try:
+                with open(path, "rb") as f:
+                    f.seek(AuditStats._read.get(path, 0))
+                    data = f.read()
+            except FileNotFoundError:
+                continue
+            # A line still being appended is read next time
+            data = data[:data.rfind(b"\n") + 1]
+            AuditStats._read[path] = AuditStats._read.get(path, 0) + len(data)
+            for line in data.splitlines():
+                delta = json.loads(line)
+                if delta["end"] > AuditStats._counted.get(delta["segment"], -1):
+                    merge_state(AuditStats._state, delta["state"])
+        prune_state(AuditStats._state)
+
+    @staticmethod
+    def load() -> dict:
+        try:
+            with open(AuditStats.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"state": new_state(), "segments": {}}
+
+    @staticmethod
+    def refresh(paths: list = None, workers: int = None, block: bool = True) -> bool:
+        """
+        Counts the records appended to the log since the base was last
+        saved (the whole history the first time) into the base, then drops
+        the counter files of exited processes, which the base now covers.
+        Returns False without waiting if block is False and another process
+        holds the lock.
+        """
+        if os.path.dirname(AuditStats.path):
+            os.makedirs(os.path.dirname(AuditStats.path), exist_ok=True)
+        with open(f"{AuditStats.path}.lock", "a") as lock:
+            try:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX | (0 if block else fcntl.LOCK_NB))
+            except BlockingIOError:
+                return False
+
+            stored = AuditStats.load()
+            current = {}
+            for path in (paths or segments()):
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                # Keyed by inode, so a rotated segment keeps its offset under its new name
+                current[f"{stat.st_dev}:{stat.st_ino}"] = path
+
+            known = stored["segments"]
+            if any(key in known and os.path.getsize(path) < known[key]["offset"] for key, path in current.items()):
+                # A segment shrank: rewritten, so start over
+                stored = {"state": new_state(), "segments": {}}
+                known = stored["segments"]
+
+            # New segments with a long history are scanned in parallel, the rest read from their offset
+            history = {
+                key: (path, settled_size(path)) for key, path in current.items()
+                if key not in known and os.path.getsize(path) >= PARALLEL_REBUILD_BYTES
+            }
+            if history:
+                rebuilt = rebuild(list(history.values()), workers)
+                merge_state(stored["state"], rebuilt)
+                for key, (path, size) in history.items():
+                    known[key] = {"offset": size, "table": rebuilt["tables"].get(path, {})}
+
+            for key, path in current.items():
+                segment = known.setdefault(key, {"offset": 0, "table": {}})
+                segment["offset"] = count_from(path, segment, stored["state"])
+
+            # Segments no longer on disk stay listed, so their deltas aren't counted again
+            prune_state(stored["state"])
+            write_json(stored, AuditStats.path)
+
+            # Written before count_from read to the end of the log, so already counted
+            for name in os.listdir(AuditStats.deltas_dir()) if os.path.isdir(AuditStats.deltas_dir()) else []:
+                pid = int(name.split(".")[0])
+                if pid != os.getpid() and not process_alive(pid):
+                    os.remove(os.path.join(AuditStats.deltas_dir(), name))
+            return True
+
+    @staticmethod
+    def load_history(paths: list = None, workers: int = None):
+        """Catches the base up with the log in a background thread (at start-up)."""
+        thread = threading.Thread(
+            target=lambda: AuditStats.refresh(paths, workers), name="audit-stats-rebuild", daemon=True
+        )
+        thread.start()
+        return thread
+
+
+def process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def new_state() -> dict:
+    return {"totals": new_counts(), **{name: {} for name, _, _ in GRANULARITIES}}
+
+
+def add_to_state(state: dict, record: dict):
+    add_record(state["totals"], record)
+    timestamp = record.get("timestamp") or ""
+    for name, width, _ in GRANULARITIES:
+        add_record(state[name].setdefault(timestamp[:width], new_counts()), record)
+
+
+def merge_state(target: dict, source: dict):
+    merge_counts(target["totals"], source["totals"])
+    for name, _, _ in GRANULARITIES:
+        for key, counts in source[name].items():
+            merge_counts(target[name].setdefault(key, new_counts()), counts)
+
+
+def prune_state(state: dict):
+    for name, _, keep in GRANULARITIES:
+        buckets = state[name]
+        for key in sorted(buckets)[:-keep]:
+            del buckets[key]
+
+
+def settled_size(path: str) -> int:
+    """The segment's size between two AuditLogger writes (it appends under an exclusive lock)."""
+    with open(path, "rb") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_SH)
+        return os.fstat(f.fileno()).st_size
+
+
+def count_from(path: str, segment: dict, state: dict) -> int:
+    """Adds the records after segment["offset"] to state; returns the new offset."""
+    decoder = CompactDecoder()
+    # Compact lines may use definitions from before the offset
+    decoder.table = segment["table"]
+    offset = segment["offset"]
+    with open(path, "rb") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_SH)
+        f.seek(offset)
+        for line in f:
+            offset += len(line)
+            record = decoder.feed(line)
+            if record is not None:
+                add_to_state(state, record)
+    return offset
+
+
+def write_json(data: dict, path: str):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def segments(log_file: str = None) -> list:
+    """The live log and any rotated segments next to it (audit.log.1, ...)."""
+    if log_file is None:
+        from services.audit_logger import LOG_FILE as log_file
+    return sorted(path for path in glob.glob(log_file + "*") if os.path.isfile(path))
+
+
+# Parallel rebuild: definitions are collected from every chunk of a segment
+# first, since a compact line may use one written in an earlier chunk.
+
+def _chunk_definitions(path: str, start: int, end: int) -> dict:
+    table = {}
+    for line in chunk_lines(path, start, end):
+        if line.startswith(b'{"id"'):
+            item = json.loads(line)
+            if item.keys() == {"id", "v"}:
+                table[item["id"]] = item["v"]
+    return table
+
+
+def _chunk_stats(path: str, start: int, end: int, table: dict) -> dict:
+    decoder = CompactDecoder()
+    decoder.table = table
+    state = new_state()
+    for line in chunk_lines(path, start, end):
+        record = decoder.feed(line)
+        if record is not None:
+            add_to_state(state, record)
+    return state
+
+
+def rebuild(sizes: list, workers: int = None) -> dict:
+    """
+    sizes: [(path, bytes to read)]. Returns a state, plus each segment's
+    compact definitions under "tables" for counting on from there.
+    """
+    workers = workers or multiprocessing.cpu_count()
+    chunks = []
+    for path, size in sizes:
+        chunks.extend((path, start, min(end, size)) for start, end in split_chunks(path, workers * 4) if start < size)
+
+    state = {**new_state(), "tables": {}}
+    if not chunks:
+        return state
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        tables = state["tables"]
+        for (path, _, _), table in zip(chunks, pool.map(_chunk_definitions, *zip(*chunks))):
+            tables.setdefault(path, {}).update(table)
+
+        for partial in pool.map(_chunk_stats, *zip(*chunks), [tables[path] for path, _, _ in chunks]):
+            merge_state(state, partial)
+    return state
+
+
+# python -m services.audit_stats rebuild --workers 8
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = sub.add_parser("rebuild", help="recompute the aggregates from the audit log segments")
+    rebuild_parser.add_argument("paths", nargs="*")
+    rebuild_parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    paths = args.paths or segments()
+    state = rebuild([(path, os.path.getsize(path)) for path in paths], args.workers)
+    prune_state(state)
+    print(json.dumps(report_of(state), indent=2))
@@ -0,0 +1,10 @@
+# services/batcher.py
+from config import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+from shared.batching import MicroBatcher as _MicroBatcher
+
+
+class MicroBatcher(_MicroBatcher):
+    """The AI app's MicroBatcher (shared/batching.py) with this app's batch size and wait from config."""
+
+    def __init__(self, batch_fn, max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS, executor=None):
+        super().__init__(batch_fn, max_batch_size, max_wait_ms, executor)
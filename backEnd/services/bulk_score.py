@@ -0,0 +1,399 @@
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from config import AI_APP_DIR, BULK_CHUNK_SIZE
+from services.audit_logger import AuditLogger
+
+ENGINES = ("backend", "ai")
+PROGRESS_FILE = "_progress.jsonl"
+
+# Every field of these sections is a number in the AI app's Application schema (api/main.py)
+AI_NUMERIC_SECTIONS = ("financialInformation", "creditInformation", "employmentInformation", "loanDetails",
+                       "calculatedMetrics")
+# Fields that divide the derived metrics, Field(gt=0) there
+AI_POSITIVE_FIELDS = (("financialInformation", "monthlyIncome"), ("financialInformation", "monthlyGrossIncome"),
+                      ("loanDetails", "requestedTenure"))
+
+
+# Input: NDJSON lines are application dicts; CSV and Parquet columns are
+# flattened paths ("financialInformation.monthlyIncome") unflattened per row.
+# CSV cells stay strings until each engine's schema types them, so an
+# applicationId like "000123" is kept as written.
+
+def _unflatten(row: dict) -> dict:
+    nested = {}
+    for key, value in row.items():
+        if value is None or value == "":
+            continue
+        *parents, leaf = key.split(".")
+        target = nested
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[leaf] = value
+    return nested
+
+
+def _number(value):
+    if isinstance(value, str):
+        for cast in (int, float):
+            try:
+                value = cast(value)
+                break
+            except ValueError:
+                pass
+        else:
+            raise ValueError(f"not a number: {value!r}")
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TypeError(f"not a number: {value!r}")
+    if not math.isfinite(value):
+        raise ValueError(f"not a finite number: {value!r}")
+    return value
+
+
+def read_chunks(path: str, chunk_size: int):
+    """Yields lists of application dicts, chunk_size at a time, in file order."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield [_unflatten(row) for row in batch.to_pylist()]
+        return
+
+    chunk = []
+    with open(path, "r", newline="") as f:
+        if path.endswith(".csv"):
+            rows = (_unflatten(row) for row in csv.DictReader(f))
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+# Output: one columnar part file per chunk, and an NDJSON errors file for
+# its rejected rows, written by the worker
+
+def write_part(rows: list, path: str, output_format: str):
+    tmp = f"{path}.tmp"
+    if output_format == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        pq.write_table(pa.Table.from_pylist(rows), tmp)
+    else:
+        with open(tmp, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    # A part file exists only once complete, so a killed worker leaves nothing behind
+    os.replace(tmp, path)
+
+
+def write_errors(rejects: list, path: str):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        for reject in rejects:
+            f.write(json.dumps(reject) + "\n")
+    os.replace(tmp, path)
+
+
+# Workers
+
+_engine = None
+
+
+def _init_worker(engine: str):
+    global _engine
+    _engine = engine
+    if engine == "ai":
+        # ai.* reads its model and data relative to the app directory
+        os.environ.setdefault("XAI_MONITOR", "0")
+        os.chdir(AI_APP_DIR)
+        sys.path.insert(0, AI_APP_DIR)
+
+
+def _validate_backend(application: dict):
+    """The row as a LoanApplicationRaw (its schema casts CSV strings); raises ValueError if it cannot be scored."""
+    from schemas.loan_application_raw import LoanApplicationRaw
+    from services.derived_metrics import DerivedMetricsEngine
+
+    raw = LoanApplicationRaw(**application)
+    if DerivedMetricsEngine.inputs_from(raw) is None:
+        # Raises MissingMetrics without client metrics to fall back on
+        DerivedMetricsEngine.client_metrics(raw)
+    return raw
+
+
+def _validate_ai(application: dict) -> dict:
+    """The row with the AI schema's numbers cast; raises ValueError, TypeError or KeyError if it cannot be scored."""
+    from ai.features import flatten_application
+
+    application = dict(application)
+    application["applicationId"] = str(application["applicationId"])
+    for section in AI_NUMERIC_SECTIONS:
+        if section in application:
+            if not isinstance(application[section], dict):
+                raise TypeError(f"{section} must be an object")
+            application[section] = {key: _number(value) for key, value in application[section].items()}
+    for section, field in AI_POSITIVE_FIELDS:
+        value = application.get(section, {}).get(field)
+        if value is not None and value <= 0:
+            raise ValueError(f"{section}.{field} must be greater than 0")
+
+    # Every feature the model reads is present, and the metrics can be derived or taken from the row
+    flatten_application(application)
+    return application
+
+
+def _score_backend(raws: list):
+    from services.decision_engine import DecisionEngine
+    from services.derived_metrics import DerivedMetricsEngine
+    from services.explainability import ExplainabilityEngine
+    from services.feature_extractor import FeatureExtractor
+    from services.rag_engine import RAGEngine
+
+    engine = DecisionEngine()
+    # Derived metrics for the whole chunk in one vectorized pass
+    metrics = DerivedMetricsEngine.for_applications(raws)
+    features = [FeatureExtractor.extract(raw, m).dict() for raw, m in zip(raws, metrics)]
+    decisions = engine.decide_batch(features)
+
+    rows, records = [], []
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    for raw, row_features, decision in zip(raws, features, decisions):
+        explanation = ExplainabilityEngine.explain(row_features, decision["decision_id"])
+        policy_refs = RAGEngine.retrieve(explanation["reason_codes"])
+        rows.append({
+            "applicationId": raw.applicationId,
+            "decisionId": decision["decision_id"],
+            "decision": decision["decision"],
+            "probability": decision["probability"],
+            "reasonCodes": ";".join(explanation["reason_codes"]),
+            "summary": explanation["summary"],
+            "modelVersion": decision["model_version"],
+        })
+        records.append({
+            "timestamp": timestamp,
+            "input_hash": AuditLogger.hash_input(raw.dict()),
+            "decision": decision,
+            "explanation": explanation,
+            "policy_references": policy_refs,
+            "model_version": decision["model_version"],
+            "cache_hit": False,
+        })
+    return rows, records
+
+
+def _score_ai(applications: list):
+    from ai.explain_cache import model_version
+    from ai.pipeline import score_batch
+
+    scored = score_batch(applications, detail="reasons")
+    version = model_version()
+
+    rows, records = [], []
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    for application, result in zip(applications, scored):
+        decision = {
+            "decision_id": str(uuid.uuid4()),
+            "decision": result["decision"],
+            "probability": round(result["confidence"], 3),
+            "model_version": version,
+        }
+        row = {
+            "applicationId": result["applicationId"],
+            "decisionId": decision["decision_id"],
+            "decision": result["decision"],
+            "probability": result["confidence"],
+            "modelVersion": version,
+        }
+        for i, reason in enumerate(result["reasons"], 1):
+            row[f"reason{i}Feature"] = reason["feature"]
+            row[f"reason{i}Impact"] = reason["impact"]
+        rows.append(row)
+        records.append({
+            "timestamp": timestamp,
+            "input_hash": AuditLogger.hash_input(application),
+            "decision": decision,
+            "explanation": {"decision_id": decision["decision_id"], "reasons": result["reasons"]},
+            "policy_references": [],
+            "model_version": version,
+            "cache_hit": False,
+        })
+    return rows, records
+
+
+def score_chunk(index: int, applications: list, first_row: int, part_path: str, errors_path: str,
+                output_format: str):
+    """
+    Validates each row of one chunk, scores the valid ones and writes the
+    part file, and the errors file if any row was rejected. Returns
+    (index, scored rows, rejected rows, audit records).
+    """
+    if _engine == "ai":
+        validate, score = _validate_ai, _score_ai
+    else:
+        validate, score = _validate_backend, _score_backend
+
+    valid, rejects = [], []
+    for offset, application in enumerate(applications):
+        try:
+            valid.append(validate(application))
+        except (ValueError, TypeError, KeyError) as exc:
+            # pydantic's ValidationError and MissingMetrics are ValueErrors
+            rejects.append({
+                "row": first_row + offset,
+                "applicationId": application.get("applicationId"),
+                "error": str(exc),
+            })
+
+    rows, records = score(valid) if valid else ([], [])
+    if rows:
+        write_part(rows, part_path, output_format)
+    if rejects:
+        write_errors(rejects, errors_path)
+    return index, len(rows), len(rejects), records
+
+
+# Driver
+
+def read_progress(out_dir: str) -> dict:
+    path = os.path.join(out_dir, PROGRESS_FILE)
+    progress = {"run": None, "done": set()}
+    if not os.path.exists(path):
+        return progress
+    with open(path, "r") as f:
+        for line in f:
+            entry = json.loads(line)
+            if "run" in entry:
+                progress["run"] = entry["run"]
+            else:
+                progress["done"].add(entry["chunk"])
+    return progress
+
+
+def append_progress(out_dir: str, entry: dict):
+    with open(os.path.join(out_dir, PROGRESS_FILE), "a") as f:
+        f.write(json.dumps(entry) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def run(source: str, out_dir: str, engine: str = "backend", chunk_size: int = BULK_CHUNK_SIZE,
+        workers: int = None, output_format: str = None, audit: bool = True, log=print) -> dict:
+    """
+    Scores every application in `source` into part files under `out_dir`.
+    Rows that fail validation are skipped and listed, with their row number
+    (1-based, in file order) and the error, in errors-NNNNN.ndjson.
+
+    A chunk counts as done once its audit records are logged (one bulk
+    write) and it is appended to _progress.jsonl, so rerunning the same
+    command after an interruption skips finished chunks. A chunk whose
+    worker fails is logged and left out of the progress file, so the rerun
+    retries it. A crash between the audit write and the progress line
+    repeats that one chunk's audit records on resume.
+    """
+    source = os.path.abspath(source)
+    out_dir = os.path.abspath(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    if output_format is None:
+        try:
+            import pyarrow  # noqa: F401
+            output_format = "parquet"
+        except ImportError:
+            output_format = "csv"
+
+    settings = {"source": source, "engine": engine, "chunk_size": chunk_size, "format": output_format}
+    progress = read_progress(out_dir)
+    if progress["run"] is None:
+        append_progress(out_dir, {"run": settings})
+    elif progress["run"] != settings:
+        raise ValueError(f"{out_dir} holds a run with different settings: {progress['run']}")
+    done = progress["done"]
+
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    scored = 0
+    rejected = 0
+    skipped = 0
+    failed = []
+    chunks = {}
+
+    def finish(future):
+        nonlocal scored, rejected
+        try:
+            index, count, rejects, records = future.result()
+        except Exception as exc:
+            index = chunks[future]
+            failed.append(index)
+            log(f"chunk {index}: failed ({exc!r}), rerun to retry it")
+            return
+        if audit:
+            AuditLogger.write_records(records)
+        append_progress(out_dir, {"chunk": index, "rows": count, "rejected": rejects})
+        scored += count
+        rejected += rejects
+        elapsed = time.perf_counter() - start
+        log(f"chunk {index}: {count} rows, {rejects} rejected, {scored} total, {scored / elapsed:.0f} rows/s")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(engine,)) as pool:
+        pending = set()
+        for index, applications in enumerate(read_chunks(source, chunk_size)):
+            if index in done:
+                skipped += len(applications)
+                continue
+            part_path = os.path.join(out_dir, f"part-{index:05d}.{output_format}")
+            errors_path = os.path.join(out_dir, f"errors-{index:05d}.ndjson")
+            future = pool.submit(
+                score_chunk, index, applications, index * chunk_size + 1, part_path, errors_path, output_format
+            )
+            chunks[future] = index
+            pending.add(future)
+            # Bounded read-ahead: never hold more than two chunks per worker in memory
+            while len(pending) >= workers * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    finish(future)
+        for future in pending:
+            finish(future)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": scored,
+        "rejected_rows": rejected,
+        "skipped_rows": skipped,
+        "failed_chunks": sorted(failed),
+        "seconds": round(elapsed, 3),
+        "rows_per_s": round(scored / elapsed, 1) if elapsed else 0.0,
+        "output": out_dir,
+        "format": output_format,
+    }
+
+
+# python -m services.bulk_score portfolio.ndjson out/rescore-2026-10 --workers 8
+# python -m services.bulk_score portfolio.parquet out/rescore-ai --engine ai --chunk-size 20000
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("source", help=".ndjson / .jsonl, .csv or .parquet")
+    parser.add_argument("out_dir")
+    parser.add_argument("--engine", choices=ENGINES, default="backend",
+                        help="backend: FeatureExtractor + DecisionEngine; ai: AI-Explainability ai.pipeline (XGBoost + SHAP)")
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--format", choices=["parquet", "csv"], help="default: parquet if pyarrow is installed")
+    parser.add_argument("--no-audit", action="store_true")
+    args = parser.parse_args()
+
+    result = run(args.source, args.out_dir, args.engine, args.chunk_size, args.workers, args.format, not args.no_audit)
+    print(json.dumps(result))
+    sys.exit(1 if result["failed_chunks"] else 0)
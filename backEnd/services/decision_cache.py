@@ -0,0 +1,78 @@
+import asyncio
+from collections import OrderedDict
+from config import DECISION_CACHE_SIZE
+
+
+class DecisionCache:
+    """
+    Bounded LRU of finished decisions keyed by
+    (AuditLogger.hash_input, model version, policy version).
+
+    get_or_compute() runs compute() once per key: a repeat request gets
+    the stored value, and identical requests arriving while the first
+    one is still computing await that same computation. If that first
+    request is cancelled, the waiters compute it again themselves.
+    """
+
+    def __init__(self, max_size: int = DECISION_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_compute(self, key, compute):
+        """Returns (value, cache_hit). compute is an async callable."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key], True
+
+        if key in self._in_flight:
+            self.coalesced += 1
+            pending = self._in_flight[key]
+            try:
+                return await asyncio.shield(pending), True
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # this request was cancelled, not the one it waited on
+                return await self.get_or_compute(key, compute)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await compute()
+        except Exception as exc:
+            future.set_exception(exc)
+            # Nobody else may be waiting; mark the exception as retrieved
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            self._store(key, value)
+            return value, False
+        finally:
+            # Cancelled (a BaseException): release the waiters instead of leaving them hanging
+            if not future.done():
+                future.cancel()
+            del self._in_flight[key]
+
+    def _store(self, key, value):
+        self._entries[key] = value
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
@@ -1,15 +1,32 @@
 import uuid
 from models.black_box_model import BlackBoxModel
 from config import MODEL_VERSION
+from services.metrics import timed
+
+# The one status vocabulary for decisions shown to users (frontEnd decisionStatusConfig keys)
+STATUS = {"APPROVE": "approved", "REVIEW": "review", "REJECT": "denied"}
 
 
 class DecisionEngine:
     def __init__(self):
         self.model = BlackBoxModel()
+        self.model_version = MODEL_VERSION
+
+    def swap_model(self, model, model_version: str):
+        self.model = model
+        self.model_version = model_version
 
+    @timed("predict")
     def decide(self, features: dict) -> dict:
         probability = self.model.predict_proba(features)
+        return self._result(probability)
+
+    @timed("predict")
+    def decide_batch(self, features_list: list) -> list:
+        probabilities = self.model.predict_proba_batch(features_list)
+        return [self._result(probability) for probability in probabilities]
 
+    def _result(self, probability: float) -> dict:
         if probability >= 0.7:
             decision = "APPROVE"
             reasons = []
@@ -25,5 +42,10 @@ class DecisionEngine:
             "decision": decision,
             "probability": round(probability, 3),
             "reason_codes": reasons,
-            "model_version": MODEL_VERSION,
+            "model_version": self.model_version,
         }
+
+
+# Shared by every router, so a swap_model() reaches all of them (and the
+# ApplicationStore sees the new model_version and drops stale results)
+engine = DecisionEngine()
@@ -0,0 +1,83 @@
+from shared import derived_metrics
+from shared.derived_metrics import DEFAULT_ANNUAL_RATE
+
+
+class MissingMetrics(ValueError):
+    pass
+
+
+class DerivedMetricsEngine:
+    """
+    Computes calculatedMetrics from the raw loan and financial fields with
+    the dataset generator's formulas, instead of trusting client values.
+    The formulas, incremental update() and vectorized compute_batch() are
+    the AI app's ai/derived_metrics.py (vendored as shared/derived_metrics.py); this maps a LoanApplicationRaw
+    (monthlyGrossIncome, monthlyCommitments, requestedTenure) onto them.
+
+    Applications in the existing format (calculatedMetrics, no
+    annualInterestRate) keep their client values: the instalment depends on
+    the rate, and a guessed one would shift their risk features.
+    DEFAULT_ANNUAL_RATE is only used when there are no client metrics.
+    """
+
+    compute = staticmethod(derived_metrics.compute)
+    update = staticmethod(derived_metrics.update)
+    metrics = staticmethod(derived_metrics.metrics)
+    compute_batch = staticmethod(derived_metrics.compute_batch)
+
+    @staticmethod
+    def inputs_from(raw) -> dict:
+        """Engine inputs from a LoanApplicationRaw, or None when its metrics are not derived."""
+        financial = raw.financialInformation
+        gross = financial.monthlyGrossIncome
+        if not gross:
+            return None
+        rate = raw.loanDetails.annualInterestRate
+        if rate is None and raw.calculatedMetrics is not None:
+            return None
+
+        commitments = (financial.monthlyCommitments or {}).get("totalCommitments")
+        if commitments is None:
+            commitments = financial.debtServiceRatio * gross
+
+        return {
+            "loanAmount": raw.loanDetails.loanAmount,
+            "annualInterestRate": DEFAULT_ANNUAL_RATE if rate is None else rate,
+            "tenure": raw.loanDetails.requestedTenure,
+            "grossIncome": gross,
+            "commitments": commitments,
+            "savings": financial.savingsAmount,
+        }
+
+    @staticmethod
+    def client_metrics(raw) -> dict:
+        if raw.calculatedMetrics is None:
+            raise MissingMetrics("calculatedMetrics or financialInformation.monthlyGrossIncome is required")
+        return {
+            "debtServiceRatio": raw.financialInformation.debtServiceRatio,
+            **raw.calculatedMetrics.dict(),
+        }
+
+    @staticmethod
+    def for_application(raw) -> dict:
+        """Server-side metrics when inputs_from derives them, else the client's calculatedMetrics."""
+        inputs = DerivedMetricsEngine.inputs_from(raw)
+        if inputs is not None:
+            return DerivedMetricsEngine.metrics(DerivedMetricsEngine.compute(inputs))
+        return DerivedMetricsEngine.client_metrics(raw)
+
+    @staticmethod
+    def for_applications(raws: list) -> list:
+        """for_application for a batch, the derived ones in one vectorized pass."""
+        results = [None] * len(raws)
+        derived = []
+        for i, raw in enumerate(raws):
+            inputs = DerivedMetricsEngine.inputs_from(raw)
+            if inputs is None:
+                results[i] = DerivedMetricsEngine.client_metrics(raw)
+            else:
+                derived.append((i, inputs))
+
+        for (i, _), values in zip(derived, derived_metrics.metrics_batch([inputs for _, inputs in derived])):
+            results[i] = values
+        return results
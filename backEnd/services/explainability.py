@@ -1,4 +1,5 @@
 from typing import Dict, List
+from services.metrics import timed
 
 # Simple mock SHAP-style contribution mapping
 REASON_CODE_MAPPING = {
@@ -10,6 +11,7 @@ REASON_CODE_MAPPING = {
 
 class ExplainabilityEngine:
     @staticmethod
+    @timed("explain")
     def explain(features: Dict, decision_id: str) -> Dict:
         contributions = {}
         reason_codes: List[str] = []
@@ -1,17 +1,22 @@
 from schemas.loan_application_raw import LoanApplicationRaw
 from schemas.model_feature import ModelFeatures
+from services.derived_metrics import DerivedMetricsEngine
+from services.metrics import timed
 
 
 class FeatureExtractor:
     @staticmethod
-    def extract(raw: LoanApplicationRaw) -> ModelFeatures:
+    @timed("build_feature_vector")
+    def extract(raw: LoanApplicationRaw, metrics: dict = None) -> ModelFeatures:
+        # metrics: precomputed DerivedMetricsEngine output, e.g. from a what-if update
+        metrics = metrics or DerivedMetricsEngine.for_application(raw)
         return ModelFeatures(
             monthly_net_income=raw.financialInformation.monthlyNetIncome,
-            debt_service_ratio=raw.financialInformation.debtServiceRatio,
-            new_debt_service_ratio=raw.calculatedMetrics.newDebtServiceRatio,
+            debt_service_ratio=metrics["debtServiceRatio"],
+            new_debt_service_ratio=metrics["newDebtServiceRatio"],
             credit_score=raw.creditInformation.ctosScore,
             credit_utilization=raw.creditInformation.totalCreditUtilization,
             employment_stability_score=raw.employmentInformation.employmentStabilityScore,
-            cash_reserve_months=raw.calculatedMetrics.cashReserveMonths,
+            cash_reserve_months=metrics["cashReserveMonths"],
             overall_risk_score=raw.riskIndicators.overallRiskScore,
         )
@@ -0,0 +1,6 @@
+# services/metrics.py
+# Stage timers and the /metrics registry are the AI app's ai/metrics.py, vendored
+# as shared/metrics.py (XAI_METRICS=0 turns them into no-ops in both apps)
+from shared.metrics import (  # noqa: F401
+    METRICS_ENABLED, Histogram, observe, register_gauge, render_prometheus, stage_timer, timed
+)
@@ -1,3 +1,8 @@
+import json
+import os
+from config import POLICY_INDEX_PATH
+from services.metrics import timed
+
 POLICY_STORE = {
     "HIGH_DTI_RATIO": {
         "document": "Retail Credit Policy v3.2",
@@ -12,10 +17,35 @@ POLICY_STORE = {
 }
 
 class RAGEngine:
+    # Compiled "<reason code>:<sign>" -> passages, reloaded whenever the file is recompiled
+    _policy_index = {}
+    _policy_index_mtime = None
+
+    @staticmethod
+    def policy_index() -> dict:
+        try:
+            mtime = os.path.getmtime(POLICY_INDEX_PATH)
+        except OSError:
+            return RAGEngine._policy_index
+
+        if mtime != RAGEngine._policy_index_mtime:
+            with open(POLICY_INDEX_PATH, "r") as f:
+                RAGEngine._policy_index = json.load(f)["entries"]
+            RAGEngine._policy_index_mtime = mtime
+        return RAGEngine._policy_index
+
     @staticmethod
+    @timed("retrieve_context")
     def retrieve(reason_codes: list) -> list:
+        index = RAGEngine.policy_index()
         references = []
+        seen = set()
         for code in reason_codes:
             if code in POLICY_STORE:
                 references.append(POLICY_STORE[code])
+            # Reason codes flag risks, so they always count against approval
+            for chunk in index.get(f"{code}:negative", []):
+                if chunk["anchor"] not in seen:
+                    seen.add(chunk["anchor"])
+                    references.append(chunk)
         return references
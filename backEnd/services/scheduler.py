@@ -0,0 +1,40 @@
+# services/scheduler.py
+# Admission control: the AI app's priority pools (shared/priority_pool.py) with
+# this app's pools, per-class limits and route classes from config
+import functools
+from config import ROUTE_PRIORITY, SCHEDULER_MAX_QUEUE, SCHEDULER_WORKERS
+from shared.priority_pool import PRIORITY_CLASSES, Overloaded, PriorityExecutor, PriorityPool, Pools  # noqa: F401
+
+pools = Pools(SCHEDULER_WORKERS, SCHEDULER_MAX_QUEUE)
+pools.register_gauges()
+
+
+def get_pool(name: str) -> PriorityPool:
+    return pools.get(name)
+
+
+def executor(pool: str, priority: str) -> PriorityExecutor:
+    return PriorityExecutor(pools, pool, priority)
+
+
+async def run(pool: str, priority: str, fn, *args, **kwargs):
+    """await run("cpu", "bulk", fn, ...): fn(...) admitted and run on the pool's workers."""
+    return await pools.run(pool, priority, fn, *args, **kwargs)
+
+
+def scheduled(route: str, pool: str = "cpu"):
+    """
+    Runs a sync endpoint on a scheduler pool at the route's ROUTE_PRIORITY
+    class instead of on the shared Starlette threadpool.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return await run(pool, ROUTE_PRIORITY[route], fn, *args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+def stats() -> dict:
+    return pools.stats()
@@ -1,20 +1,61 @@
+import threading
+from collections import OrderedDict
+from config import WHAT_IF_STATE_CACHE_SIZE
 from services.feature_extractor import FeatureExtractor
-from services.decision_engine import DecisionEngine
+from services.decision_engine import engine
+from services.derived_metrics import DerivedMetricsEngine
 
 class WhatIfEngine:
-    def __init__(self):
-        self.decision_engine = DecisionEngine()
+    def __init__(self, state_cache_size: int = WHAT_IF_STATE_CACHE_SIZE):
+        self.decision_engine = engine
+        # Derived-metric state of each recently simulated application, keyed on its
+        # inputs: a what-if session on one application computes it once, then every
+        # simulation only updates the metrics downstream of the edited inputs
+        self._states = OrderedDict()
+        self._states_lock = threading.Lock()
+        self._state_cache_size = state_cache_size
+
+    def base_state(self, inputs: dict) -> dict:
+        key = tuple(inputs[name] for name in sorted(inputs))
+        with self._states_lock:
+            state = self._states.get(key)
+            if state is not None:
+                self._states.move_to_end(key)
+                return state
+
+        state = DerivedMetricsEngine.compute(inputs)
+        with self._states_lock:
+            self._states[key] = state
+            while len(self._states) > self._state_cache_size:
+                self._states.popitem(last=False)
+        return state
 
     def simulate(self, raw_application, modifications: dict) -> dict:
         # create a copy of the raw application
-        modified_application = raw_application.copy()
+        modified_application = raw_application.copy(deep=True)
         for field, value in modifications.items():
-            # apply allowed modifications only
-            if hasattr(modified_application, field):
-                setattr(modified_application, field, value)
+            # "loanDetails.loanAmount" edits one nested field; apply allowed modifications only
+            *parents, name = field.split(".")
+            target = modified_application
+            for parent in parents:
+                target = getattr(target, parent, None)
+            if target is not None and hasattr(target, name):
+                setattr(target, name, value)
+        # setattr skips validation: re-check the edited application against the schema
+        # (requestedTenure > 0 etc.); a ValidationError is served as 422 by main.py
+        modified_application = type(raw_application)(**modified_application.dict())
+
+        # Derived metrics follow the edit: only those downstream of the changed inputs are recomputed
+        metrics = None
+        base_inputs = DerivedMetricsEngine.inputs_from(raw_application)
+        new_inputs = DerivedMetricsEngine.inputs_from(modified_application)
+        if base_inputs is not None and new_inputs is not None:
+            changes = {k: v for k, v in new_inputs.items() if base_inputs[k] != v}
+            state = DerivedMetricsEngine.update(self.base_state(base_inputs), changes)
+            metrics = DerivedMetricsEngine.metrics(state)
 
         # extract features
-        features = FeatureExtractor.extract(modified_application)
+        features = FeatureExtractor.extract(modified_application, metrics)
 
         # run decision engine
         result = self.decision_engine.decide(features.dict())
@@ -28,5 +69,6 @@ class WhatIfEngine:
             "decision_id": result["decision_id"],
             "new_decision": result["decision"],
             "confidence_change": f"{delta:+}%",
-            "suggestion": suggestion_text
+            "suggestion": suggestion_text,
+            "calculated_metrics": metrics
         }
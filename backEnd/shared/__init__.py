@@ -0,0 +1,40 @@
+# shared/__init__.py
+"""
+Dependency-free modules vendored from the AI app (AI-Explainability/ai),
+so both apps run the same metrics, batching, admission and derived-metrics
+code without this app importing the other one's `ai` package:
+
+    metrics          stage timers and the /metrics registry
+    batching         MicroBatcher
+    priority_pool    priority pools and load shedding
+    derived_metrics  server-side calculatedMetrics formulas
+
+The copies are generated: edit the AI app's module, then refresh them with
+
+    python -m shared
+
+tests/test_shared_modules.py fails while a copy is out of date.
+"""
+import os
+
+MODULES = ("metrics", "batching", "priority_pool", "derived_metrics")
+
+SOURCE_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "AI-Explainability", "ai")
+)
+
+
+def vendored(name: str) -> str:
+    """The source of ai/<name>.py as this package's copy: header and ai imports renamed."""
+    with open(os.path.join(SOURCE_DIR, f"{name}.py")) as f:
+        lines = f.read().splitlines(keepends=True)
+
+    header = f"# shared/{name}.py: vendored from AI-Explainability/ai/{name}.py by `python -m shared`, do not edit\n"
+    if lines and lines[0].startswith(f"# ai/{name}.py"):
+        lines = lines[1:]
+    lines = [
+        line.replace("from ai import ", "from shared import ", 1).replace("from ai.", "from shared.", 1)
+        if line.startswith(("from ai import ", "from ai.")) else line
+        for line in lines
+    ]
+    return header + "".join(lines)
@@ -0,0 +1,9 @@
+# python -m shared: refresh the vendored copies from AI-Explainability/ai
+import os
+from shared import MODULES, vendored
+
+here = os.path.dirname(os.path.abspath(__file__))
+for name in MODULES:
+    with open(os.path.join(here, f"{name}.py"), "w", newline="\n") as f:
+        f.write(vendored(name))
+    print(f"shared/{name}.py")
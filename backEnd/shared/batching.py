@@ -0,0 +1,138 @@
+# shared/batching.py: vendored from AI-Explainability/ai/batching.py by `python -m shared`, do not edit
+import asyncio
+import contextlib
+import threading
+from collections import Counter
+
+MAX_BATCH_SIZE = 64
+MAX_WAIT_MS = 5.0
+
+# Queued behind the last item of a queue whose worker should exit
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item requests into one call of batch_fn.
+
+    Callers await submit(item); a background task collects items for up to
+    max_wait_ms or max_batch_size items, runs batch_fn(items) in a worker
+    thread and hands each caller its own result back.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS, executor=None):
+        self.batch_fn = batch_fn
+        # None: the event loop's default executor
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._loop = None
+        self._queue = None
+        self._worker = None
+
+        self._lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._batches = 0
+        self._items = 0
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._start(loop)
+
+        future = loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    def _start(self, loop):
+        if self._loop is loop and self._queue is not None:
+            # The worker died: its replacement takes over the queued items
+            queue = self._queue
+        else:
+            self._retire()
+            queue = asyncio.Queue()
+        self._loop = loop
+        self._queue = queue
+        self._worker = loop.create_task(self._run(queue))
+
+    def _retire(self):
+        """
+        Stops the previous event loop's worker once it has served what is
+        already queued; if that loop is closed, nothing can serve or await
+        its items any more and they are failed instead.
+        """
+        loop, queue = self._loop, self._queue
+        if queue is None:
+            return
+        if loop.is_running():
+            loop.call_soon_threadsafe(queue.put_nowait, _STOP)
+        elif not loop.is_closed():
+            queue.put_nowait(_STOP)
+        else:
+            error = RuntimeError("MicroBatcher's event loop was closed")
+            while not queue.empty():
+                _, future = queue.get_nowait()
+                # A closed loop cannot run the future's callbacks
+                with contextlib.suppress(RuntimeError):
+                    if not future.done():
+                        future.set_exception(error)
+
+    async def _run(self, queue):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            entry = await queue.get()
+            if entry is _STOP:
+                return
+            batch = [entry]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                if not queue.empty():
+                    entry = queue.get_nowait()
+                else:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        entry = await asyncio.wait_for(queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            self._record(len(batch))
+            items = [item for item, _ in batch]
+
+            try:
+                results = await loop.run_in_executor(self.executor, self.batch_fn, items)
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def _record(self, size):
+        with self._lock:
+            self._batches += 1
+            self._items += size
+            self._batch_sizes[size] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+                "batches": self._batches,
+                "items": self._items,
+                "mean_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+                "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+            }
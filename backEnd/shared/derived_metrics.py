@@ -0,0 +1,177 @@
+# shared/derived_metrics.py: vendored from AI-Explainability/ai/derived_metrics.py by `python -m shared`, do not edit
+"""
+Server-side calculatedMetrics, from the raw loan and financial fields, with
+the formulas of input/dataset_generator.py:
+
+    instalment              amortized payment of loanAmount over requestedTenure
+    debtServiceRatio        totalCommitments / gross income
+    instalmentToIncomeRatio instalment / gross income
+    newDebtServiceRatio     (totalCommitments + instalment) / gross income
+    cashReserveMonths       savingsAmount / (totalCommitments + instalment)
+
+They are derived when an application gives loanDetails.requestedTenure and
+either loanDetails.annualInterestRate or no calculatedMetrics; otherwise its
+calculatedMetrics are used as sent, so payloads in the existing format score
+as before instead of at a guessed rate. Gross income is
+financialInformation.monthlyGrossIncome, falling back to monthlyIncome; the
+rate falls back to XAI_DEFAULT_ANNUAL_RATE only when there are no client
+metrics to use.
+
+A state holds the inputs and unrounded metrics; update() recomputes only
+the metrics downstream of the inputs that changed. compute_batch() does the
+same for NumPy columns, for build_feature_matrix. backEnd's
+services/derived_metrics.py maps its LoanApplicationRaw onto these inputs.
+"""
+import os
+
+DEFAULT_ANNUAL_RATE = float(os.getenv("XAI_DEFAULT_ANNUAL_RATE", "0.06"))
+
+# Derived metrics in dependency order, the values each one reads, and output rounding
+DEPENDS = {
+    "instalment": ("loanAmount", "annualInterestRate", "tenure"),
+    "debtServiceRatio": ("commitments", "grossIncome"),
+    "instalmentToIncomeRatio": ("instalment", "grossIncome"),
+    "newDebtServiceRatio": ("commitments", "instalment", "grossIncome"),
+    "cashReserveMonths": ("savings", "commitments", "instalment"),
+}
+ROUNDING = {
+    "instalment": 2,
+    "debtServiceRatio": 3,
+    "instalmentToIncomeRatio": 3,
+    "newDebtServiceRatio": 3,
+    "cashReserveMonths": 1,
+}
+INPUTS = ("loanAmount", "annualInterestRate", "tenure", "grossIncome", "commitments", "savings")
+# The model's calculatedMetrics features
+FEATURE_METRICS = ("debtServiceRatio", "newDebtServiceRatio", "cashReserveMonths", "instalmentToIncomeRatio")
+
+# cashReserveMonths when there is nothing to service (same as the dataset generator)
+NO_COMMITMENTS_RESERVE = 999
+
+
+def monthly_instalment(loan_amount, annual_rate, tenure):
+    """Amortized monthly payment; an interest-free loan is repaid in equal parts."""
+    monthly_rate = annual_rate / 12
+    if monthly_rate == 0:
+        return loan_amount / tenure
+    growth = (1 + monthly_rate) ** tenure
+    return loan_amount * (monthly_rate * growth) / (growth - 1)
+
+
+def monthly_instalment_batch(loan_amount, annual_rate, tenure):
+    """monthly_instalment for NumPy arrays, element-wise."""
+    import numpy as np
+
+    monthly_rate = np.asarray(annual_rate, dtype=float) / 12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = (1 + monthly_rate) ** tenure
+        return np.where(monthly_rate == 0, loan_amount / tenure, loan_amount * (monthly_rate * growth) / (growth - 1))
+
+
+def _cash_reserve(v):
+    outgoing = v["commitments"] + v["instalment"]
+    return v["savings"] / outgoing if outgoing > 0 else NO_COMMITMENTS_RESERVE
+
+
+FORMULAS = {
+    "instalment": lambda v: monthly_instalment(v["loanAmount"], v["annualInterestRate"], v["tenure"]),
+    "debtServiceRatio": lambda v: v["commitments"] / v["grossIncome"],
+    "instalmentToIncomeRatio": lambda v: v["instalment"] / v["grossIncome"],
+    "newDebtServiceRatio": lambda v: (v["commitments"] + v["instalment"]) / v["grossIncome"],
+    "cashReserveMonths": _cash_reserve,
+}
+
+
+def inputs_from(application: dict):
+    """Inputs from a /predict application dict, or None when its metrics are not derived."""
+    loan = application["loanDetails"]
+    financial = application["financialInformation"]
+    tenure = loan.get("requestedTenure")
+    rate = loan.get("annualInterestRate")
+    if tenure is None or (rate is None and application.get("calculatedMetrics")):
+        return None
+
+    return {
+        "loanAmount": loan["loanAmount"],
+        "annualInterestRate": DEFAULT_ANNUAL_RATE if rate is None else rate,
+        "tenure": tenure,
+        "grossIncome": financial.get("monthlyGrossIncome") or financial["monthlyIncome"],
+        "commitments": financial["totalCommitments"],
+        "savings": financial["savingsAmount"],
+    }
+
+
+def compute(inputs: dict) -> dict:
+    return update({}, inputs)
+
+
+def update(state: dict, changes: dict) -> dict:
+    """New state with `changes` applied to the inputs of `state`."""
+    state = {**state, **changes}
+    dirty = set(changes)
+    for name, reads in DEPENDS.items():
+        if dirty.intersection(reads):
+            state[name] = FORMULAS[name](state)
+            dirty.add(name)
+    return state
+
+
+def metrics(state: dict) -> dict:
+    return {name: round(state[name], digits) for name, digits in ROUNDING.items()}
+
+
+def calculated_metrics(application: dict) -> dict:
+    """The model's calculatedMetrics features for one application."""
+    inputs = inputs_from(application)
+    if inputs is not None:
+        return metrics(compute(inputs))
+    if not application.get("calculatedMetrics"):
+        raise ValueError("calculatedMetrics or loanDetails.requestedTenure is required")
+    return {name: application["calculatedMetrics"][name] for name in FEATURE_METRICS}
+
+
+def compute_batch(columns: dict) -> dict:
+    """Same metrics for NumPy arrays (or lists) of inputs, one element per application."""
+    import numpy as np
+
+    loan = np.asarray(columns["loanAmount"], dtype=float)
+    tenure = np.asarray(columns["tenure"], dtype=float)
+    gross = np.asarray(columns["grossIncome"], dtype=float)
+    commitments = np.asarray(columns["commitments"], dtype=float)
+    savings = np.asarray(columns["savings"], dtype=float)
+
+    instalment = monthly_instalment_batch(loan, columns["annualInterestRate"], tenure)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        outgoing = commitments + instalment
+        values = {
+            "instalment": instalment,
+            "debtServiceRatio": commitments / gross,
+            "instalmentToIncomeRatio": instalment / gross,
+            "newDebtServiceRatio": outgoing / gross,
+            "cashReserveMonths": np.where(outgoing > 0, savings / outgoing, NO_COMMITMENTS_RESERVE),
+        }
+    return {name: np.round(values[name], digits) for name, digits in ROUNDING.items()}
+
+
+def metrics_batch(inputs: list) -> list:
+    """metrics(compute(i)) for each of a list of input dicts, in one vectorized pass."""
+    if not inputs:
+        return []
+    values = compute_batch({key: [i[key] for i in inputs] for key in INPUTS})
+    return [{name: float(values[name][row]) for name in ROUNDING} for row in range(len(inputs))]
+
+
+def batch_calculated_metrics(applications: list) -> list:
+    """calculated_metrics for many applications, derived ones in one vectorized pass."""
+    results = [None] * len(applications)
+    derived = []
+    for i, application in enumerate(applications):
+        inputs = inputs_from(application)
+        if inputs is None:
+            results[i] = calculated_metrics(application)
+        else:
+            derived.append((i, inputs))
+
+    for (i, _), values in zip(derived, metrics_batch([inputs for _, inputs in derived])):
+        results[i] = values
+    return results
@@ -0,0 +1,130 @@
+# shared/metrics.py: vendored from AI-Explainability/ai/metrics.py by `python -m shared`, do not edit
+import bisect
+import contextlib
+import functools
+import os
+import threading
+import time
+
+# XAI_METRICS=0 turns every timer into a no-op (decorators return the
+# undecorated function, stage_timer a shared null context)
+METRICS_ENABLED = os.getenv("XAI_METRICS", "1") == "1"
+
+STAGE_METRIC = "xai_stage_latency_seconds"
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Log-spaced bucket bounds from 10us to ~100s, ~12% apart
+BUCKETS = [1e-5 * 1.12 ** i for i in range(143)]
+
+_NULL_TIMER = contextlib.nullcontext()
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; constant memory, quantiles by interpolation."""
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q: float) -> float:
+        with self._lock:
+            counts = list(self.counts)
+            total = self.count
+        if total == 0:
+            return 0.0
+
+        rank = q * total
+        seen = 0
+        for i, c in enumerate(counts):
+            if c and seen + c >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return lower + (upper - lower) * (rank - seen) / c
+            seen += c
+        return self.bounds[-1]
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+_gauges = {}
+
+
+def observe(stage: str, seconds: float):
+    histogram = _histograms.get(stage)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = _histograms.setdefault(stage, Histogram())
+    histogram.observe(seconds)
+
+
+@contextlib.contextmanager
+def _timer(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+def stage_timer(stage: str):
+    """with stage_timer("retrieve_context"): ..."""
+    if not METRICS_ENABLED:
+        return _NULL_TIMER
+    return _timer(stage)
+
+
+def timed(stage: str):
+    """Decorator form of stage_timer."""
+    def decorator(fn):
+        if not METRICS_ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(stage, time.perf_counter() - start)
+
+        return wrapper
+    return decorator
+
+
+def register_gauge(name: str, fn, help_text: str = "", **labels):
+    """fn() is called on every /metrics scrape and must return a number."""
+    label_text = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    _gauges[(name, label_text)] = (fn, help_text)
+
+
+def render_prometheus() -> str:
+    lines = [
+        f"# HELP {STAGE_METRIC} Latency of each pipeline stage in seconds",
+        f"# TYPE {STAGE_METRIC} summary",
+    ]
+    for stage, h in sorted(_histograms.items()):
+        for q in QUANTILES:
+            lines.append(f'{STAGE_METRIC}{{stage="{stage}",quantile="{q}"}} {h.quantile(q):.6g}')
+        lines.append(f'{STAGE_METRIC}_sum{{stage="{stage}"}} {h.sum:.6g}')
+        lines.append(f'{STAGE_METRIC}_count{{stage="{stage}"}} {h.count}')
+
+    declared = set()
+    for (name, label_text), (fn, help_text) in sorted(_gauges.items()):
+        if name not in declared:
+            declared.add(name)
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+        series = f"{name}{{{label_text}}}" if label_text else name
+        lines.append(f"{series} {fn()}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Run from anywhere: the app's packages (api, services, config) import from the
+# app directory, as under `uvicorn main:app`
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
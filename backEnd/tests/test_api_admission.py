@@ -0,0 +1,41 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from config import AI_APP_DIR, SCHEDULER_MAX_QUEUE  # noqa: E402
+from main import app  # noqa: E402
+from services import scheduler  # noqa: E402
+
+
+def example_application() -> dict:
+    with open(os.path.join(AI_APP_DIR, "input", "example_loan.json")) as f:
+        return json.load(f)
+
+
+def test_full_interactive_class_returns_429_with_retry_after(monkeypatch):
+    monkeypatch.setitem(SCHEDULER_MAX_QUEUE, "interactive", 0)
+
+    response = TestClient(app).post("/decision/decision", json=example_application())
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert scheduler.stats()["cpu"]["classes"]["interactive"]["rejected"] >= 1
+
+
+def test_scheduled_route_is_shed_by_its_class(monkeypatch):
+    # /what-if runs on the cpu pool at bulk priority
+    monkeypatch.setitem(SCHEDULER_MAX_QUEUE, "bulk", 0)
+
+    response = TestClient(app).post(
+        "/what-if/what-if",
+        json={"application": example_application(), "modifications": {"financialInformation.savingsAmount": 1}},
+    )
+
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
@@ -0,0 +1,78 @@
+import json
+import os
+
+import pytest
+
+from config import AI_APP_DIR
+from services import audit_logger
+from services.audit_logger import AuditLogger
+from services.audit_stats import AuditStats
+
+
+def example_application() -> dict:
+    with open(os.path.join(AI_APP_DIR, "input", "example_loan.json")) as f:
+        return json.load(f)
+
+
+def test_audit_records_the_deciding_model_version(tmp_path, monkeypatch):
+    log_file = tmp_path / "audit.log"
+    monkeypatch.setattr(audit_logger, "LOG_FILE", str(log_file))
+    monkeypatch.setattr(audit_logger, "AUDIT_ENCODING", "json")
+    monkeypatch.setattr(AuditStats, "path", str(tmp_path / "audit.stats.json"))
+    monkeypatch.setattr(AuditStats, "_delta_pid", None)
+
+    AuditLogger.log_decision({"applicationId": "A"}, {"decision_id": "d1"}, model_version="swapped-v2")
+    AuditLogger.log_decision({"applicationId": "B"}, {"decision_id": "d2"})
+
+    versions = [json.loads(line)["model_version"] for line in log_file.read_text().splitlines()]
+    assert versions == ["swapped-v2", audit_logger.MODEL_VERSION]
+
+
+def test_listing_queues_unscored_applications_instead_of_scoring_them(tmp_path, monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from api import applications
+    from main import app
+    from services.application_store import ApplicationStore
+
+    store = ApplicationStore(str(tmp_path / "applications.db"))
+    store.save_application("LA-1", example_application())
+    queued = []
+    monkeypatch.setattr(applications, "store", store)
+    monkeypatch.setattr(applications, "queue_rescore", queued.append)
+    monkeypatch.setattr(applications, "score_application", lambda application: pytest.fail("scored on GET"))
+
+    response = TestClient(app).get("/api/applications")
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": "LA-1", "decision": {"status": "pending", "confidence": None, "riskLevel": None}}
+    ]
+    assert queued == ["LA-1"]
+
+
+def test_store_connects_on_first_use_and_again_after_a_fork(tmp_path, monkeypatch):
+    from services.application_store import ApplicationStore
+
+    path = tmp_path / "applications.db"
+    store = ApplicationStore(str(path))
+    assert not path.exists()
+
+    store.save_application("LA-1", {"applicationId": "LA-1"})
+    parent_connection = store._conn
+
+    # A forked worker gets its own connection to the same database
+    monkeypatch.setattr(os, "getpid", lambda: -1)
+    assert store._conn is not parent_connection
+    assert store.get_application("LA-1") == {"applicationId": "LA-1"}
+
+
+def test_routers_share_one_decision_engine():
+    pytest.importorskip("pydantic")
+    from services.decision_engine import STATUS, engine
+    from services.what_if_engine import WhatIfEngine
+
+    assert WhatIfEngine().decision_engine is engine
+    assert {STATUS[engine._result(p)["decision"]] for p in (0.9, 0.5, 0.1)} == {"approved", "review", "denied"}
@@ -0,0 +1,97 @@
+import json
+import os
+
+import pytest
+
+from services import audit_chain, audit_logger
+from services.audit_chain import checkpoint, load_index, prove, verify, verify_proof
+from services.audit_logger import AuditLogger
+from services.audit_stats import AuditStats
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    log_file = tmp_path / "audit.log"
+    monkeypatch.setattr(audit_logger, "LOG_FILE", str(log_file))
+    monkeypatch.setattr(AuditStats, "path", str(tmp_path / "audit.stats.json"))
+    monkeypatch.setattr(AuditStats, "_delta_pid", None)
+    return log_file
+
+
+def write_log(count: int):
+    for i in range(count):
+        AuditLogger.log_decision({"applicationId": f"A{i}"}, {"decision_id": f"d{i}", "decision": "APPROVE"})
+
+
+@pytest.mark.parametrize("encoding", ["json", "compact"])
+def test_checkpointed_records_have_verifiable_proofs(log, tmp_path, monkeypatch, encoding):
+    monkeypatch.setattr(audit_logger, "AUDIT_ENCODING", encoding)
+    checkpoints = str(tmp_path / "audit.checkpoints")
+    write_log(5)
+    assert len(checkpoint(str(log), checkpoints, batch=2)) == 2
+
+    assert load_index(checkpoints)["ids"]["d3"][0] == 3
+    for i in range(4):
+        record, proof = prove(str(log), f"d{i}", checkpoints)
+        assert record["decision"]["decision_id"] == f"d{i}"
+        assert proof["batch"]["index"] == i // 2 * 2
+        assert verify_proof(record["chain"], proof["path"], proof["batch"]["root"])
+
+    # d4's batch isn't full, so not checkpointed yet
+    record, proof = prove(str(log), "d4", checkpoints)
+    assert record["decision"]["decision_id"] == "d4" and proof is None
+    assert prove(str(log), "missing", checkpoints) == (None, None)
+
+    checkpoint(str(log), checkpoints, batch=2, flush=True)
+    record, proof = prove(str(log), "d4", checkpoints)
+    assert verify_proof(record["chain"], proof["path"], proof["batch"]["root"])
+
+
+def test_checkpoints_written_before_the_index_are_indexed(log, tmp_path, monkeypatch):
+    monkeypatch.setattr(audit_logger, "AUDIT_ENCODING", "compact")
+    checkpoints = str(tmp_path / "audit.checkpoints")
+    write_log(4)
+    checkpoint(str(log), checkpoints, batch=2)
+    os.remove(f"{checkpoints}.index")
+    monkeypatch.setattr(audit_chain, "_indexes", {})
+
+    write_log(1)
+    checkpoint(str(log), checkpoints, batch=2)
+    record, proof = prove(str(log), "d1", checkpoints)
+    assert verify_proof(record["chain"], proof["path"], proof["batch"]["root"])
+
+
+def tampered(log, checkpoints: str, edit) -> dict:
+    write_log(4)
+    checkpoint(str(log), checkpoints, batch=2)
+    assert verify(str(log), checkpoints, workers=2)["ok"]
+
+    lines = log.read_text().splitlines(keepends=True)
+    log.write_text("".join(edit(lines)))
+    return verify(str(log), checkpoints, workers=2)
+
+
+def test_verify_reports_an_edited_record(log, tmp_path, monkeypatch):
+    monkeypatch.setattr(audit_logger, "AUDIT_ENCODING", "json")
+
+    def edit(lines):
+        record = json.loads(lines[2])
+        record["decision"]["decision"] = "REJECT"
+        lines[2] = json.dumps(record) + "\n"
+        return lines
+
+    result = tampered(log, str(tmp_path / "audit.checkpoints"), edit)
+    assert not result["ok"]
+    # The next record still links to the stored hash, so only the edited one is reported
+    assert len(result["errors"]) == 1
+    assert result["errors"][0].startswith("chain broken at position 2")
+
+
+def test_verify_reports_a_deleted_record(log, tmp_path, monkeypatch):
+    monkeypatch.setattr(audit_logger, "AUDIT_ENCODING", "json")
+    result = tampered(log, str(tmp_path / "audit.checkpoints"), lambda lines: lines[:1] + lines[2:])
+
+    assert not result["ok"]
+    assert "checkpoint 0 root mismatch" in result["errors"]
+    assert any(error.startswith("chain broken at position 1") for error in result["errors"])
+    assert "checkpoints cover 4 records but the log has 3: records were deleted" in result["errors"]
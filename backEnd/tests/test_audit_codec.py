@@ -0,0 +1,78 @@
+import json
+import os
+import subprocess
+import sys
+
+from services.audit_codec import CompactDecoder, CompactEncoder, chunk_lines, iter_records, split_chunks
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def audit_record(i: int) -> dict:
+    return {
+        "timestamp": "2026-01-14 10:00:00",
+        "input": {"applicationId": f"A{i}", "scores": (1, 2.5, None), "nested": [{"a": [0, 1]}, [2, [1]]]},
+        "decision": {
+            "decision_id": f"d{i}",
+            "decision": "APPROVE",
+            "reason_codes": ("HIGH_RISK_PROFILE", "LOW_INCOME_STABILITY"),
+            "policy_references": [{"document": "employment_income_policy.md", "section": "Income stability"}],
+        },
+        "model_version": "v1",
+    }
+
+
+def as_json(record: dict) -> dict:
+    return json.loads(json.dumps(record))
+
+
+def test_round_trip_treats_tuples_as_lists():
+    encoder, decoder = CompactEncoder(), CompactDecoder()
+    encoded = [encoder.encode(audit_record(i)) for i in range(3)]
+    records = [record for record in map(decoder.feed, "".join(encoded).splitlines()) if record is not None]
+
+    assert records == [as_json(audit_record(i)) for i in range(3)]
+    # Key shapes and interned values are defined once, before the first record using them
+    assert [text.count("\n") for text in encoded[1:]] == [1, 1]
+
+
+def test_mixed_plain_and_compact_log(tmp_path):
+    log = tmp_path / "audit.log"
+    encoder = CompactEncoder()
+    with open(log, "w") as f:
+        f.write(json.dumps(audit_record(0)) + "\n")
+        f.write(encoder.encode(audit_record(1)))
+        f.write("\n")
+        f.write(json.dumps(audit_record(2)) + "\n")
+        f.write(encoder.encode(audit_record(3)))
+
+    assert list(iter_records(str(log))) == [as_json(audit_record(i)) for i in range(4)]
+
+
+def test_convert_cli_round_trips(tmp_path):
+    source = tmp_path / "audit.log"
+    source.write_text("".join(json.dumps(audit_record(i)) + "\n" for i in range(20)))
+    compact, back = tmp_path / "audit.compact.log", tmp_path / "audit.json.log"
+
+    for args in ([str(source), str(compact)], [str(compact), str(back), "--to", "json"]):
+        result = subprocess.run(
+            [sys.executable, "-m", "services.audit_codec", "convert", *args],
+            cwd=APP_DIR, capture_output=True, text=True, check=True,
+        )
+        assert result.stdout.startswith("Converted 20 records")
+
+    assert os.path.getsize(compact) < os.path.getsize(source)
+    assert back.read_text() == source.read_text()
+
+
+def test_split_chunks_cover_every_line_once(tmp_path):
+    log = tmp_path / "audit.log"
+    lines = [json.dumps({"n": i, "pad": "x" * (i % 7)}) + "\n" for i in range(50)]
+    log.write_text("".join(lines))
+
+    for parts in (1, 3, 8, 200):
+        chunks = split_chunks(str(log), parts)
+        assert chunks[0][0] == 0 and chunks[-1][1] == os.path.getsize(log)
+        assert all(end == start for (_, end), (start, _) in zip(chunks, chunks[1:]))
+        read = [line.decode() for start, end in chunks for line in chunk_lines(str(log), start, end)]
+        assert read == lines
@@ -0,0 +1,90 @@
+import json
+import os
+
+import pytest
+
+from services import audit_logger, audit_stats
+from services.audit_logger import AuditLogger
+from services.audit_stats import AuditStats
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    log_file = tmp_path / "audit.log"
+    monkeypatch.setattr(audit_logger, "LOG_FILE", str(log_file))
+    monkeypatch.setattr(audit_logger, "AUDIT_ENCODING", "compact")
+    monkeypatch.setattr(AuditStats, "path", str(tmp_path / "audit.stats.json"))
+    # Fresh in-memory counters and counter file for each test
+    monkeypatch.setattr(AuditStats, "_state", None)
+    monkeypatch.setattr(AuditStats, "_delta_pid", None)
+    return log_file
+
+
+def log_decisions(decisions: list):
+    for i, decision in enumerate(decisions):
+        AuditLogger.log_decision(
+            {"applicationId": f"A{i}"},
+            {"decision_id": f"d{i}", "decision": decision, "reason_codes": ["HIGH_RISK_PROFILE"]},
+            model_version="v1",
+        )
+
+
+def test_counts_writes_without_touching_the_stats_files(log):
+    log_decisions(["APPROVE", "REJECT"])
+    assert AuditStats.report()["totals"]["decisions"] == {"APPROVE": 1, "REJECT": 1}
+
+    log_decisions(["APPROVE"])
+    totals = AuditStats.report()["totals"]
+    assert totals["decisions"] == {"APPROVE": 2, "REJECT": 1}
+    assert totals["reason_codes"] == {"HIGH_RISK_PROFILE": 3}
+    assert totals["model_versions"] == {"v1": 3}
+    # report() only reads: no base file, no lock file
+    assert sorted(os.listdir(log.parent)) == ["audit.log", "audit.stats.json.d"]
+
+
+def test_counts_other_workers_writes(log, monkeypatch):
+    log_decisions(["APPROVE"])
+    assert AuditStats.report()["totals"]["records"] == 1
+
+    monkeypatch.setattr(os, "getpid", lambda: 999999)
+    log_decisions(["REJECT", "REJECT"])
+    assert len(os.listdir(AuditStats.deltas_dir())) == 2
+    assert AuditStats.report()["totals"]["decisions"] == {"APPROVE": 1, "REJECT": 2}
+
+
+def test_history_counted_once_into_the_base(log):
+    log_decisions(["APPROVE", "REJECT"])
+    assert AuditStats.refresh()
+    # The deltas of those writes end within the base's offset, so aren't added again
+    assert AuditStats.report()["totals"]["decisions"] == {"APPROVE": 1, "REJECT": 1}
+
+    # Compact lines from here on use key shapes defined before the saved offset
+    log_decisions(["APPROVE"])
+    assert AuditStats.refresh()
+    assert AuditStats.report()["totals"]["decisions"] == {"APPROVE": 2, "REJECT": 1}
+    assert json.loads(open(AuditStats.path).read())["state"]["totals"]["records"] == 3
+
+
+def test_history_rebuilt_in_parallel_then_counted_on(log, monkeypatch):
+    # Written before counting was on the write path
+    with monkeypatch.context() as m:
+        m.setattr(AuditStats, "record", lambda *args: None)
+        log_decisions(["APPROVE", "REVIEW", "REJECT"])
+    monkeypatch.setattr(audit_stats, "PARALLEL_REBUILD_BYTES", 0)
+    assert AuditStats.refresh(workers=2)
+
+    log_decisions(["REVIEW"])
+    assert AuditStats.report()["totals"]["decisions"] == {"APPROVE": 1, "REVIEW": 2, "REJECT": 1}
+
+
+def test_refresh_drops_counter_files_of_exited_workers(log, monkeypatch):
+    real_pid = os.getpid()
+    with monkeypatch.context() as m:
+        # No such process: pids are below 2 ** 22 on Linux
+        m.setattr(os, "getpid", lambda: 2 ** 22 + 1)
+        log_decisions(["APPROVE"])
+    log_decisions(["REJECT"])
+    assert AuditStats.refresh()
+
+    assert os.listdir(AuditStats.deltas_dir()) == [f"{real_pid}.jsonl"]
+    assert AuditStats.report()["totals"]["decisions"] == {"APPROVE": 1, "REJECT": 1}
@@ -0,0 +1,90 @@
+import json
+import os
+import sys
+
+import pytest
+
+from config import AI_APP_DIR
+from services import bulk_score
+
+AI_APPLICATION = {
+    "applicationId": "000123",
+    "financialInformation": {"monthlyIncome": "11480.23", "totalCommitments": "1659.84", "savingsAmount": "34661.84"},
+    "creditInformation": {"ctosScore": "776", "creditScoreCategory": "3", "creditUtilization": "0.58",
+                          "latePayments": "0"},
+    "employmentInformation": {"tenureMonths": "58", "stabilityScore": "0.97"},
+    "loanDetails": {"loanAmount": "71660.53"},
+    "calculatedMetrics": {"debtServiceRatio": "0.121", "newDebtServiceRatio": "0.347", "cashReserveMonths": "7.3",
+                          "instalmentToIncomeRatio": "0.226"},
+}
+
+
+@pytest.fixture
+def ai_worker(monkeypatch):
+    """ai.* importable, as in a worker started by _init_worker("ai"), after this app's own packages."""
+    monkeypatch.setattr(sys, "path", [*sys.path, AI_APP_DIR])
+
+
+def example_record() -> dict:
+    with open(os.path.join(AI_APP_DIR, "input", "example_loan.json")) as f:
+        return json.load(f)
+
+
+def test_csv_cells_are_not_cast_before_the_schema(tmp_path):
+    path = tmp_path / "applications.csv"
+    path.write_text("applicationId,loanDetails.loanAmount\n000123,5000\n")
+
+    [[row]] = list(bulk_score.read_chunks(str(path), 10))
+    assert row == {"applicationId": "000123", "loanDetails": {"loanAmount": "5000"}}
+
+
+def test_ai_rows_cast_only_numeric_sections(ai_worker):
+    application = bulk_score._validate_ai(AI_APPLICATION)
+
+    assert application["applicationId"] == "000123"
+    assert application["creditInformation"]["ctosScore"] == 776
+    assert application["financialInformation"]["monthlyIncome"] == 11480.23
+
+
+@pytest.mark.parametrize("section, field, value", [
+    ("creditInformation", "ctosScore", "n/a"),
+    ("financialInformation", "monthlyIncome", "0"),
+    ("loanDetails", "loanAmount", "nan"),
+])
+def test_ai_rows_with_bad_numbers_are_rejected(section, field, value, ai_worker):
+    application = {**AI_APPLICATION, section: {**AI_APPLICATION[section], field: value}}
+    with pytest.raises(ValueError):
+        bulk_score._validate_ai(application)
+
+
+def test_run_rejects_bad_rows_and_resumes(tmp_path):
+    pytest.importorskip("pydantic")
+
+    record = example_record()
+    records = [{**record, "applicationId": f"LA-{i}"} for i in range(5)]
+    del records[1]["loanDetails"]
+    source = tmp_path / "applications.ndjson"
+    source.write_text("".join(json.dumps(r) + "\n" for r in records))
+    out = tmp_path / "out"
+
+    def score():
+        return bulk_score.run(str(source), str(out), chunk_size=2, workers=1, output_format="csv",
+                              audit=False, log=lambda message: None)
+
+    first = score()
+    assert (first["rows"], first["rejected_rows"], first["failed_chunks"]) == (4, 1, [])
+    [reject] = [json.loads(line) for line in (out / "errors-00000.ndjson").read_text().splitlines()]
+    assert (reject["row"], reject["applicationId"]) == (2, "LA-1")
+
+    # Interrupted before the last chunk was recorded
+    progress = out / bulk_score.PROGRESS_FILE
+    lines = progress.read_text().splitlines(keepends=True)
+    progress.write_text("".join(line for line in lines if json.loads(line).get("chunk") != 2))
+    (out / "part-00002.csv").unlink()
+
+    resumed = score()
+    assert (resumed["rows"], resumed["skipped_rows"]) == (1, 4)
+    assert sorted(p.name for p in out.glob("part-*")) == ["part-00000.csv", "part-00001.csv", "part-00002.csv"]
+
+    with pytest.raises(ValueError):
+        bulk_score.run(str(source), str(out), chunk_size=3, workers=1, output_format="csv", audit=False)
@@ -0,0 +1,46 @@
+import asyncio
+
+from services.decision_cache import DecisionCache
+
+
+def test_identical_requests_share_one_computation():
+    cache = DecisionCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "approve"
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_compute("key", compute) for _ in range(3)))
+
+    results = asyncio.run(main())
+    assert [value for value, _ in results] == ["approve"] * 3
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 2
+
+
+def test_waiters_recompute_when_the_first_request_is_cancelled():
+    cache = DecisionCache()
+    started = []
+
+    async def compute():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return "approve"
+
+    async def main():
+        leader = asyncio.create_task(cache.get_or_compute("key", compute))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_compute("key", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        value, _ = await asyncio.wait_for(waiter, timeout=1)
+        return value, leader.cancelled()
+
+    value, leader_cancelled = asyncio.run(main())
+    assert value == "approve"
+    assert leader_cancelled
+    assert len(started) == 2
+    assert not cache._in_flight
@@ -0,0 +1,105 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+from config import AI_APP_DIR  # noqa: E402
+from schemas.loan_application_raw import LoanApplicationRaw  # noqa: E402
+from services.derived_metrics import DerivedMetricsEngine, MissingMetrics  # noqa: E402
+
+
+def example_record() -> dict:
+    with open(os.path.join(AI_APP_DIR, "input", "example_loan.json")) as f:
+        return json.load(f)
+
+
+def with_loan(record: dict, **loan) -> dict:
+    return {**record, "loanDetails": {**record["loanDetails"], **loan}}
+
+
+def test_existing_format_keeps_client_metrics():
+    raw = LoanApplicationRaw(**example_record())
+
+    assert DerivedMetricsEngine.inputs_from(raw) is None
+    assert DerivedMetricsEngine.for_application(raw) == {
+        "debtServiceRatio": 0.121, "newDebtServiceRatio": 0.347, "cashReserveMonths": 7.3,
+    }
+
+
+def test_stated_rate_is_derived_server_side():
+    raw = LoanApplicationRaw(**with_loan(example_record(), annualInterestRate=0.05))
+    inputs = DerivedMetricsEngine.inputs_from(raw)
+
+    assert inputs["tenure"] == 24
+    assert inputs["commitments"] == 1659.84
+    metrics = DerivedMetricsEngine.for_application(raw)
+    assert metrics["debtServiceRatio"] == 0.121
+    assert metrics["instalment"] == round(DerivedMetricsEngine.compute(inputs)["instalment"], 2)
+
+
+def test_no_metrics_and_no_gross_income_is_rejected():
+    record = example_record()
+    record["calculatedMetrics"] = None
+    del record["financialInformation"]["monthlyGrossIncome"]
+
+    with pytest.raises(MissingMetrics):
+        DerivedMetricsEngine.for_application(LoanApplicationRaw(**record))
+
+
+@pytest.mark.parametrize("path, value", [
+    (("loanDetails", "requestedTenure"), 0),
+    (("financialInformation", "monthlyGrossIncome"), 0),
+])
+def test_zero_divisors_fail_validation(path, value):
+    record = example_record()
+    record[path[0]][path[1]] = value
+
+    with pytest.raises(ValueError):
+        LoanApplicationRaw(**record)
+
+
+def test_derived_metrics_match_the_generator(monkeypatch):
+    pytest.importorskip("numpy")
+    monkeypatch.syspath_prepend(os.path.join(AI_APP_DIR, "input"))
+    from dataset_generator import LoanDataGenerator
+
+    generator = LoanDataGenerator(seed=11)
+    records = [generator.generate_application(i) for i in range(1, 201)]
+    raws = [LoanApplicationRaw(**{**r, "calculatedMetrics": None}) for r in records]
+
+    # Batch and single paths agree with what the generator recorded
+    for record, raw, batched in zip(records, raws, DerivedMetricsEngine.for_applications(raws)):
+        single = DerivedMetricsEngine.for_application(raw)
+        expected = record["calculatedMetrics"]
+        for metrics in (single, batched):
+            # The recorded rate is rounded to 4 decimals, the generator's metrics are not
+            assert metrics["newDebtServiceRatio"] == pytest.approx(expected["newDebtServiceRatio"], abs=1.5e-3)
+            assert metrics["instalmentToIncomeRatio"] == pytest.approx(expected["instalmentToIncomeRatio"], abs=1.5e-3)
+            assert metrics["cashReserveMonths"] == pytest.approx(expected["cashReserveMonths"], rel=5e-4, abs=0.11)
+            assert metrics["instalment"] == pytest.approx(expected["monthlyLoanInstalment"], rel=3e-4, abs=0.02)
+
+
+def test_what_if_reuses_the_base_state():
+    from services.what_if_engine import WhatIfEngine
+
+    engine = WhatIfEngine()
+    raw = LoanApplicationRaw(**with_loan(example_record(), annualInterestRate=0.05))
+    first = engine.simulate(raw, {"financialInformation.savingsAmount": 1000.0})
+    second = engine.simulate(raw, {"loanDetails.requestedTenure": 60})
+
+    assert len(engine._states) == 1
+    expected = DerivedMetricsEngine.for_application(
+        LoanApplicationRaw(**with_loan(example_record(), annualInterestRate=0.05, requestedTenure=60))
+    )
+    assert second["calculated_metrics"] == expected
+    assert first["calculated_metrics"]["instalment"] == DerivedMetricsEngine.for_application(raw)["instalment"]
+
+
+def test_what_if_rejects_invalid_edits():
+    from services.what_if_engine import WhatIfEngine
+
+    raw = LoanApplicationRaw(**with_loan(example_record(), annualInterestRate=0.05))
+    with pytest.raises(ValueError):
+        WhatIfEngine().simulate(raw, {"loanDetails.requestedTenure": 0})
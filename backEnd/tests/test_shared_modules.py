@@ -0,0 +1,44 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+import shared
+from config import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+from services import metrics
+from services.batcher import MicroBatcher
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("name", shared.MODULES)
+def test_vendored_module_is_up_to_date(name):
+    with open(os.path.join(os.path.dirname(shared.__file__), f"{name}.py")) as f:
+        assert f.read() == shared.vendored(name), f"shared/{name}.py is stale: run `python -m shared`"
+
+
+def test_metrics_is_the_shared_registry():
+    import shared.metrics
+
+    assert metrics.timed is shared.metrics.timed
+    assert metrics.render_prometheus is shared.metrics.render_prometheus
+
+
+def test_services_do_not_import_the_ai_app():
+    # In a fresh interpreter: other tests may have imported ai.* for bulk scoring
+    code = "import sys, services.derived_metrics, services.scheduler; print('ai' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=APP_DIR, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_batcher_uses_config_defaults():
+    batcher = MicroBatcher(lambda items: [item + 1 for item in items])
+    assert batcher.max_batch_size == BATCH_MAX_SIZE
+    assert batcher.max_wait == BATCH_MAX_WAIT_MS / 1000.0
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+
+    assert asyncio.run(main()) == [1, 2, 3]
@@ -0,0 +1,96 @@
+# benchmarks/audit_encoding.py
+"""
+Size and write / read throughput of the audit log encodings.
+
+    python benchmarks/audit_encoding.py --records 20000
+
+Records are built by the real backEnd decision path (FeatureExtractor,
+DecisionEngine, ExplainabilityEngine, RAGEngine) from generated
+applications, then appended through AuditLogger.write_record with
+XAI_AUDIT_ENCODING=json and =compact into a temporary directory. The
+compact log is also checked to read back to exactly the same records.
+"""
+import argparse
+import importlib
+import os
+import tempfile
+import time
+
+from payloads import BACKEND_DIR, generate, use_app
+
+
+def build_records(n):
+    from schemas.loan_application_raw import LoanApplicationRaw
+    from services.audit_logger import AuditLogger
+    from services.decision_engine import DecisionEngine
+    from services.explainability import ExplainabilityEngine
+    from services.feature_extractor import FeatureExtractor
+    from services.rag_engine import RAGEngine
+
+    engine = DecisionEngine()
+    records = []
+    for raw in generate(n):
+        application = LoanApplicationRaw(**raw)
+        features = FeatureExtractor.extract(application).dict()
+        decision = engine.decide(features)
+        explanation = ExplainabilityEngine.explain(features, decision["decision_id"])
+        records.append({
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "input_hash": AuditLogger.hash_input(application.dict()),
+            "decision": decision,
+            "explanation": explanation,
+            "policy_references": RAGEngine.retrieve(explanation["reason_codes"]),
+            "model_version": engine.model_version,
+            "cache_hit": False,
+        })
+    return records
+
+
+def measure(encoding, records, directory):
+    import config
+    from services import audit_logger
+    from services.audit_codec import iter_records
+
+    config.AUDIT_ENCODING = encoding
+    importlib.reload(audit_logger)
+    audit_logger.LOG_FILE = os.path.join(directory, f"audit.{encoding}.log")
+    write = audit_logger.AuditLogger.write_record
+
+    start = time.perf_counter()
+    for record in records:
+        write(record)
+    write_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decoded = list(iter_records(audit_logger.LOG_FILE))
+    read_s = time.perf_counter() - start
+
+    size = os.path.getsize(audit_logger.LOG_FILE)
+    return {
+        "encoding": encoding,
+        "bytes": size,
+        "bytes_per_record": round(size / len(records), 1),
+        "write_records_s": round(len(records) / write_s),
+        "read_records_s": round(len(records) / read_s),
+        "lossless": decoded == records,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=20000)
+    args = parser.parse_args()
+
+    use_app(BACKEND_DIR)
+    records = build_records(args.records)
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = [measure(encoding, records, directory) for encoding in ("json", "compact")]
+
+    for result in results:
+        print(result)
+    print(f"compact / json size: {results[1]['bytes'] / results[0]['bytes']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
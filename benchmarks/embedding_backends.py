@@ -0,0 +1,132 @@
+# benchmarks/embedding_backends.py
+"""
+Recall parity and latency / throughput / memory of the embedding backends
+in ai/embeddings.py on the rag_docs corpus.
+
+    python benchmarks/embedding_backends.py --backends torch onnx onnx-int8
+
+Each backend runs in its own spawned process so RSS numbers are not
+polluted by the others. Recall@k is measured against --reference over the
+policy-index queries; the script exits non-zero if any backend falls below
+--min-recall.
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from payloads import AI_DIR
+
+NARRATIVE_QUERIES = [
+    "Decision: REJECTED Reasons: High debt burden after loan, Weak credit history",
+    "Decision: APPROVED Reasons: Strong credit history, Stable employment history",
+    "Decision: REJECTED Reasons: Loan instalment is too high relative to income",
+    "Decision: APPROVED Reasons: Healthy cash reserves, Loan instalment is manageable",
+]
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def measure(backend, runs):
+    os.chdir(AI_DIR)
+    sys.path.insert(0, AI_DIR)
+    import numpy  # noqa: F401  (baseline RSS includes numpy)
+    from ai.embeddings import load_embedder
+    from ai.policy_index import load_chunks, queries
+
+    corpus = [c["summary"] for c in load_chunks()]
+    query_texts = [f"{topic} {sign}" for _, topic, sign in queries()] + NARRATIVE_QUERIES
+
+    before = rss_mb()
+    start = time.perf_counter()
+    embedder = load_embedder(backend)
+    load_s = time.perf_counter() - start
+    loaded = rss_mb()
+
+    corpus_vectors = embedder.encode(corpus, normalize_embeddings=True)
+    query_vectors = embedder.encode(query_texts, normalize_embeddings=True)
+
+    latencies = []
+    for i in range(runs):
+        start = time.perf_counter()
+        embedder.encode([query_texts[i % len(query_texts)]])
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    batch = corpus * 8
+    start = time.perf_counter()
+    embedder.encode(batch, batch_size=64)
+    throughput = len(batch) / (time.perf_counter() - start)
+
+    return {
+        "backend": backend,
+        "load_s": round(load_s, 2),
+        "rss_model_mb": round(loaded - before, 1),
+        "rss_peak_mb": round(rss_mb(), 1),
+        "query_p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "query_p99_ms": round(latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000, 2),
+        "throughput_texts_s": round(throughput, 1),
+        "corpus": corpus_vectors.tolist(),
+        "queries": query_vectors.tolist(),
+    }
+
+
+def top_k(query_vectors, corpus_vectors, k):
+    import numpy as np
+
+    scores = np.asarray(query_vectors) @ np.asarray(corpus_vectors).T
+    return [set(row) for row in np.argsort(-scores, axis=1)[:, :k]]
+
+
+def parity(reference, candidate, k):
+    import numpy as np
+
+    ref = top_k(reference["queries"], reference["corpus"], k)
+    cand = top_k(candidate["queries"], candidate["corpus"], k)
+    recall = statistics.fmean(len(r & c) / k for r, c in zip(ref, cand))
+
+    cosine = np.sum(np.asarray(reference["corpus"]) * np.asarray(candidate["corpus"]), axis=1)
+    return round(recall, 4), round(float(cosine.mean()), 4)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--reference", default="torch")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--min-recall", type=float, default=0.9)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    backends = [args.reference] + [b for b in args.backends if b != args.reference]
+    results = {}
+    for backend in backends:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results[backend] = pool.submit(measure, backend, args.runs).result()
+
+    reference = results[args.reference]
+    failed = False
+    for backend in backends:
+        result = results[backend]
+        recall, cosine = parity(reference, result, args.k)
+        stats = {k: v for k, v in result.items() if k not in ("corpus", "queries")}
+        stats.update({f"recall@{args.k}": recall, "mean_cosine_vs_ref": cosine})
+        print(stats)
+        if recall < args.min_recall:
+            print(f"  PARITY FAIL: {backend} recall@{args.k} {recall} < {args.min_recall}")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
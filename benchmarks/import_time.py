@@ -0,0 +1,83 @@
+# benchmarks/import_time.py
+"""
+Import-time guard for the AI-Explainability package, based on
+`python -X importtime`.
+
+    python benchmarks/import_time.py                       # ai.pipeline, api.main
+    python benchmarks/import_time.py --budget-ms 800 ai.pipeline
+
+Exits non-zero when an import takes longer than the budget (best of
+--runs) or when it pulls in one of the heavy modules that must only be
+loaded lazily on first use.
+"""
+import argparse
+import subprocess
+import sys
+
+from payloads import AI_DIR
+
+HEAVY_MODULES = {
+    "shap",
+    "xgboost",
+    "pandas",
+    "chromadb",
+    "sentence_transformers",
+    "torch",
+    "ollama",
+    "openai",
+}
+
+
+def measure(module):
+    """Returns (total import time in ms, set of top-level packages imported)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=AI_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{proc.stderr}")
+
+    total_us = 0
+    packages = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        packages.add(name.strip().split(".")[0])
+        # Top-level entries (no nesting indent) add up to the whole import
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative)
+
+    return total_us / 1000.0, packages
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("modules", nargs="*", default=["ai.pipeline", "api.main"])
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        results = [measure(module) for _ in range(args.runs)]
+        best_ms = min(ms for ms, _ in results)
+        heavy = sorted(HEAVY_MODULES & results[0][1])
+
+        status = "ok"
+        if best_ms > args.budget_ms:
+            status = f"REGRESSION: over budget of {args.budget_ms:.0f} ms"
+            failed = True
+        if heavy:
+            status = f"REGRESSION: eagerly imports {', '.join(heavy)}"
+            failed = True
+
+        print(f"{module:<20} {best_ms:8.1f} ms  {status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
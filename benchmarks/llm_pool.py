@@ -0,0 +1,78 @@
+# benchmarks/llm_pool.py
+"""
+ai.llm_pool against local stub servers: balancing, failover and the tail
+latency cut by hedged requests.
+
+    python benchmarks/llm_pool.py --servers 3 --calls 400 --concurrency 16 --hedge-ms 120
+
+Every stub answers in --delay-ms, except --slow-fraction of requests which
+take --slow-ms (a GC pause, a long generation). One extra endpoint points at
+a closed port to exercise failover and health checks. The same calls are
+made without and with hedging.
+"""
+import argparse
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import stub_ollama
+from payloads import AI_DIR, use_app
+
+MESSAGES = [{"role": "user", "content": "Explain the decision."}]
+
+
+def closed_port() -> str:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}"
+
+
+def drive(pool, calls, concurrency):
+    def one(_):
+        start = time.perf_counter()
+        pool.chat(MESSAGES)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = sorted(executor.map(one, range(calls)))
+    elapsed = time.perf_counter() - start
+
+    def q(p):
+        return round(samples[min(int(len(samples) * p), len(samples) - 1)] * 1000, 1)
+
+    return {"calls": calls, "rps": round(calls / elapsed, 1), "p50_ms": q(0.5), "p95_ms": q(0.95), "p99_ms": q(0.99)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--servers", type=int, default=3)
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--delay-ms", type=float, default=20.0)
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    parser.add_argument("--slow-ms", type=float, default=500.0)
+    parser.add_argument("--hedge-ms", type=float, default=60.0)
+    args = parser.parse_args()
+
+    use_app(AI_DIR)
+    from ai.llm_pool import LLMPool
+
+    urls = [
+        stub_ollama.start(delay_ms=args.delay_ms, slow_fraction=args.slow_fraction, slow_ms=args.slow_ms)[1]
+        for _ in range(args.servers)
+    ]
+    endpoints = urls + [closed_port()]
+
+    for hedge_ms in (0.0, args.hedge_ms):
+        pool = LLMPool(endpoints, timeout_s=10.0, hedge_ms=hedge_ms)
+        pool.check_health()
+        result = drive(pool, args.calls, args.concurrency)
+        stats = pool.stats()
+        print(f"hedge {hedge_ms:g} ms:", result, f"hedges={stats['hedges']} won={stats['hedge_wins']}")
+        for endpoint in stats["endpoints"]:
+            print("   ", endpoint)
+
+
+if __name__ == "__main__":
+    main()
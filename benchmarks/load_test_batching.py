@@ -0,0 +1,90 @@
+# benchmarks/load_test_batching.py
+"""
+Throughput of model inference with and without the micro-batcher.
+
+    python benchmarks/load_test_batching.py --app ai --clients 500 --requests 5000
+    python benchmarks/load_test_batching.py --app backend
+
+Runs in-process: each simulated client awaits one scoring call at a time,
+either on its own worker thread (unbatched) or through MicroBatcher.
+"""
+import argparse
+import asyncio
+import time
+
+from payloads import AI_DIR, BACKEND_DIR, generate, to_ai_application, use_app
+
+
+def load_target(app):
+    if app == "ai":
+        use_app(AI_DIR)
+        from ai.batching import MicroBatcher
+        from ai.pipeline import score_batch
+
+        payloads = [to_ai_application(r) for r in generate(1000)]
+        return MicroBatcher, score_batch, payloads
+
+    use_app(BACKEND_DIR)
+    from schemas.loan_application_raw import LoanApplicationRaw
+    from services.batcher import MicroBatcher
+    from services.decision_engine import DecisionEngine
+    from services.feature_extractor import FeatureExtractor
+
+    engine = DecisionEngine()
+    payloads = [
+        FeatureExtractor.extract(LoanApplicationRaw(**r)).dict()
+        for r in generate(1000)
+    ]
+    return MicroBatcher, engine.decide_batch, payloads
+
+
+async def drive(call, payloads, clients, total):
+    remaining = iter(range(total))
+    latencies = []
+
+    async def client():
+        for i in remaining:
+            start = time.perf_counter()
+            await call(payloads[i % len(payloads)])
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "seconds": round(elapsed, 3),
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+    }
+
+
+async def main(args):
+    MicroBatcher, batch_fn, payloads = load_target(args.app)
+
+    async def unbatched(payload):
+        return await asyncio.to_thread(batch_fn, [payload])
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=args.max_batch, max_wait_ms=args.max_wait_ms)
+
+    single = await drive(unbatched, payloads, args.clients, args.requests)
+    batched = await drive(batcher.submit, payloads, args.clients, args.requests)
+
+    print(f"app={args.app} clients={args.clients}")
+    print("unbatched:", single)
+    print("batched:  ", batched)
+    print("batcher:  ", batcher.stats())
+    print(f"throughput gain: {batched['rps'] / single['rps']:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", choices=["ai", "backend"], default="ai")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    asyncio.run(main(parser.parse_args()))
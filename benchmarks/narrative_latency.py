@@ -0,0 +1,68 @@
+# benchmarks/narrative_latency.py
+"""
+Latency of the template narrative vs the RAG + LLM narrative.
+
+    python benchmarks/narrative_latency.py --template-runs 100000 --llm-runs 5
+
+The LLM path needs the ollama server with llama3 pulled; if it is not
+reachable only the template path is reported.
+"""
+import argparse
+import statistics
+import time
+
+from payloads import AI_DIR, use_app
+
+SAMPLE_REASONS = [
+    {"feature": "ctosScore", "impact": 1.42, "explanation": "Strong credit history"},
+    {"feature": "newDebtServiceRatio", "impact": -0.61, "explanation": "High debt burden after loan"},
+    {"feature": "employmentTenureMonths", "impact": 0.33, "explanation": "Stable employment history"},
+]
+
+
+def time_calls(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "runs": runs,
+        "mean_us": round(statistics.fmean(samples) * 1e6, 2),
+        "p50_us": round(samples[len(samples) // 2] * 1e6, 2),
+        "p99_us": round(samples[max(int(len(samples) * 0.99) - 1, 0)] * 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--template-runs", type=int, default=100000)
+    parser.add_argument("--llm-runs", type=int, default=5)
+    args = parser.parse_args()
+
+    use_app(AI_DIR)
+    from ai.templates import render_narrative
+
+    template = time_calls(lambda: render_narrative("APPROVED", 0.87, SAMPLE_REASONS), args.template_runs)
+    print("template:", template)
+
+    if args.llm_runs <= 0:
+        return
+
+    from ai.rag import generate_narrative
+    from ai.rag_index import build_index
+
+    try:
+        build_index()
+        llm = time_calls(lambda: generate_narrative("APPROVED", 0.87, SAMPLE_REASONS), args.llm_runs)
+    except Exception as exc:
+        print(f"llm:      skipped ({type(exc).__name__}: {exc})")
+        return
+
+    print("llm:     ", llm)
+    print(f"speedup:   {llm['mean_us'] / template['mean_us']:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/payloads.py
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AI_DIR = os.path.join(ROOT, "AI-Explainability")
+BACKEND_DIR = os.path.join(ROOT, "backEnd")
+
+INPUT_DIR = os.path.join(AI_DIR, "input")
+
+SCORE_CATEGORY = {"excellent": 3, "good": 2, "fair": 1, "poor": 0}
+
+
+def use_app(app_dir):
+    """Make an app importable the way it is run (cwd = app dir)."""
+    os.chdir(app_dir)
+    if app_dir not in sys.path:
+        sys.path.insert(0, app_dir)
+
+
+def generate(n, seed=42):
+    if INPUT_DIR not in sys.path:
+        sys.path.insert(0, INPUT_DIR)
+    from dataset_generator import LoanDataGenerator
+
+    generator = LoanDataGenerator(seed=seed)
+    return [generator.generate_application(i) for i in range(1, n + 1)]
+
+
+def to_ai_application(record):
+    """Generator record -> AI-Explainability /predict payload."""
+    financial = record["financialInformation"]
+    credit = record["creditInformation"]
+    metrics = record["calculatedMetrics"]
+
+    return {
+        "applicationId": record["applicationId"],
+        "financialInformation": {
+            "monthlyIncome": financial["totalMonthlyIncome"],
+            "totalCommitments": financial["monthlyCommitments"]["totalCommitments"],
+            "savingsAmount": financial["savingsAmount"],
+        },
+        "creditInformation": {
+            "ctosScore": credit["ctosScore"],
+            "creditScoreCategory": SCORE_CATEGORY[credit["creditScoreCategory"]],
+            "creditUtilization": credit["totalCreditUtilization"],
+            "latePayments": record["existingBankingRelationship"]["numberOfLatePayments"],
+        },
+        "employmentInformation": {
+            "tenureMonths": record["employmentInformation"]["employmentTenureMonths"],
+            "stabilityScore": record["employmentInformation"]["employmentStabilityScore"],
+        },
+        "loanDetails": {"loanAmount": record["loanDetails"]["loanAmount"]},
+        "calculatedMetrics": {
+            "debtServiceRatio": financial["debtServiceRatio"],
+            "newDebtServiceRatio": metrics["newDebtServiceRatio"],
+            "cashReserveMonths": metrics["cashReserveMonths"],
+            "instalmentToIncomeRatio": metrics["instalmentToIncomeRatio"],
+        },
+    }
+
+
+def to_backend_application(record):
+    """Generator record -> backEnd LoanApplicationRaw payload (extra fields are ignored)."""
+    return {key: value for key, value in record.items() if key != "targetVariable"}
@@ -0,0 +1,96 @@
+# benchmarks/stub_ollama.py
+"""
+Minimal stand-in for the Ollama HTTP API so narrative endpoints can be
+load-tested without a model server.
+
+    python benchmarks/stub_ollama.py --port 11435 --delay-ms 50
+    OLLAMA_HOST=http://127.0.0.1:11435 uvicorn api.main:app
+
+Answers POST /api/chat (and /api/generate) with a fixed assistant message
+after --delay-ms (or, for a --slow-fraction of requests, --slow-ms), and
+GET requests with an empty model list. --status makes every POST fail with
+that HTTP status instead, e.g. to see how clients treat 4xx and 5xx.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = (
+    "Your application was assessed against our credit, debt and income policies. "
+    "The main factors are listed above."
+)
+
+
+def make_handler(delay_s, slow_fraction=0.0, slow_s=0.0, status=200):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; do not wait for delayed ACKs between them
+        disable_nagle_algorithm = True
+
+        def _send(self, payload, code=200):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._send({"models": []})
+
+        def do_HEAD(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            time.sleep(slow_s if random.random() < slow_fraction else delay_s)
+            if status != 200:
+                self._send({"error": f"stub status {status}"}, status)
+                return
+
+            response = {
+                "model": request.get("model", "llama3"),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "done": True,
+                "done_reason": "stop",
+            }
+            if self.path.endswith("/generate"):
+                response["response"] = REPLY
+            else:
+                response["message"] = {"role": "assistant", "content": REPLY}
+            self._send(response)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start(port=0, delay_ms=50.0, slow_fraction=0.0, slow_ms=0.0, status=200):
+    """Starts the stub in a daemon thread; returns (server, base_url)."""
+    handler = make_handler(delay_ms / 1000.0, slow_fraction, slow_ms / 1000.0, status)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--delay-ms", type=float, default=50.0)
+    parser.add_argument("--slow-fraction", type=float, default=0.0, help="share of requests answered after --slow-ms")
+    parser.add_argument("--slow-ms", type=float, default=1000.0)
+    parser.add_argument("--status", type=int, default=200, help="HTTP status for every POST")
+    args = parser.parse_args()
+
+    handler = make_handler(args.delay_ms / 1000.0, args.slow_fraction, args.slow_ms / 1000.0, args.status)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+    print(f"stub ollama on http://127.0.0.1:{args.port} (delay {args.delay_ms} ms)")
+    server.serve_forever()
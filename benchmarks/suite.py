@@ -0,0 +1,289 @@
+# benchmarks/suite.py
+"""
+End-to-end load test of both FastAPI apps with synthetic applications.
+
+    python benchmarks/suite.py --out benchmarks/baseline.json
+    python benchmarks/suite.py --compare benchmarks/baseline.json --tolerance 0.2
+    python benchmarks/suite.py --apps backend --transport http --backend-url http://127.0.0.1:8000 --backend-pid 1234
+
+Traffic comes from input/dataset_generator.LoanDataGenerator. With
+--transport inprocess (default) each app is imported in its own spawned
+process (both apps have a top-level ``api`` package) and driven through
+httpx's ASGI transport; with --transport http the running servers at
+--ai-url / --backend-url are driven over localhost instead.
+
+The LLM narrative is served by benchmarks/stub_ollama.py, started
+in-process with --llm-delay-ms of simulated generation time. For the
+http transport, start the stub yourself and point OLLAMA_HOST at it.
+
+Per endpoint the suite records throughput, p50/p95/p99 latency, errors
+and RSS after the run. --compare exits non-zero if any endpoint's p95
+or p99 grew, or its throughput dropped, by more than --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import stub_ollama
+from payloads import AI_DIR, BACKEND_DIR, generate, to_ai_application, to_backend_application, use_app
+
+# (name, method, path, payload builder); the builder gets (record, state)
+ENDPOINTS = {
+    "backend": [
+        ("POST /decision", "POST", "/decision/decision",
+         lambda r, s: {"json": to_backend_application(r)}),
+        ("POST /what-if", "POST", "/what-if/what-if",
+         lambda r, s: {"json": {
+             "application": to_backend_application(r),
+             "modifications": {"applicationId": f"{r['applicationId']}-WHATIF"},
+         }}),
+        ("POST /explanation", "POST", "/explanation/explanation",
+         lambda r, s: {"json": to_backend_application(r),
+                       "params": {"decision_id": s["decision_ids"].get(r["applicationId"], "bench")}}),
+        ("GET /audit/{id}", "GET", "/audit/audit/{decision_id}", None),
+    ],
+    "ai": [
+        ("POST /predict detail=decision", "POST", "/predict",
+         lambda r, s: {"json": to_ai_application(r), "params": {"detail": "decision"}}),
+        ("POST /predict detail=reasons", "POST", "/predict",
+         lambda r, s: {"json": to_ai_application(r), "params": {"detail": "reasons"}}),
+        ("POST /predict narrator=template", "POST", "/predict",
+         lambda r, s: {"json": to_ai_application(r), "params": {"detail": "narrative", "narrator": "template"}}),
+        ("POST /predict narrator=llm", "POST", "/predict",
+         lambda r, s: {"json": to_ai_application(r), "params": {"detail": "narrative", "narrator": "llm"}}),
+    ],
+}
+
+# Lower is better for latencies, higher for throughput
+COMPARED = {"p95_ms": 1, "p99_ms": 1, "rps": -1}
+
+
+def rss_mb(pid="self"):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def percentile(sorted_samples, q):
+    return sorted_samples[min(int(len(sorted_samples) * q), len(sorted_samples) - 1)]
+
+
+async def drive(client, requests, concurrency):
+    """Sends (method, url, kwargs) requests from `concurrency` clients; returns stats and responses."""
+    pending = iter(enumerate(requests))
+    latencies = []
+    responses = [None] * len(requests)
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for i, (method, url, kwargs) in pending:
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+            else:
+                responses[i] = response.json()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    stats = {
+        "requests": len(requests),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(requests) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+    }
+    return stats, responses
+
+
+def build_requests(name, method, path, builder, records, state):
+    if name == "GET /audit/{id}":
+        ids = list(state["decision_ids"].values())
+        return [(method, path.format(decision_id=ids[i % len(ids)]), {}) for i in range(len(records))]
+    return [(method, path, builder(r, state)) for r in records]
+
+
+async def run_endpoints(app, client, records, options, pid):
+    state = {"decision_ids": {}}
+    results = {}
+    requests_per_endpoint = options["requests"]
+
+    for name, method, path, builder in ENDPOINTS[app]:
+        if options["endpoints"] and name not in options["endpoints"]:
+            continue
+        if name == "GET /audit/{id}" and not state["decision_ids"]:
+            # Looks up the decisions made by POST /decision, which did not run or all failed
+            print(f"{app:<8} {name:<34} skipped: no decision ids (run with POST /decision)", flush=True)
+            continue
+
+        count = options["llm_requests"] if name.endswith("narrator=llm") else requests_per_endpoint
+        batch = records[:count]
+
+        # Warm-up: lazy model/explainer loads should not land in the percentiles
+        warm = build_requests(name, method, path, builder, batch[:options["warmup"]], state)
+        if warm:
+            await drive(client, warm, 1)
+
+        requests = build_requests(name, method, path, builder, batch, state)
+        stats, responses = await drive(client, requests, options["concurrency"])
+        stats["rss_mb"] = rss_mb(pid) if pid else None
+        results[f"{app} {name}"] = stats
+        print(f"{app:<8} {name:<34} {stats}", flush=True)
+
+        if name == "POST /decision":
+            for record, body in zip(batch, responses):
+                if body:
+                    state["decision_ids"][record["applicationId"]] = body["decision_id"]
+
+    return results
+
+
+def run_inprocess(app, options):
+    """Runs in a spawned child: imports one app and drives it through ASGI."""
+    import httpx
+
+    _, ollama_url = stub_ollama.start(delay_ms=options["llm_delay_ms"])
+    os.environ["OLLAMA_HOST"] = ollama_url
+
+    records = generate(max(options["requests"], options["llm_requests"]), seed=options["seed"])
+
+    if app == "ai":
+        use_app(AI_DIR)
+        from api.main import app as asgi_app
+    else:
+        # Audit log and application DB are relative paths; keep them out of the tree
+        sys.path.insert(0, BACKEND_DIR)
+        os.chdir(tempfile.mkdtemp(prefix="xai-bench-"))
+        os.makedirs("logs")
+        from main import app as asgi_app
+
+    async def run():
+        transport = httpx.ASGITransport(app=asgi_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            return await run_endpoints(app, client, records, options, "self")
+
+    return asyncio.run(run())
+
+
+def run_http(app, url, pid, options):
+    import httpx
+
+    records = generate(max(options["requests"], options["llm_requests"]), seed=options["seed"])
+    limits = httpx.Limits(max_connections=options["concurrency"])
+
+    async def run():
+        async with httpx.AsyncClient(base_url=url, timeout=None, limits=limits) as client:
+            return await run_endpoints(app, client, records, options, pid)
+
+    return asyncio.run(run())
+
+
+def compare(results, baseline, tolerance):
+    """Returns a list of regression messages (empty if none)."""
+    regressions = []
+    for endpoint, base in baseline["endpoints"].items():
+        current = results.get(endpoint)
+        if current is None:
+            continue
+        for key, direction in COMPARED.items():
+            if not base.get(key):
+                continue
+            change = (current[key] - base[key]) / base[key] * direction
+            if change > tolerance:
+                regressions.append(
+                    f"{endpoint}: {key} {base[key]} -> {current[key]} ({change:+.0%} worse)"
+                )
+        if current["errors"] > base.get("errors", 0):
+            regressions.append(f"{endpoint}: errors {base.get('errors', 0)} -> {current['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--apps", nargs="+", choices=["backend", "ai"], default=["backend", "ai"])
+    parser.add_argument("--endpoints", nargs="*", default=[], help="subset of endpoint names to run")
+    parser.add_argument("--transport", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--backend-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--ai-url", default="http://127.0.0.1:8001")
+    parser.add_argument("--backend-pid", type=int, help="server pid to read RSS from (http transport)")
+    parser.add_argument("--ai-pid", type=int)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--llm-requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--llm-delay-ms", type=float, default=50.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="write results JSON here (e.g. a new baseline)")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    options = {
+        "requests": args.requests,
+        "llm_requests": args.llm_requests,
+        "concurrency": args.concurrency,
+        "warmup": args.warmup,
+        "llm_delay_ms": args.llm_delay_ms,
+        "seed": args.seed,
+        "endpoints": args.endpoints,
+    }
+
+    results = {}
+    for app in args.apps:
+        if args.transport == "http":
+            url, pid = (args.ai_url, args.ai_pid) if app == "ai" else (args.backend_url, args.backend_pid)
+            results.update(run_http(app, url, pid, options))
+        else:
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                results.update(pool.submit(run_inprocess, app, options).result())
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "transport": args.transport,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            **options,
+        },
+        "endpoints": results,
+    }
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {len(results)} endpoint results to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print("REGRESSION:", line)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -76,7 +76,7 @@ function transformApiResponse(apiData) {
   return {
     id: apiData.applicationId,
     decision: {
-      status: apiData.decision.toLowerCase(), // 'APPROVED' -> 'approved'
+      status: apiData.status, // 'approved' | 'review' | 'denied', as in the applications list
       confidence: apiData.confidence,
       riskLevel: apiData.riskLevel,
       timestamp: apiData.audit?.timestamp,
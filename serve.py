@@ -0,0 +1,222 @@
+# serve.py
+"""
+Pre-fork launcher for the two FastAPI apps.
+
+    python serve.py ai --workers 4 --port 8001
+    python serve.py backend --workers 4 --port 8000
+
+The parent imports the app and runs its preload once, freezes the GC so
+those objects are never touched again, binds the socket and then forks
+workers that share the loaded artifacts copy-on-write instead of each
+loading their own copy. What is shared, per app (APPS):
+
+    ai       XGBoost model, shap, compiled policy index, embedder weights
+             (moved to shared memory by share_artifacts)
+    backend  the app's modules, BlackBoxModel and config; nothing is preloaded
+
+Anything holding a connection, file descriptor or thread is created per
+worker after the fork, never by the preload or at import: the chromadb
+collection and LLM client pool (ai), the sqlite ApplicationStore, audit
+counter files and scheduler pools (backend).
+
+A worker that exits is restarted after a delay that doubles with each exit
+in the last CRASH_WINDOW_S seconds; more than CRASH_BUDGET of them stop the
+server instead of restarting a crash loop forever.
+"""
+import argparse
+import collections
+import gc
+import importlib
+import os
+import signal
+import socket
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+RESTART_DELAY_S = 0.5
+MAX_RESTART_DELAY_S = 30.0
+CRASH_WINDOW_S = 60.0
+CRASH_BUDGET = 10
+
+APPS = {
+    "ai": {
+        "dir": "AI-Explainability",
+        "app": "api.main:app",
+        # The ai package loads lazily; force the fork-safe artifacts now
+        "preload": ["ai.warmup:preload"],
+    },
+    "backend": {
+        "dir": "backEnd",
+        "app": "main:app",
+        "preload": [],
+    },
+}
+
+
+def memory_report() -> dict:
+    """RSS/PSS/shared kB of the current process, from /proc (Linux only)."""
+    report = {}
+    for path in ("/proc/self/smaps_rollup", "/proc/self/status"):
+        try:
+            with open(path) as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    if key in ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "VmRSS"):
+                        report[key] = int(value.split()[0])
+        except OSError:
+            continue
+    return report
+
+
+def format_memory(report: dict) -> str:
+    if not report:
+        return "memory stats unavailable"
+    shared = report.get("Shared_Clean", 0) + report.get("Shared_Dirty", 0)
+    rss = report.get("Rss", report.get("VmRSS", 0))
+    return f"rss={rss // 1024}MB pss={report.get('Pss', 0) // 1024}MB shared={shared // 1024}MB"
+
+
+def share_artifacts(name: str):
+    """
+    Move the embedding model's weights (torch backend) to shared memory, so
+    the copy every worker reads for each query is the parent's. The XGBoost
+    model and policy index stay shared copy-on-write.
+    """
+    if name != "ai":
+        return
+
+    embeddings = sys.modules.get("ai.embeddings")
+    if embeddings is None or not embeddings.get_embedder.loaded():
+        return
+    embedder = embeddings.get_embedder()
+    if hasattr(embedder, "share_memory"):
+        # torch.nn.Module: weights move to /dev/shm backed storage
+        embedder.share_memory()
+
+
+def restart_delay(crashes) -> float:
+    """Seconds to wait before the next restart, given the recent exit times, or None to give up."""
+    if len(crashes) > CRASH_BUDGET:
+        return None
+    return min(MAX_RESTART_DELAY_S, RESTART_DELAY_S * 2 ** (len(crashes) - 1))
+
+
+def load_app(name: str):
+    spec = APPS[name]
+    app_dir = os.path.join(ROOT, spec["dir"])
+    os.chdir(app_dir)
+    sys.path.insert(0, app_dir)
+
+    for target in spec["preload"]:
+        module_name, _, func = target.partition(":")
+        module = importlib.import_module(module_name)
+        if func:
+            getattr(module, func)()
+
+    module_name, _, attr = spec["app"].partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def run_worker(app, sock, args):
+    import uvicorn
+
+    print(f"[worker {os.getpid()}] started {format_memory(memory_report())}", flush=True)
+    config = uvicorn.Config(app, log_level=args.log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def spawn(app, sock, args) -> int:
+    pid = os.fork()
+    if pid == 0:
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        try:
+            run_worker(app, sock, args)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("app", choices=sorted(APPS))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--no-shared-memory", action="store_true")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    app = load_app(args.app)
+    if not args.no_shared_memory:
+        share_artifacts(args.app)
+
+    # Keep the preloaded objects out of future GC passes so the collector
+    # does not write to (and un-share) their pages in every worker
+    gc.collect()
+    gc.freeze()
+
+    print(f"[parent {os.getpid()}] loaded {args.app} {format_memory(memory_report())}", flush=True)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    workers = {spawn(app, sock, args) for _ in range(args.workers)}
+    crashes = collections.deque()
+    stopping = False
+    exit_code = 0
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.discard(pid)
+        if stopping:
+            continue
+
+        now = time.monotonic()
+        crashes.append(now)
+        while crashes[0] < now - CRASH_WINDOW_S:
+            crashes.popleft()
+
+        delay = restart_delay(crashes)
+        if delay is None:
+            print(
+                f"[parent] worker {pid} exited ({status}); {len(crashes)} exits in "
+                f"{CRASH_WINDOW_S:.0f}s, stopping",
+                flush=True,
+            )
+            exit_code = 1
+            stop(None, None)
+            continue
+
+        print(f"[parent] worker {pid} exited ({status}), restarting in {delay:.1f}s", flush=True)
+        time.sleep(delay)
+        if not stopping:
+            workers.add(spawn(app, sock, args))
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()